@@ -14,11 +14,23 @@ def main():
         nargs="?",
         help="Set the scenario path from working directory (usually repository root).",
     )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Continue from the latest checkpoint of the scenario.",
+    )
+    parser.add_argument(
+        "--plan-only",
+        action="store_true",
+        help="Only plan the charging events and export them, without simulating them.",
+    )
     p_args = parser.parse_args()
 
     print("Running FLEEMA...")
     simulation = Simulation.from_config(p_args.config)
-    simulation.run()
+    if p_args.plan_only:
+        simulation.plan_only = True
+    simulation.run(resume=p_args.resume)
     print("-- Done --")
 
 
@@ -1,5 +1,5 @@
-from dataclasses import dataclass
-from typing import List, Dict, Optional
+from dataclasses import dataclass, field
+from typing import FrozenSet, Iterable, List, Dict, Optional, Tuple
 
 from fleema.util.helpers import deep_update
 
@@ -39,17 +39,20 @@ class ChargingPoint:
 
     id: str
     plugs: List["PlugType"]
+    # max power by plug set, plugs aren't expected to change after creation
+    _powers: Dict[FrozenSet[str], float] = field(
+        default_factory=dict, init=False, repr=False, compare=False
+    )
 
-    def get_power(self, plug_types: List[str]):
+    def get_power(self, plug_types: Iterable[str]):
         """Returns max power for a specific plug type (0 if the plug doesn't exist at this point)"""
-        max_power = 0.0
-        for plug in self.plugs:
-            if plug.plug not in plug_types:
-                continue
-            else:
-                power = plug.capacity
-                max_power = power if power > max_power else max_power
-        return max_power
+        plug_set = frozenset(plug_types)
+        if plug_set not in self._powers:
+            self._powers[plug_set] = max(
+                (plug.capacity for plug in self.plugs if plug.plug in plug_set),
+                default=0.0,
+            )
+        return self._powers[plug_set]
 
 
 class Charger:
@@ -80,6 +83,8 @@ class Charger:
         """
         self.name = name
         self.charging_points = charging_points
+        # best point and its power by plug set, charging points aren't expected to change
+        self._best_points: Dict[FrozenSet[str], Tuple[Optional[str], float]] = {}
 
     @property
     def num_points(self) -> int:
@@ -93,6 +98,33 @@ class Charger:
         """
         return len(self.charging_points)
 
+    def get_best_point(self, plug_types: Iterable[str]) -> Tuple[Optional[str], float]:
+        """Returns the charging point with the highest power for the plug types and its power.
+
+        The result is calculated once per plug set.
+
+        Parameters
+        ----------
+        plug_types : list[str]
+            Plug types of the vehicle
+
+        Returns
+        -------
+        tuple
+            ID of the first charging point with the highest power, None if no point fits the plug types,
+            and its power.
+
+        """
+        plug_set = frozenset(plug_types)
+        if plug_set not in self._best_points:
+            best_point: Tuple[Optional[str], float] = (None, 0.0)
+            for cp in self.charging_points:
+                power = cp.get_power(plug_set)
+                if power > best_point[1]:
+                    best_point = (cp.id, power)
+            self._best_points[plug_set] = best_point
+        return self._best_points[plug_set]
+
     def get_scenario_info(
         self, point_id: str, plug_types: List[str]
     ) -> Dict[str, Dict[str, Dict[str, Dict[str, object]]]]:
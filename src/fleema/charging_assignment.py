@@ -0,0 +1,399 @@
+"""This script includes the fleet-wide assignment of charging events to charging locations.
+
+Classes
+-------
+ChargingCandidate
+
+Functions
+---------
+assign_charging_heuristic, assign_charging_milp
+
+"""
+
+import heapq
+import warnings
+import numpy as np
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import (
+    Dict,
+    FrozenSet,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+    TYPE_CHECKING,
+)
+
+from fleema.util.helpers import lazy_import
+
+if TYPE_CHECKING:
+    from fleema.location import Location
+    from fleema.soc_trajectory import SocTrajectory
+
+optimize = lazy_import("scipy.optimize")
+sparse = lazy_import("scipy.sparse")
+
+
+@dataclass
+class ChargingCandidate:
+    """Scored charging option for a single break of a vehicle.
+
+    Parameters
+    ----------
+    vehicle_id : str or int
+        ID of the vehicle.
+    break_index : int
+        Index of the break in the break list of the vehicle.
+    option : dict
+        Result of Simulation.evaluate_charging_location with a score above 0.
+    plug_types : list[str]
+        Plug types of the vehicle. Without plug types, only the number of chargers is checked.
+
+    """
+
+    vehicle_id: Union[str, int]
+    break_index: int
+    option: dict
+    plug_types: Sequence[str] = ()
+
+    @property
+    def location(self) -> "Location":
+        return self.option["charge_event"].start_point
+
+    @property
+    def start_time(self) -> int:
+        return self.option["charge_event"].start_time
+
+    @property
+    def end_time(self) -> int:
+        return self.option["charge_event"].end_time
+
+    @property
+    def rank(self) -> Tuple[float, float, float]:
+        """Sorting key of the option, same as in Schedule.get_charging_slots."""
+        return self.option["score"], self.option["delta_soc"], self.option["charge"]
+
+
+def _uses_points(candidate: "ChargingCandidate") -> bool:
+    """Checks if the candidate has to be assigned to a charging point compatible with its plug types."""
+    return bool(candidate.plug_types) and bool(candidate.location.charging_points)
+
+
+def _get_max_overlap(intervals: List[Tuple[int, int]], start: int, end: int) -> int:
+    """Returns the highest number of intervals that overlap at a time step of the time frame."""
+    intervals = [(s, e) for s, e in intervals if s <= end and e >= start]
+    # the highest overlap is reached at the start of the window or of an interval
+    time_steps = [start] + [s for s, _ in intervals if s > start]
+    return max(sum(1 for s, e in intervals if s <= t <= e) for t in time_steps)
+
+
+class _ChargerCapacity:
+    """Keeps track of the charging events assigned to each location and charging point during an assignment."""
+
+    def __init__(self):
+        self.assigned: Dict[str, List[Tuple[int, int]]] = defaultdict(list)
+        self.assigned_points: Dict[Tuple[str, str], List[Tuple[int, int]]] = (
+            defaultdict(list)
+        )
+
+    def get_free_point(self, candidate: "ChargingCandidate") -> Optional[str]:
+        """Returns the compatible charging point with the highest power that is free during the charging time."""
+        location = candidate.location
+        start, end = candidate.start_time, candidate.end_time
+        for cp in location.get_ranked_points(candidate.plug_types):
+            if location.get_max_occupation(start, end, cp.id):
+                continue
+            if not _get_max_overlap(
+                self.assigned_points[(location.name, cp.id)], start, end
+            ):
+                return cp.id
+        return None
+
+    def fits(self, candidate: "ChargingCandidate") -> bool:
+        """Checks if a free charger is left at the location of the candidate during its charging time.
+
+        Candidates with plug types also need a free charging point that is compatible with them.
+        """
+        location = candidate.location
+        start, end = candidate.start_time, candidate.end_time
+        capacity = location.num_charging_points - location.get_max_occupation(
+            start, end
+        )
+        if _get_max_overlap(self.assigned[location.name], start, end) >= capacity:
+            return False
+        if _uses_points(candidate):
+            return self.get_free_point(candidate) is not None
+        return True
+
+    def add(self, candidate: "ChargingCandidate"):
+        """Books a candidate that fits and saves its charging point in the charging event."""
+        location = candidate.location
+        interval = (candidate.start_time, candidate.end_time)
+        point_id = self.get_free_point(candidate) if _uses_points(candidate) else None
+        if point_id is not None:
+            candidate.option["charge_event"].charging_point = point_id
+            self.assigned_points[(location.name, point_id)].append(interval)
+        self.assigned[location.name].append(interval)
+
+
+def assign_charging_heuristic(
+    candidates: List["ChargingCandidate"],
+    requirements: Dict[Union[str, int], "SocTrajectory"],
+    soc_min: float,
+    end_soc: float,
+):
+    """Assigns charging events to the fleet with a priority queue over all candidates.
+
+    The best candidates are assigned first, as long as their break isn't used yet and a charger is
+    available. Each assigned event gets the free compatible charging point with the highest power, which
+    is saved in its charge event. Vehicles stop receiving charging events once their minimum and end SoC
+    are satisfied, leaving the chargers to other vehicles.
+
+    Parameters
+    ----------
+    candidates : list[ChargingCandidate]
+        Scored options of all breaks of the fleet.
+    requirements : dict
+        Critical points of the predicted SoC (SocTrajectory.get_critical_points) for each vehicle id.
+    soc_min : float
+        Minimum SoC of the vehicles.
+    end_soc : float
+        Desired SoC at the end of the time frame.
+
+    Returns
+    -------
+    dict
+        Chosen charging options for each vehicle id, in order of assignment.
+
+    """
+    trajectories = {
+        vehicle_id: trajectory.copy() for vehicle_id, trajectory in requirements.items()
+    }
+    queue = [
+        (-score, -delta, -charge, i)
+        for i, (score, delta, charge) in enumerate(c.rank for c in candidates)
+    ]
+    heapq.heapify(queue)
+    capacity = _ChargerCapacity()
+    used_breaks = set()
+    satisfied_vehicles = set()
+    assignment: Dict[Union[str, int], List[dict]] = {}
+    while queue:
+        candidate = candidates[heapq.heappop(queue)[-1]]
+        vehicle_id = candidate.vehicle_id
+        if (vehicle_id, candidate.break_index) in used_breaks:
+            continue
+        if vehicle_id in satisfied_vehicles or not capacity.fits(candidate):
+            continue
+        capacity.add(candidate)
+        used_breaks.add((vehicle_id, candidate.break_index))
+        assignment.setdefault(vehicle_id, []).append(candidate.option)
+        trajectory = trajectories[vehicle_id]
+        trajectory.apply_delta(
+            candidate.option["timestep"], candidate.option["delta_soc"]
+        )
+        if trajectory.min_soc_satisfied and trajectory.end_soc_satisfied(
+            soc_min, end_soc
+        ):
+            satisfied_vehicles.add(vehicle_id)
+    return assignment
+
+
+def _get_capacity_rows(
+    candidates: List["ChargingCandidate"], indices: List[int]
+) -> List[Tuple[List[int], int]]:
+    """Returns the capacity constraints of the candidates at one location.
+
+    The constraints are checked at the start of every charging event. At each of them, the overlapping
+    candidates can't use more than the free chargers, and candidates that only fit on a set of charging
+    points can't use more than the free points of the set.
+
+    Parameters
+    ----------
+    candidates : list[ChargingCandidate]
+        Scored options of all breaks of the fleet.
+    indices : list[int]
+        Indices of the candidates at the location.
+
+    Returns
+    -------
+    list[tuple]
+        Indices of the candidates in each constraint and their highest number of charging events.
+
+    """
+    location = candidates[indices[0]].location
+    compatible_points: Dict[int, FrozenSet[str]] = {
+        i: frozenset(
+            cp.id for cp in location.get_ranked_points(candidates[i].plug_types)
+        )
+        for i in indices
+        if _uses_points(candidates[i])
+    }
+    rows = []
+    for time_step in sorted({candidates[i].start_time for i in indices}):
+        covering = [
+            i
+            for i in indices
+            if candidates[i].start_time <= time_step <= candidates[i].end_time
+        ]
+        rows.append(
+            (
+                covering,
+                location.num_charging_points
+                - location.get_max_occupation(time_step, time_step),
+            )
+        )
+        for point_ids in {
+            compatible_points[i] for i in covering if i in compatible_points
+        }:
+            free_points = sum(
+                1
+                for point_id in point_ids
+                if not location.get_max_occupation(time_step, time_step, point_id)
+            )
+            rows.append(
+                (
+                    [
+                        i
+                        for i in covering
+                        if i in compatible_points and compatible_points[i] <= point_ids
+                    ],
+                    free_points,
+                )
+            )
+    return rows
+
+
+def assign_charging_milp(
+    candidates: List["ChargingCandidate"],
+    requirements: Dict[Union[str, int], "SocTrajectory"],
+    soc_min: float,
+    end_soc: float,
+    penalty: float = 1000.0,
+):
+    """Assigns charging events to the fleet by solving a mixed integer linear program with SciPy (HiGHS).
+
+    Every candidate is a binary variable. The total score is maximized, subject to one charging event per
+    break, the number of chargers and compatible charging points at each location and the SoC requirements
+    of each vehicle. SoC requirements are soft constraints with a high penalty, so the problem stays
+    feasible if charging isn't sufficient.
+    Falls back to assign_charging_heuristic if SciPy isn't installed or no solution was found.
+
+    Parameters
+    ----------
+    candidates : list[ChargingCandidate]
+        Scored options of all breaks of the fleet.
+    requirements : dict
+        Critical points of the predicted SoC (SocTrajectory.get_critical_points) for each vehicle id.
+    soc_min : float
+        Minimum SoC of the vehicles.
+    end_soc : float
+        Desired SoC at the end of the time frame.
+    penalty : float
+        Objective penalty per missing SoC.
+
+    Returns
+    -------
+    dict
+        Chosen charging options for each vehicle id, best options first.
+
+    """
+    if optimize is None or sparse is None or not hasattr(optimize, "milp"):
+        warnings.warn(
+            "Import Warning: SciPy >= 1.9 is not installed. Heuristic charging assignment is used instead."
+        )
+        return assign_charging_heuristic(candidates, requirements, soc_min, end_soc)
+    num_candidates = len(candidates)
+    if not num_candidates:
+        return {}
+
+    rows: List[int] = []
+    columns: List[int] = []
+    values: List[float] = []
+    lower: List[float] = []
+    upper: List[float] = []
+
+    def add_constraint(entries, lower_bound, upper_bound):
+        for column, value in entries:
+            rows.append(len(lower))
+            columns.append(column)
+            values.append(value)
+        lower.append(lower_bound)
+        upper.append(upper_bound)
+
+    # at most one charging event per break
+    breaks = defaultdict(list)
+    locations = defaultdict(list)
+    vehicles = defaultdict(list)
+    for i, candidate in enumerate(candidates):
+        breaks[(candidate.vehicle_id, candidate.break_index)].append(i)
+        locations[candidate.location.name].append(i)
+        vehicles[candidate.vehicle_id].append(i)
+    for indices in breaks.values():
+        add_constraint([(i, 1.0) for i in indices], -np.inf, 1.0)
+
+    # number of chargers at each location and of the compatible charging points of each plug set
+    for indices in locations.values():
+        for covering, free_chargers in _get_capacity_rows(candidates, indices):
+            add_constraint([(i, 1.0) for i in covering], -np.inf, free_chargers)
+
+    # soc requirements, each with a slack variable
+    num_slacks = 0
+    for vehicle_id, trajectory in requirements.items():
+        targets = list(zip(trajectory.timestep, trajectory.necessary_charging))
+        targets.append(
+            (
+                trajectory.timestep[-1],
+                trajectory.necessary_charging[-1] - (soc_min - end_soc),
+            )
+        )
+        for timestep, necessary_charging in targets:
+            if necessary_charging <= 0:
+                continue
+            entries = [
+                (i, candidates[i].option["delta_soc"])
+                for i in vehicles[vehicle_id]
+                if candidates[i].option["timestep"] <= timestep
+            ]
+            entries.append((num_candidates + num_slacks, 1.0))
+            num_slacks += 1
+            add_constraint(entries, necessary_charging, np.inf)
+
+    num_variables = num_candidates + num_slacks
+    objective = np.concatenate(
+        [[-c.option["score"] for c in candidates], np.full(num_slacks, penalty)]
+    )
+    integrality = np.concatenate([np.ones(num_candidates), np.zeros(num_slacks)])
+    bounds = optimize.Bounds(
+        np.zeros(num_variables),
+        np.concatenate([np.ones(num_candidates), np.full(num_slacks, np.inf)]),
+    )
+    matrix = sparse.coo_matrix(
+        (values, (rows, columns)), shape=(len(lower), num_variables)
+    )
+    result = optimize.milp(
+        objective,
+        constraints=optimize.LinearConstraint(matrix, lower, upper),
+        integrality=integrality,
+        bounds=bounds,
+    )
+    if result.x is None:
+        warnings.warn(
+            f"Charging assignment could not be solved ({result.message}). Heuristic is used instead."
+        )
+        return assign_charging_heuristic(candidates, requirements, soc_min, end_soc)
+
+    chosen = [candidates[i] for i in range(num_candidates) if result.x[i] > 0.5]
+    chosen.sort(key=lambda c: c.rank, reverse=True)
+    # assign the charging points. The constraints per plug set leave a free point for almost every
+    # chosen candidate, the rare ones without a free point are left out.
+    capacity = _ChargerCapacity()
+    assignment: Dict[Union[str, int], List[dict]] = {}
+    for candidate in chosen:
+        if not capacity.fits(candidate):
+            continue
+        capacity.add(candidate)
+        assignment.setdefault(candidate.vehicle_id, []).append(candidate.option)
+    return assignment
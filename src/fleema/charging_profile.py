@@ -0,0 +1,113 @@
+"""This script includes the ChargingProfile class.
+
+Classes
+-------
+ChargingProfile
+"""
+
+import numpy as np
+from typing import Sequence
+
+
+class ChargingProfile:
+    """Charging power of a charging event as runs of constant power.
+
+    Attributes
+    ----------
+    start : numpy.ndarray
+        Start of each run in minutes after the start of the charging event.
+    duration : numpy.ndarray
+        Length of each run in minutes.
+    power : numpy.ndarray
+        Charging power of each run in kW.
+
+    """
+
+    def __init__(self, start, duration, power):
+        """Constructor of the ChargingProfile class.
+
+        Parameters
+        ----------
+        start : array_like
+            Start of each run in minutes after the start of the charging event.
+        duration : array_like
+            Length of each run in minutes.
+        power : array_like
+            Charging power of each run in kW.
+
+        """
+        self.start = np.asarray(start, dtype=np.int64)
+        self.duration = np.asarray(duration, dtype=np.int64)
+        self.power = np.asarray(power, dtype=np.float64)
+
+    def __len__(self):
+        return len(self.power)
+
+    @classmethod
+    def from_intervals(
+        cls, powers: Sequence[float], interval_duration: int
+    ) -> "ChargingProfile":
+        """Creates a profile from intervals of equal length, merging intervals with the same power.
+
+        Parameters
+        ----------
+        powers : list[float]
+            Charging power of each interval in kW.
+        interval_duration : int
+            Length of each interval in minutes.
+
+        Returns
+        -------
+        ChargingProfile
+
+        """
+        power_array: np.ndarray = np.asarray(powers, dtype=np.float64)
+        if not len(power_array):
+            return cls([], [], [])
+        run_starts = np.flatnonzero(np.diff(power_array, prepend=np.nan) != 0)
+        run_ends = np.append(run_starts[1:], len(power_array))
+        return cls(
+            run_starts * interval_duration,
+            (run_ends - run_starts) * interval_duration,
+            power_array[run_starts],
+        )
+
+    @property
+    def total_duration(self) -> int:
+        """Returns the length of the profile in minutes."""
+        return int(self.duration.sum())
+
+    @property
+    def average_power(self) -> float:
+        """Returns the average charging power in kW, 0 for an empty profile."""
+        total_duration = self.total_duration
+        if not total_duration:
+            return 0.0
+        return float((self.power * self.duration).sum() / total_duration)
+
+    def to_array(self, num_values: int) -> np.ndarray:
+        """Returns the power of each minute, cut or filled with zeros to the given length.
+
+        Parameters
+        ----------
+        num_values : int
+            Length of the result.
+
+        Returns
+        -------
+        numpy.ndarray
+            Charging power of each minute after the start of the charging event.
+
+        """
+        values = np.zeros(num_values)
+        in_range = self.start < num_values
+        starts = self.start[in_range]
+        lengths = np.minimum(starts + self.duration[in_range], num_values) - starts
+        # position of every minute of the runs: run start plus offset within the run
+        offsets = np.arange(lengths.sum()) - np.repeat(
+            np.cumsum(lengths) - lengths, lengths
+        )
+        values[np.repeat(starts, lengths) + offsets] = np.repeat(
+            self.power[in_range], lengths
+        )
+        return values
@@ -0,0 +1,85 @@
+"""This script includes functions to save and restore the state of a running simulation.
+
+Functions
+---------
+save_checkpoint, load_checkpoint, find_latest_checkpoint
+
+"""
+
+import gzip
+import os
+import pathlib
+import pickle
+from typing import Optional
+
+CHECKPOINT_NAME = "checkpoint.pkl.gz"
+
+
+def save_checkpoint(save_directory: pathlib.Path, state: dict):
+    """Saves the state of a simulation as compressed pickle in the save directory.
+
+    The file is written to a temporary file first and then replaces the previous checkpoint,
+    so an interrupted write never corrupts the latest checkpoint.
+
+    Parameters
+    ----------
+    save_directory : pathlib.Path
+        Directory of the simulation results.
+    state : dict
+        Objects to save. Objects referenced multiple times are restored as the same object.
+
+    Returns
+    -------
+    pathlib.Path
+        Path of the checkpoint file.
+
+    """
+    save_directory.mkdir(parents=True, exist_ok=True)
+    path = pathlib.Path(save_directory, CHECKPOINT_NAME)
+    temporary_path = path.with_name(f"{CHECKPOINT_NAME}.tmp")
+    with gzip.open(temporary_path, "wb", compresslevel=6) as f:
+        pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(temporary_path, path)
+    return path
+
+
+def load_checkpoint(path: pathlib.Path) -> dict:
+    """Loads a state saved by save_checkpoint.
+
+    Parameters
+    ----------
+    path : pathlib.Path
+        Path of the checkpoint file.
+
+    Returns
+    -------
+    dict
+        Saved state.
+
+    """
+    with gzip.open(path, "rb") as f:
+        return pickle.load(f)
+
+
+def find_latest_checkpoint(
+    results_directory: pathlib.Path, prefix: str
+) -> Optional[pathlib.Path]:
+    """Finds the checkpoint of the latest result directory starting with the given prefix.
+
+    Parameters
+    ----------
+    results_directory : pathlib.Path
+        Directory containing the result directories of all runs.
+    prefix : str
+        Beginning of the result directory names, followed by the date and time of the run.
+
+    Returns
+    -------
+    Optional[pathlib.Path]
+        Path of the checkpoint file, None if there is no checkpoint.
+
+    """
+    checkpoints = sorted(
+        pathlib.Path(results_directory).glob(f"{prefix}_*/{CHECKPOINT_NAME}")
+    )
+    return checkpoints[-1] if checkpoints else None
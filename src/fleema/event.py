@@ -1,8 +1,10 @@
 import pandas as pd
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Optional
 from dataclasses import dataclass, asdict
 from enum import Enum
 
+from fleema.util.helpers import add_slots
+
 if TYPE_CHECKING:
     from fleema.location import Location
 
@@ -16,10 +18,13 @@ class Status(Enum):
     BREAK = "break"
 
 
+@add_slots
 @dataclass
 class Event:
     """Base event dataclass. Includes basic data and representation functions.
 
+    Events are slotted, so they don't have a __dict__ and no other attributes can be set.
+
     Attributes
     ----------
     start_time : int
@@ -40,6 +45,7 @@ class Event:
         return pd.DataFrame.from_dict(self.data_dict)  # TODO test
 
 
+@add_slots
 @dataclass
 class Task(Event):
     """Saves data for a charging, driving or break event.
@@ -60,6 +66,8 @@ class Task(Event):
         Energy drain of the task.
     level_of_loading : float
         Additional load the vehicle carries (from 0 to 1)
+    charging_point : str, optional
+        ID of the charging point assigned to a charging task when its occupation is added.
     """
 
     start_point: "Location"
@@ -69,6 +77,7 @@ class Task(Event):
     delta_soc: float = 0.0
     consumption: float = 0.0
     level_of_loading: float = 0.0
+    charging_point: Optional[str] = None
 
     @property
     def is_calculated(self):
@@ -1,13 +1,15 @@
-from typing import List, TYPE_CHECKING, Optional
+from typing import Dict, FrozenSet, Iterable, List, TYPE_CHECKING, Optional, Tuple
 import pandas as pd
 import numpy as np
 
 
 from fleema.util.helpers import deep_update
 from fleema.event import Status
+from fleema.occupation import Occupation
 
 if TYPE_CHECKING:
-    from fleema.charger import Charger
+    from fleema.charger import Charger, ChargingPoint
+    from fleema.charging_profile import ChargingProfile
     from fleema.event import Task
 
 
@@ -29,7 +31,9 @@ class Location:
         Example: {"power": 50, "load": load_df, "generator": gen_df}
     output : dict
         Comprises information on grid power and connected vehicles in total and for every charging point.
-
+    occupation : pd.DataFrame
+        Number of occupied chargers at every time step in total and for every charging point,
+        created from the occupation trees.
 
     """
 
@@ -61,10 +65,15 @@ class Location:
         self.location_type = location_type
         self.chargers = chargers if chargers else []
         self.grid_info = grid_info
-        self.output = None
+        self.output: Optional[Dict[str, np.ndarray]] = None
         self.event_csv = event_csv
         self.generator_exists = False
-        self.occupation = pd.DataFrame()
+        self._occupation: Dict[str, Occupation] = {}
+        # compatible charging points by plug set, highest power first
+        self._ranked_points: Dict[FrozenSet[str], List["ChargingPoint"]] = {}
+        # compatible charging points by plug set and ID
+        self._compatible_points: Dict[FrozenSet[str], Dict[str, "ChargingPoint"]] = {}
+        self._best_points: Dict[FrozenSet[str], Tuple[Optional[str], float]] = {}
 
     @property
     def num_chargers(self):
@@ -78,6 +87,83 @@ class Location:
         """
         return len(self.chargers)
 
+    @property
+    def charging_points(self) -> List["ChargingPoint"]:
+        """Returns the charging points of all chargers at the location."""
+        return [cp for ch in self.chargers for cp in ch.charging_points]
+
+    def add_charger(self, charger: "Charger"):
+        """Adds a charger to the location and resets the charging points by plug set."""
+        self.chargers.append(charger)
+        self._ranked_points = {}
+        self._compatible_points = {}
+        self._best_points = {}
+
+    def get_ranked_points(self, plug_types: Iterable[str]) -> List["ChargingPoint"]:
+        """Returns the charging points with power for the plug types, highest power first.
+
+        The result is calculated once per plug set. Points with the same power keep their order.
+
+        Parameters
+        ----------
+        plug_types : list[str]
+            Plug types of the vehicle
+
+        """
+        plug_set = frozenset(plug_types)
+        if plug_set not in self._ranked_points:
+            points = [cp for cp in self.charging_points if cp.get_power(plug_set) > 0]
+            points.sort(key=lambda cp: cp.get_power(plug_set), reverse=True)
+            self._ranked_points[plug_set] = points
+            self._compatible_points[plug_set] = {cp.id: cp for cp in points}
+        return self._ranked_points[plug_set]
+
+    def get_best_point(self, plug_types: Iterable[str]) -> Tuple[Optional[str], float]:
+        """Returns the ID of the charging point with the highest power for the plug types and its power.
+
+        The result is calculated once per plug set.
+
+        Parameters
+        ----------
+        plug_types : list[str]
+            Plug types of the vehicle
+
+        Returns
+        -------
+        tuple
+            ID of the point, None if no point fits the plug types, and its power.
+
+        """
+        plug_set = frozenset(plug_types)
+        if plug_set not in self._best_points:
+            best_point: Tuple[Optional[str], float] = (None, 0.0)
+            ranked_points = self.get_ranked_points(plug_set)
+            if ranked_points:
+                best_point = (ranked_points[0].id, ranked_points[0].get_power(plug_set))
+            self._best_points[plug_set] = best_point
+        return self._best_points[plug_set]
+
+    def init_plug_sets(self, plug_sets: Iterable[Iterable[str]]):
+        """Calculates the charging points of the given plug sets in advance, e.g. of all vehicle types."""
+        for plug_types in plug_sets:
+            self.get_best_point(plug_types)
+            for ch in self.chargers:
+                ch.get_best_point(plug_types)
+
+    @property
+    def num_charging_points(self) -> int:
+        """Returns the number of vehicles that can charge at the same time.
+
+        Chargers without charging points count as a single charging point.
+
+        Returns
+        -------
+            int
+                Number of charging points.
+
+        """
+        return sum(max(ch.num_points, 1) for ch in self.chargers)
+
     @property
     def grid_connection(self):
         """This method checks if the grid power is above zero.
@@ -96,14 +182,22 @@ class Location:
         """This methods checks availability."""
         return None
 
-    def init_occupation(self, time_steps):
-        """Creates empty occupation DataFrame."""
-        self.occupation = pd.DataFrame(
-            0,
-            index=np.arange(time_steps),
-            columns=["total"],  # [c.name for c in self.chargers]
+    @property
+    def occupation(self):
+        """Returns the occupation of every time step as DataFrame."""
+        if not self._occupation:
+            return pd.DataFrame()
+        return pd.DataFrame(
+            {name: tree.to_array() for name, tree in self._occupation.items()},
+            index=np.arange(self._occupation["total"].size),
         )
 
+    def init_occupation(self, time_steps):
+        """Creates empty occupation."""
+        self._occupation = {"total": Occupation(time_steps)}
+        for cp in self.charging_points:
+            self._occupation[cp.id] = Occupation(time_steps)
+
     def set_power(self, power: float):
         """Set power of grid connector at this location."""
         if self.grid_info is None:
@@ -116,29 +210,122 @@ class Location:
         self.generator_dict["grid_connector_id"] = "GC1"
         self.generator_exists = True
 
-    def add_occupation_from_event(self, charging_event: "Task"):
-        """Add occupation data from a given charging event."""
+    def add_occupation_from_event(
+        self, charging_event: "Task", plug_types: Optional[List[str]] = None
+    ):
+        """Add occupation data from a given charging event.
+
+        If the plug types of the vehicle are given, the event is assigned to the free charging point
+        with the highest power for them, which is saved in the charging_point of the event. A point
+        that is already saved in the event, e.g. by the charging assignment, is kept if it is free.
+
+        Raises
+        ------
+        ValueError
+            If no compatible charging point is free during the event.
+        """
         if charging_event.task == Status.CHARGING:
-            self.add_occupation(
-                charging_event.start_time, charging_event.end_time, "total"
-            )
+            start_time, end_time = charging_event.start_time, charging_event.end_time
+            if plug_types and self.charging_points:
+                point = self.get_free_charging_point(
+                    start_time, end_time, plug_types, charging_event.charging_point
+                )
+                if point is None:
+                    raise ValueError(
+                        f"No charging point for plug types {plug_types} is free at location {self.name} "
+                        f"from time step {start_time} to {end_time}"
+                    )
+                charging_event.charging_point = point.id
+                self.add_occupation(start_time, end_time, point.id)
+            self.add_occupation(start_time, end_time, "total")
+
+    def get_free_charging_point(
+        self,
+        start_time,
+        end_time,
+        plug_types: List[str],
+        preferred_point: Optional[str] = None,
+    ) -> Optional["ChargingPoint"]:
+        """Returns the charging point with the highest power for the plug types that is free in the time frame.
+
+        The points are checked in the order of get_ranked_points, which is sorted once per plug set.
+        Every check takes O(log n) in the occupation of the point and the search stops at the first free
+        point, so only occupied points with a higher power are checked before it.
+
+        Parameters
+        ----------
+        start_time : int
+            Starting time step
+        end_time : int
+            Ending time step, included
+        plug_types : list[str]
+            Plug types of the charging vehicle
+        preferred_point : str, optional
+            ID of a compatible charging point that is returned first if it is free
+
+        Returns
+        -------
+        Optional[ChargingPoint]
+            Free charging point, None if all compatible charging points are occupied.
+
+        """
+        points = self.get_ranked_points(plug_types)
+        if preferred_point is not None:
+            cp = self._compatible_points[frozenset(plug_types)].get(preferred_point)
+            if cp is not None and self._is_point_free(cp.id, start_time, end_time):
+                return cp
+        for cp in points:
+            if self._is_point_free(cp.id, start_time, end_time):
+                return cp
+        return None
+
+    def _is_point_free(self, point_id: str, start_time, end_time) -> bool:
+        return point_id in self._occupation and not self._occupation[point_id].get_max(
+            start_time, end_time
+        )
 
     def add_occupation(self, start_time, end_time, column_name="total"):
         """Add occupation data."""
         try:
-            self.occupation.loc[start_time:end_time, column_name] += 1
+            self._occupation[column_name].add(start_time, end_time)
         except KeyError:
             print(
                 "Warning: Invalid column name or index range when tracking occupation."
             )
 
-    def is_available(self, start_time, end_time, column_name="total"):
-        """Check if occupation in given time frame reaches the maximum. Returns True if time slot is available"""
+    def is_available(
+        self,
+        start_time,
+        end_time,
+        column_name="total",
+        plug_types: Optional[List[str]] = None,
+    ):
+        """Check if occupation in given time frame reaches the maximum. Returns True if time slot is available
+
+        If plug types are given, a charging point with one of them has to be free as well.
+        """
+        try:
+            max_occupation = self._occupation[column_name].get_max(start_time, end_time)
+        except KeyError:
+            print("Invalid column name or index range.")
+            return None
+        capacity = self.num_charging_points if column_name == "total" else 1
+        if max_occupation >= capacity:
+            return False
+        if plug_types and self.charging_points:
+            return (
+                self.get_free_charging_point(start_time, end_time, plug_types)
+                is not None
+            )
+        return True
+
+    def get_max_occupation(self, start_time, end_time, column_name="total"):
+        """Returns the highest number of occupied chargers in the given time frame."""
         try:
-            values_in_range = self.occupation.loc[start_time:end_time, column_name]
-            return (values_in_range < self.num_chargers).all()
+            return self._occupation[column_name].get_max(start_time, end_time)
         except KeyError:
             print("Invalid column name or index range.")
+            return 0
 
     def get_scenario_info(self, plug_types: List[str], point_id: Optional[str] = None):
         """Create SpiceEV scenario dict for this Location.
@@ -172,23 +359,28 @@ class Location:
             scenario_dict["events"] = {
                 "energy_feed_in": {"GC1 feed-in": self.generator_dict}
             }
+        # create scenario dict for chosen point id or the point with the highest power
+        if point_id is None:
+            point_id = self.get_best_point(plug_types)[0] or ""
         for ch in self.chargers:
-            # create scenario dict for chosen point id or the point with the highest power
-            if point_id is None:
-                point_id = ""
-                highest_power = 0
-                for cp in ch.charging_points:
-                    power = cp.get_power(plug_types)
-                    if power > highest_power:
-                        highest_power = power
-                        point_id = cp.id
-            info = ch.get_scenario_info(point_id, plug_types)
-            deep_update(scenario_dict, info)
+            if any(cp.id == point_id for cp in ch.charging_points):
+                deep_update(scenario_dict, ch.get_scenario_info(point_id, plug_types))
+                break
+        else:
+            raise ValueError(
+                f"Point ID {point_id} doesn't match any Points in location {self.name}"
+            )
 
         return scenario_dict
 
     def update_output(
-        self, start_time, end_time, step_size, time_steps, charging_power_list
+        self,
+        start_time,
+        end_time,
+        step_size,
+        time_steps,
+        charging_profile: "ChargingProfile",
+        point_id: Optional[str] = None,
     ):
         """Records newest output when it is called during the vehicle method charge().
 
@@ -202,37 +394,46 @@ class Location:
             Charging time in steps
         time_steps : int
             Number of steps in the scenario
-        charging_power_list : list
-            Charging power for each step during the charging event
+        charging_profile : ChargingProfile
+            Charging power of the event, its k-th minute is recorded for the k-th step
+        point_id : str, optional
+            ID of the used charging point. Events without a charging point are only recorded in the totals.
+
+        Raises
+        ------
+        ValueError
+            If the charging point isn't part of the location.
 
         """
         if not self.output:
             self.output = {
-                f"{self.name}_total_power": [0 for _ in range(time_steps)],
-                f"{self.name}_total_connected_vehicles": [0 for _ in range(time_steps)],
+                f"{self.name}_total_power": np.zeros(time_steps),
+                f"{self.name}_total_connected_vehicles": np.zeros(
+                    time_steps, dtype=int
+                ),
             }
-            if self.num_chargers > 1:
-                for charger in self.chargers:
-                    self.output[f"{charger.name}_power"] = [
-                        0 for _ in range(time_steps)
-                    ]
-                    self.output[f"{charger.name}_connected_vehicle"] = [
-                        0 for _ in range(time_steps)
-                    ]
-
-        for current_time in range(start_time, end_time, step_size):
-            if current_time > time_steps:
-                print("Charging time is out of time schedule!")
-                break
-            charging_power = (
-                0 if len(charging_power_list) == 0 else charging_power_list.pop(0)
-            )
-            if self.num_chargers > 1:
-                self.output[f"{self.chargers[0].name}_power"][
-                    current_time
-                ] += charging_power
-                self.output[f"{self.chargers[0].name}_connected_vehicle"][
-                    current_time
-                ] += 1
-            self.output[f"{self.name}_total_power"][current_time] += charging_power
-            self.output[f"{self.name}_total_connected_vehicles"][current_time] += 1
+            if len(self.charging_points) > 1:
+                for cp in self.charging_points:
+                    self.output[f"{cp.id}_power"] = np.zeros(time_steps)
+                    self.output[f"{cp.id}_connected_vehicle"] = np.zeros(
+                        time_steps, dtype=int
+                    )
+        num_steps = len(range(start_time, end_time, step_size))
+        if num_steps and start_time + (num_steps - 1) * step_size >= time_steps:
+            print("Charging time is out of time schedule!")
+            num_steps = len(range(start_time, time_steps, step_size))
+        if num_steps <= 0:
+            return
+        # the charging power of each step, steps after the end of the profile don't get power
+        charging_power = charging_profile.to_array(num_steps)
+        steps = slice(start_time, start_time + num_steps * step_size, step_size)
+        keys = [(f"{self.name}_total_power", f"{self.name}_total_connected_vehicles")]
+        if point_id is not None and len(self.charging_points) > 1:
+            if f"{point_id}_power" not in self.output:
+                raise ValueError(
+                    f"Point ID {point_id} doesn't match any Points in location {self.name}"
+                )
+            keys.append((f"{point_id}_power", f"{point_id}_connected_vehicle"))
+        for power_key, vehicles_key in keys:
+            self.output[power_key][steps] += charging_power
+            self.output[vehicles_key][steps] += 1
@@ -0,0 +1,137 @@
+"""This script includes the Occupation class.
+
+Classes
+-------
+Occupation
+"""
+
+import numpy as np
+from typing import List
+
+
+class Occupation:
+    """Number of occupied chargers per time step, stored in a sparse segment tree.
+
+    Adding to a range of time steps and the maximum of a range both take O(log n). Nodes are
+    only created for the ranges that were changed, so the memory depends on the number of
+    charging events instead of the number of time steps. Ranges include their end, like
+    pandas .loc slices, and are cut to the time steps of the occupation.
+
+    Attributes
+    ----------
+    size : int
+        Number of time steps.
+
+    """
+
+    def __init__(self, size: int):
+        """Constructor of the Occupation class.
+
+        Parameters
+        ----------
+        size : int
+            Number of time steps.
+
+        """
+        self.size = size
+        # node 0 is the root. A node adds its tag to all of its time steps
+        # and stores the maximum of its range, missing children are 0.
+        self._left: List[int] = [-1]
+        self._right: List[int] = [-1]
+        self._tag: List[int] = [0]
+        self._max: List[int] = [0]
+
+    def _clip(self, start: int, end: int):
+        return max(start, 0), min(end, self.size - 1)
+
+    def _get_child(self, node: int, left: bool) -> int:
+        children = self._left if left else self._right
+        if children[node] == -1:
+            children[node] = len(self._tag)
+            self._left.append(-1)
+            self._right.append(-1)
+            self._tag.append(0)
+            self._max.append(0)
+        return children[node]
+
+    def _node_max(self, node: int) -> int:
+        return self._max[node] if node != -1 else 0
+
+    def add(self, start: int, end: int, value: int = 1):
+        """Adds a value to all time steps in the range.
+
+        Parameters
+        ----------
+        start : int
+            First time step.
+        end : int
+            Last time step, included.
+        value : int
+            Value to add, negative to free chargers again.
+
+        """
+        start, end = self._clip(start, end)
+        if start > end:
+            return
+        self._add(0, 0, self.size - 1, start, end, value)
+
+    def _add(self, node: int, low: int, high: int, start: int, end: int, value: int):
+        if start <= low and high <= end:
+            self._tag[node] += value
+            self._max[node] += value
+            return
+        middle = (low + high) // 2
+        if start <= middle:
+            self._add(self._get_child(node, True), low, middle, start, end, value)
+        if end > middle:
+            self._add(self._get_child(node, False), middle + 1, high, start, end, value)
+        self._max[node] = self._tag[node] + max(
+            self._node_max(self._left[node]), self._node_max(self._right[node])
+        )
+
+    def get_max(self, start: int, end: int) -> int:
+        """Returns the highest value in the range, 0 if the range is empty.
+
+        Parameters
+        ----------
+        start : int
+            First time step.
+        end : int
+            Last time step, included.
+
+        """
+        start, end = self._clip(start, end)
+        if start > end:
+            return 0
+        return self._get_max(0, 0, self.size - 1, start, end)
+
+    def _get_max(self, node: int, low: int, high: int, start: int, end: int) -> int:
+        if node == -1:
+            return 0
+        if start <= low and high <= end:
+            return self._max[node]
+        middle = (low + high) // 2
+        # the range overlaps at least one of the children
+        results: List[int] = []
+        if start <= middle:
+            results.append(self._get_max(self._left[node], low, middle, start, end))
+        if end > middle:
+            results.append(
+                self._get_max(self._right[node], middle + 1, high, start, end)
+            )
+        return self._tag[node] + max(results)
+
+    def to_array(self) -> np.ndarray:
+        """Returns the value of every time step."""
+        values = np.zeros(self.size, dtype=np.int64)
+        if self.size:
+            self._fill(values, 0, 0, self.size - 1)
+        return values
+
+    def _fill(self, values: np.ndarray, node: int, low: int, high: int):
+        values[low : high + 1] += self._tag[node]
+        middle = (low + high) // 2
+        if self._left[node] != -1:
+            self._fill(values, self._left[node], low, middle)
+        if self._right[node] != -1:
+            self._fill(values, self._right[node], middle + 1, high)
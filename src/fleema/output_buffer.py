@@ -0,0 +1,166 @@
+"""This script includes the OutputBuffer class.
+
+Classes
+-------
+OutputBuffer
+"""
+
+import numpy as np
+import pandas as pd
+from collections.abc import Mapping
+from typing import Dict, List, Optional
+
+from fleema.event import Status
+
+# column types of the vehicle events, in order of the columns in the event files
+EVENT_COLUMNS = {
+    "timestamp": "datetime64[ns]",
+    "event_start": np.int32,
+    "event_time": np.int32,
+    "end_location": "category",
+    "status": "status",
+    "soc_start": np.float64,
+    "soc_end": np.float64,
+    "energy": np.float64,
+    "actual_energy_from_grid": np.float64,
+    "station_charging_capacity": np.float64,
+    "average_charging_power": np.float64,
+    "distance": np.float64,
+    "energy_from_feed_in": np.float64,
+    "energy_from_grid": np.float64,
+    "energy_cost": np.float64,
+    "emission": np.float64,
+    "consumption": np.float64,
+    "level_of_loading": np.float64,
+    "v2g_energy": np.float64,
+}
+
+STATUS_CATEGORIES = list(Status)
+
+
+class OutputBuffer(Mapping):
+    """Growable columnar buffer of events, stored in typed NumPy arrays.
+
+    Strings and statuses are stored as integer codes of their categories. Reading a column
+    returns the filled part of it: a NumPy view for numbers, a DatetimeIndex for timestamps
+    and a pandas Categorical for locations and statuses.
+
+    Attributes
+    ----------
+    columns : dict
+        Type of each column. "category" columns store strings, "status" columns store Status.
+    size : int
+        Number of events in the buffer.
+
+    """
+
+    def __init__(self, columns: Optional[dict] = None, capacity: int = 16):
+        """Constructor of the OutputBuffer class.
+
+        Parameters
+        ----------
+        columns : dict, optional
+            Type of each column. Default is EVENT_COLUMNS.
+        capacity : int
+            Number of events the buffer is allocated for initially.
+
+        """
+        self.columns = dict(EVENT_COLUMNS if columns is None else columns)
+        self.size = 0
+        self.timezone = None
+        self._data: Dict[str, np.ndarray] = {}
+        self._categories: Dict[str, List[str]] = {}
+        self._codes: Dict[str, Dict[str, int]] = {}
+        for name, dtype in self.columns.items():
+            if dtype == "category":
+                self._categories[name] = []
+                self._codes[name] = {}
+            self._data[name] = np.zeros(capacity, dtype=self._storage_type(dtype))
+
+    @staticmethod
+    def _storage_type(dtype):
+        if dtype == "category":
+            return np.int32
+        if dtype == "status":
+            return np.int8
+        if dtype == "datetime64[ns]":
+            return np.int64
+        return dtype
+
+    def __getitem__(self, name: str):
+        dtype = self.columns[name]
+        values = self._data[name][: self.size]
+        if dtype == "category":
+            return pd.Categorical.from_codes(values, categories=self._categories[name])
+        if dtype == "status":
+            return pd.Categorical.from_codes(values, categories=STATUS_CATEGORIES)
+        if dtype == "datetime64[ns]":
+            index = pd.DatetimeIndex(values.view("datetime64[ns]"))
+            if self.timezone is not None:
+                index = index.tz_localize("UTC").tz_convert(self.timezone)
+            return index
+        return values
+
+    def __iter__(self):
+        return iter(self.columns)
+
+    def __len__(self):
+        return len(self.columns)
+
+    def append(self, row: dict):
+        """Adds an event to the buffer, doubling its capacity if it is full.
+
+        Parameters
+        ----------
+        row : dict
+            Value of every column.
+
+        """
+        if self.size == len(self._data[next(iter(self._data))]):
+            self._grow()
+        for name, dtype in self.columns.items():
+            value = row[name]
+            if dtype == "category":
+                codes = self._codes[name]
+                if value not in codes:
+                    codes[value] = len(codes)
+                    self._categories[name].append(value)
+                value = codes[value]
+            elif dtype == "status":
+                value = STATUS_CATEGORIES.index(value)
+            elif dtype == "datetime64[ns]":
+                timestamp = pd.Timestamp(value)
+                if timestamp.tz is not None:
+                    self.timezone = timestamp.tz
+                value = timestamp.value
+            self._data[name][self.size] = value
+        self.size += 1
+
+    def _grow(self):
+        for name, values in self._data.items():
+            grown = np.zeros(max(2 * len(values), 1), dtype=values.dtype)
+            grown[: len(values)] = values
+            self._data[name] = grown
+
+    def to_dataframe(self, start: int = 0, end: Optional[int] = None) -> pd.DataFrame:
+        """Returns the events as DataFrame, without copying the numeric columns.
+
+        Parameters
+        ----------
+        start : int
+            First event of the DataFrame.
+        end : int, optional
+            Excluded last event of the DataFrame. Default is the number of events.
+
+        Returns
+        -------
+        pd.DataFrame
+            One row per event, indexed by the number of the event.
+
+        """
+        end = self.size if end is None else min(end, self.size)
+        return pd.DataFrame(
+            {name: self[name][start:end] for name in self.columns},
+            index=range(start, end),
+            copy=False,
+        )
@@ -14,17 +14,9 @@ import warnings
 
 import matplotlib.pyplot as plt
 import pandas as pd
-import importlib
 
 from fleema.simulation import Simulation
-
-
-def lazy_import(module_name):
-    try:
-        return importlib.import_module(module_name)
-    except ImportError:
-        return None
-
+from fleema.util.helpers import lazy_import
 
 px = lazy_import("plotly.express")
 
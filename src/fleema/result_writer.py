@@ -0,0 +1,136 @@
+"""This script includes the ResultWriter class.
+
+Classes
+-------
+ResultWriter
+"""
+
+import os
+import pathlib
+from typing import Dict, Union, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from fleema.vehicle import Vehicle
+
+
+class ResultWriter:
+    """Writes the events of all vehicles to their csv files in the save directory.
+
+    Events are buffered in the output of each vehicle and appended to the csv files in chunks,
+    so every event is only written once.
+
+    Attributes
+    ----------
+    save_directory : pathlib.Path
+        Directory the event files are saved in.
+    vehicles : dict
+        Dictionary with vehicle ids as keys and Vehicle objects as values.
+    flush_interval : int
+        Number of time steps between two flushes. For 0, events are only written when calling flush().
+    written_rows : dict
+        Number of events already written for each vehicle id.
+    last_flush : int
+        Time step of the last flush.
+
+    """
+
+    def __init__(
+        self,
+        save_directory: pathlib.Path,
+        vehicles: Dict[Union[str, int], "Vehicle"],
+        flush_interval: int = 0,
+    ):
+        """Constructor of the ResultWriter class.
+
+        Parameters
+        ----------
+        save_directory : pathlib.Path
+            Directory the event files are saved in.
+        vehicles : dict
+            Dictionary with vehicle ids as keys and Vehicle objects as values.
+        flush_interval : int
+            Number of time steps between two flushes. Default is 0, which only writes events on flush().
+
+        """
+        self.save_directory = save_directory
+        self.vehicles = vehicles
+        self.flush_interval = flush_interval
+        self.written_rows: Dict[Union[str, int], int] = {}
+        self.last_flush = 0
+
+    def get_state(self) -> dict:
+        """Returns the progress of the writer, including the current size of all event files."""
+        file_sizes = {}
+        for vehicle_id in self.written_rows:
+            path = pathlib.Path(self.save_directory, f"{vehicle_id}_events.csv")
+            if path.exists():
+                file_sizes[vehicle_id] = path.stat().st_size
+        return {
+            "written_rows": dict(self.written_rows),
+            "last_flush": self.last_flush,
+            "file_sizes": file_sizes,
+        }
+
+    def set_state(self, state: dict):
+        """Continues from a state of get_state.
+
+        Event files are cut back to their size at that state, which removes events
+        that were written after the state was saved.
+
+        Parameters
+        ----------
+        state : dict
+            Result of get_state.
+
+        """
+        self.written_rows = dict(state["written_rows"])
+        self.last_flush = state["last_flush"]
+        for vehicle_id, size in state["file_sizes"].items():
+            path = pathlib.Path(self.save_directory, f"{vehicle_id}_events.csv")
+            if path.exists():
+                os.truncate(path, size)
+
+    def update(self, step: int):
+        """Flushes all buffered events if the flush interval has passed since the last flush.
+
+        Parameters
+        ----------
+        step : int
+            Current time step of the simulation.
+
+        """
+        if self.flush_interval > 0 and step - self.last_flush >= self.flush_interval:
+            self.flush()
+            self.last_flush = step
+
+    def flush(self):
+        """Appends all events that haven't been written yet to the csv files of their vehicles."""
+        for vehicle in self.vehicles.values():
+            self.write_vehicle(vehicle)
+
+    def write_vehicle(self, vehicle: "Vehicle"):
+        """Appends the new events of a vehicle to its csv file.
+
+        The file is created with a header on the first write. Vehicles without events don't get a file.
+
+        Parameters
+        ----------
+        vehicle : Vehicle
+            Vehicle to write the events of.
+
+        """
+        if not vehicle.vehicle_type.event_csv:
+            return
+        first_row = self.written_rows.get(vehicle.id, 0)
+        last_row = vehicle.output.size
+        if last_row <= first_row:
+            return
+
+        activity = vehicle.output.to_dataframe(first_row, last_row)
+        activity = activity.round(4)
+        activity.to_csv(
+            pathlib.Path(self.save_directory, f"{vehicle.id}_events.csv"),
+            mode="a" if first_row else "w",
+            header=not first_row,
+        )
+        self.written_rows[vehicle.id] = last_row
@@ -97,7 +97,7 @@ class RideCalc:
                 "soc_delta": 0,
                 "trip_time": 0,
             }
-        trip_time = max(distance / speed * 60, 1)
+        trip_time = self.get_trip_time(origin, destination, speed)
         consumption, soc_delta = self.calculate_consumption(
             vehicle_type, incline, temperature, speed, level_of_loading, distance
         )
@@ -108,6 +108,33 @@ class RideCalc:
             "trip_time": trip_time,
         }
 
+    def get_trip_time(
+        self, origin: "Location", destination: "Location", speed: float
+    ) -> float:
+        """Calculate the driving time of a trip, which doesn't depend on the vehicle type.
+
+        Parameters
+        ----------
+        origin : Location
+            Starting location of trip
+        destination : Location
+            Ending location of trip
+        speed : float
+            Average speed during the given trip. Default speed is used if it isn't above zero.
+
+        Returns
+        -------
+        float
+            Driving time in minutes, at least 1 if the locations aren't the same
+
+        """
+        distance, _ = self.get_location_values(origin, destination)
+        if distance == 0:
+            return 0
+        if speed <= 0:
+            speed = self.defaults["speed"]
+        return max(distance / speed * 60, 1)
+
     def calculate_consumption(
         self,
         vehicle_type: "VehicleType",
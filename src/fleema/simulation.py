@@ -5,14 +5,17 @@ Classes
 Simulation
 """
 
+import bisect
 import configparser as cp
+import dataclasses
 import pathlib
+import numpy as np
 import pandas as pd
 import json
 import datetime
 import warnings
 import math
-from typing import List, Dict, Union
+from typing import List, Dict, Optional, Union
 
 from fleema.location import Location
 from fleema.vehicle import Vehicle, VehicleType
@@ -35,6 +38,15 @@ from fleema.util.conversions import (
 )
 from fleema.util.helpers import block_printing, read_input_data
 
+# weight of each score component of evaluate_charging_location, in order of summation
+SCORE_WEIGHTS = {
+    "time_score": "time_factor",
+    "charge_score": "energy_factor",
+    "cost_score": "cost_factor",
+    "local_feed_in_score": "local_renewables_factor",
+    "soc_score": "soc_factor",
+}
+
 
 class Simulation:
     """This class can import a specified config directory and build a Simulation out of the given scenario.
@@ -55,6 +67,38 @@ class Simulation:
         End date of the simulation.
     num_threads : int
         Number of threads to determine the concurrency of the simulation.
+    parallel_planning : bool
+        Plan the charging slots of all vehicles in num_threads worker processes.
+    collect_break_evaluations : bool
+        Evaluate every distinct break of the vehicles that need charging once before planning them, instead
+        of evaluating breaks while planning each vehicle. Always done with parallel_planning.
+    planning_mode : str
+        "greedy" plans vehicles one after another, "global" assigns charging events to the whole fleet at once.
+    global_solver : str
+        Solver of the global planning mode, "heuristic" or "milp".
+    planning_horizon : int
+        Number of days that are planned and simulated at once, 0 plans the whole simulation period at once.
+    checkpoint_interval : int
+        Number of days between two checkpoints of the simulation state, 0 disables checkpoints.
+    plan_only : bool
+        Only plan the charging events and export the planned tasks, without simulating them.
+    break_soc_resolution : float
+        SoC at the start of breaks is rounded down to this step, so more breaks share their evaluation.
+        0 keeps the exact SoC.
+    reuse_day_plans : bool
+        Reuse the charging plan of a vehicle for planning windows that repeat an already planned one.
+    reuse_soc_step : float
+        Size of the start SoC buckets that are treated as equal when looking for repeated windows.
+    reuse_price_classes : int
+        Number of classes prices and feed-in are divided into when looking for repeated windows.
+    planning_time_budget : float
+        Wall-clock time in seconds for planning each window. Once it's used up, only stored evaluations are
+        used for the rest of the window. Vehicles that can't reach the minimum SoC with them keep the best plan
+        found so far and are listed in the planning report, no ride is deleted because of the budget.
+        0 disables the budget.
+    keep_evaluations : bool
+        Keep the evaluations of all planning windows for rescoring with Schedule.replan. Otherwise they are
+        only kept during the planning of a window.
     schedule : pandas.core.frame.DataFrame
         Pandas Dataframe with information about the specific route of the given vehicle fleet.
     vehicle_types : dict
@@ -66,6 +110,9 @@ class Simulation:
         as values.
     weights : dict
         Dictionary with weight factors for all criteria of the charging point evaluation function.
+    evaluation_components : dict
+        Unweighted score components and tasks of the charging location evaluations of the current planning
+        window, or of all windows if keep_evaluations is set. Used for rescoring.
 
     """
 
@@ -109,9 +156,25 @@ class Simulation:
         )
         self.end_of_day_steps = None
         self.num_threads = cfg_dict["num_threads"]
+        self.parallel_planning = cfg_dict["parallel_planning"]
+        self.collect_break_evaluations = cfg_dict["collect_break_evaluations"]
+        self.planning_mode = cfg_dict["planning_mode"]
+        self.global_solver = cfg_dict["global_solver"]
+        self.planning_horizon = cfg_dict["planning_horizon"]
+        self.checkpoint_interval = cfg_dict["checkpoint_interval"]
+        self.plan_only = cfg_dict["plan_only"]
+        self.break_soc_resolution = cfg_dict["break_soc_resolution"]
+        self.reuse_day_plans = cfg_dict["reuse_day_plans"]
+        self.reuse_soc_step = cfg_dict["reuse_soc_step"]
+        self.reuse_price_classes = cfg_dict["reuse_price_classes"]
+        self.planning_time_budget = cfg_dict["planning_time_budget"]
+        self.keep_evaluations = cfg_dict["keep_evaluations"]
         self.simulation_type = cfg_dict["simulation_type"]
         self.weights = cfg_dict["weights"]
         self.outputs = cfg_dict["outputs"]
+        self.output_flush_interval = int(
+            cfg_dict["output_flush_interval"] / self.step_size
+        )
         self.ignore_spice_ev_warnings = cfg_dict["ignore_spice_ev_warnings"]
         self.average_speed = cfg_dict["defaults"]["speed"]
         self.inputs = cfg_dict["inputs"]
@@ -123,8 +186,9 @@ class Simulation:
         ]
         self.spiceev_horizon = cfg_dict["spiceev_horizon"]
 
+        self.scenario_name = cfg_dict["scenario_name"]
         save_directory_name = "{}_{}_{}".format(
-            cfg_dict["scenario_name"],
+            self.scenario_name,
             self.simulation_type,
             datetime.datetime.now().strftime("%Y-%m-%d_%H%M%S"),
         )
@@ -139,6 +203,12 @@ class Simulation:
         self.max_cost = self.cost_time_series[self.cost_options["column"]].max()
         self.min_cost = self.cost_time_series[self.cost_options["column"]].min()
         self.feed_in_cost = cfg_dict["feed_in_cost"]
+        # detour times to all charging locations per pair of locations, see get_reachable_locations
+        self.reachability_index: Dict[tuple, tuple] = {}
+        # unweighted evaluations by their arguments, None if the location can't be used
+        self.evaluation_components: Dict[tuple, Optional[dict]] = {}
+        # feed-in time series of the generators, loaded on demand by get_price_profile
+        self.feed_in_time_series: Dict[str, pd.Series] = {}
         self.emission = data_dict["emission"]
         self.emission_options = cfg_dict["emission_options"]
         self.emission_options["start_time"] = datetime.datetime.combine(
@@ -161,6 +231,8 @@ class Simulation:
             temperature_option,
             cfg_dict["defaults"],
         )
+        # upper bounds of the score components that depend on SpiceEV, see get_score_bound
+        self.max_component_scores = self._get_max_component_scores()
 
         # use other args to create objects
         self.vehicle_types: Dict[str, "VehicleType"] = {}
@@ -195,7 +267,7 @@ class Simulation:
             charger = Charger.from_json(
                 name, info["number_charging_points"], plug_types
             )
-            self.locations[name].chargers.append(charger)
+            self.locations[name].add_charger(charger)
             self.locations[name].init_occupation(self.time_steps)
             if "grid_connection" in info:
                 self.locations[name].set_power(float(info["grid_connection"]))
@@ -205,12 +277,80 @@ class Simulation:
                 self.locations[name].set_power(50.0)
             if not self.locations[name] in self.charging_locations:
                 self.charging_locations.append(self.locations[name])
+        for location in self.charging_locations:
+            location.init_plug_sets(
+                vehicle_type.plugs for vehicle_type in self.vehicle_types.values()
+            )
 
         # Instantiation of observer
         self.observer = SimulationState()
 
+    def get_price_profile(self, start: int, end: int, num_classes: int = 10):
+        """Returns the classes of the energy prices and the feed-in of all generators in the given time frame.
+
+        Every value is classified by its position between the minimum and maximum of its time series,
+        so time frames whose prices only differ slightly get the same profile. Time frames with the same
+        profile are expected to get the same charging plan if everything else is equal.
+
+        Parameters
+        ----------
+        start : int
+            Starting time step
+        end : int
+            Excluded ending time step
+        num_classes : int
+            Number of classes between the minimum and maximum of each time series
+
+        Returns
+        -------
+        tuple
+            Classes of the values of the cost time series and of the feed-in of every charging location
+        """
+        start_time = self.start_date + datetime.timedelta(
+            minutes=start * self.step_size
+        )
+        end_time = self.start_date + datetime.timedelta(minutes=end * self.step_size)
+
+        def values_in_time_frame(series, series_start, step_duration):
+            series_start = datetime.datetime.fromisoformat(str(series_start))
+            first = int((start_time - series_start).total_seconds() // step_duration)
+            last = -int(-(end_time - series_start).total_seconds() // step_duration)
+            values = series.iloc[max(first, 0) : max(last, 0)].to_numpy()
+            low, high = series.min(), series.max()
+            if high <= low:
+                return (0,) * len(values)
+            classes = np.floor((values - low) / (high - low) * num_classes)
+            return tuple(int(c) for c in np.clip(classes, 0, num_classes - 1))
+
+        profile = [
+            values_in_time_frame(
+                self.cost_time_series[self.cost_options["column"]],
+                self.cost_options["start_time"],
+                self.cost_options["step_duration"],
+            )
+        ]
+        for location in self.charging_locations:
+            if not location.generator_exists:
+                continue
+            generator = location.generator_dict
+            if location.name not in self.feed_in_time_series:
+                feed_in = pd.read_csv(generator["csv_file"])[generator["column"]]
+                self.feed_in_time_series[location.name] = feed_in * generator.get(
+                    "factor", 1
+                )
+            profile.append(
+                values_in_time_frame(
+                    self.feed_in_time_series[location.name],
+                    generator["start_time"],
+                    generator["step_duration_s"],
+                )
+            )
+        return tuple(profile)
+
     def get_end_of_day_timestep(self, step):
-        """Returns the last time step of the day of the given step.
+        """Returns the end of the day of the given step, which is the first time step of the next day.
+
+        The last day ends with the end of the simulation period.
 
         Parameters
         ----------
@@ -223,29 +363,115 @@ class Simulation:
             End of day time step
         """
         if self.end_of_day_steps is None:
-            steps_per_day = 1440 / self.step_size
-            days = int(self.time_steps / steps_per_day)
-            self.end_of_day_steps = [d * steps_per_day for d in range(days)]
+            steps_per_day = int(1440 / self.step_size)
+            self.end_of_day_steps = list(
+                range(steps_per_day, self.time_steps, steps_per_day)
+            ) + [self.time_steps]
         for i in self.end_of_day_steps:
             if step < i:
-                return step
+                return i
         raise ValueError(
             f"Step {step} higher than end of day time steps: {self.end_of_day_steps}"
         )
 
     def vehicles_from_schedule(self):
         """Creates vehicle objects from the schedule."""
-        vehicle_ids = self.schedule.groupby(by="vehicle_id")
-        for vehicle_id, index in vehicle_ids.groups.items():
-            vehicle_type = self.schedule.loc[index, "vehicle_type"].unique()  # type: ignore
-            if len(vehicle_type) != 1:
-                raise ValueError(
-                    f"Vehicle number {vehicle_id} has multiple vehicle types assigned to it!"
-                )
+        vehicle_types = self.schedule.groupby(by="vehicle_id")["vehicle_type"].agg(
+            ["nunique", "first"]
+        )
+        invalid = vehicle_types.index[vehicle_types["nunique"] != 1]
+        if len(invalid):
+            raise ValueError(
+                f"Vehicle number {invalid[0]} has multiple vehicle types assigned to it!"
+            )
+        for vehicle_id, vehicle_type in vehicle_types["first"].items():
             self.vehicles[vehicle_id] = Vehicle(
-                vehicle_id, self.vehicle_types[vehicle_type[0]]
+                vehicle_id, self.vehicle_types[vehicle_type]
             )
 
+    def tasks_from_schedule(self):
+        """Creates Tasks from all rows of the schedule and adds them to the vehicles.
+
+        Produces the same tasks as task_from_schedule for every row. Departure and arrival times are
+        converted at once and trips are only calculated once for every combination of route,
+        vehicle type, departure hour and level of loading.
+
+        """
+        schedule = self.schedule
+        departures = pd.to_datetime(
+            schedule["departure_time"].str.strip(), format="%Y-%m-%d %H:%M:%S"
+        )
+        arrivals = pd.to_datetime(
+            schedule["arrival_time"].str.strip(), format="%Y-%m-%d %H:%M:%S"
+        )
+        dep_times = self.datetimes_to_timesteps(departures)
+        arr_times = self.datetimes_to_timesteps(arrivals)
+        # trips only depend on these values, the temperature is looked up by the departure hour
+        trip_columns = pd.DataFrame(
+            {
+                "departure_name": schedule["departure_name"],
+                "arrival_name": schedule["arrival_name"],
+                "vehicle_type": schedule["vehicle_id"].map(
+                    lambda vehicle_id: self.vehicles[vehicle_id].vehicle_type.name
+                ),
+                "hour": departures.dt.hour,
+                "level_of_loading": schedule["level_of_loading"],
+            }
+        )
+        trip_ids = trip_columns.groupby(
+            list(trip_columns.columns), sort=False, dropna=False
+        ).ngroup()
+        trips = {}
+        for index, trip_id in trip_ids.drop_duplicates().items():
+            row = schedule.loc[index]
+            trips[trip_id] = self.driving_sim.calculate_trip(
+                self.locations[row.departure_name],
+                self.locations[row.arrival_name],
+                self.vehicles[row.vehicle_id].vehicle_type,
+                self.average_speed,
+                row.departure_time,
+                row["level_of_loading"],
+            )
+
+        for (
+            vehicle_id,
+            departure_name,
+            arrival_name,
+            level_of_loading,
+            dep_time,
+            arr_time,
+            trip_id,
+        ) in zip(
+            schedule["vehicle_id"],
+            schedule["departure_name"],
+            schedule["arrival_name"],
+            schedule["level_of_loading"],
+            dep_times,
+            arr_times,
+            trip_ids,
+        ):
+            trip = trips[trip_id]
+            if trip["trip_time"] == 0:
+                continue
+            calc_time = dep_time + int(round(trip["trip_time"], 0))
+            if calc_time > arr_time:
+                warnings.warn(
+                    f"""Calculated time for trip {departure_name} to {arrival_name} is higher than in schedule.
+                (Calculated: {calc_time - dep_time}, schedule: {arr_time - dep_time})\n"""
+                )
+            task = Task(
+                dep_time,
+                arr_time,
+                self.locations[departure_name],
+                self.locations[arrival_name],
+                Status.DRIVING,
+                float_time=trip["trip_time"],
+                delta_soc=trip["soc_delta"],
+                consumption=trip["consumption"],
+                level_of_loading=level_of_loading,
+            )
+            self.vehicles[vehicle_id].add_task(task)
+
     def task_from_schedule(self, row):  # TODO move function to vehicle?
         """Creates Task from a specified schedule row and adds it to the vehicle.
 
@@ -288,10 +514,17 @@ class Simulation:
         )
         vehicle.add_task(task)
 
-    def run(self):
-        """Creates SimulationType object depending on self.simulation_type and runs it."""
+    def run(self, resume=False):
+        """Creates SimulationType object depending on self.simulation_type and runs it.
+
+        Parameters
+        ----------
+        resume : bool
+            Continue from the latest checkpoint of this scenario instead of starting a new run.
+
+        """
         sim = class_from_str(self.simulation_type)(self)
-        sim.run()
+        sim.run(resume=resume)
 
     def datetime_to_timesteps(self, datetime_str):  # TODO move to conversions
         """Converts a given datetime string into a time step.
@@ -311,6 +544,23 @@ class Simulation:
         diff_in_minutes = delta.total_seconds() / 60
         return int(diff_in_minutes / self.step_size)
 
+    def datetimes_to_timesteps(self, datetimes: pd.Series) -> pd.Series:
+        """Converts a series of datetimes into time steps, like datetime_to_timesteps does for a single string.
+
+        Parameters
+        ----------
+        datetimes : pd.Series
+            Series of datetime64 values
+
+        Returns
+        -------
+        pd.Series
+            Corresponding time steps
+
+        """
+        diff_in_minutes = (datetimes - self.start_date).dt.total_seconds() / 60
+        return (diff_in_minutes / self.step_size).astype(int)
+
     def call_spiceev(
         self,
         location: "Location",
@@ -377,6 +627,147 @@ class Simulation:
 
         return scenario_main
 
+    def get_reachable_locations(
+        self,
+        current_location: "Location",
+        next_location: "Location",
+        time_window: int,
+        by_detour: bool = False,
+    ) -> List["Location"]:
+        """Returns the charging locations that can be visited between two locations in the given time.
+
+        For each pair of locations, the detour times over all charging locations are calculated once
+        and kept sorted, so the reachable locations are found with a binary search.
+
+        Parameters
+        ----------
+        current_location : Location
+            Location of the vehicle
+        next_location : Location
+            Starting location of the vehicles next task
+        time_window : int
+            Number of time steps available for driving to and from the charging location
+        by_detour : bool
+            Sort the locations by their detour instead of the order of self.charging_locations
+
+        Returns
+        -------
+        list[Location]
+            Charging locations whose detour is shorter than the time window
+        """
+        detour_times, indices = self._get_detour_times(current_location, next_location)
+        reachable = indices[: bisect.bisect_left(detour_times, time_window)]
+        if not by_detour:
+            reachable = sorted(reachable)
+        return [self.charging_locations[i] for i in reachable]
+
+    def _get_detour_times(
+        self, current_location: "Location", next_location: "Location"
+    ) -> tuple:
+        """Returns the sorted detour times over all charging locations between two locations.
+
+        Returns
+        -------
+        tuple[list[int], list[int]]
+            Detour times in ascending order and the index of the charging location of each detour
+        """
+        key = (current_location.name, next_location.name)
+        if key not in self.reachability_index:
+            detours = sorted(
+                (
+                    int(
+                        self.driving_sim.get_trip_time(
+                            current_location, location, self.average_speed
+                        )
+                        + self.driving_sim.get_trip_time(
+                            location, next_location, self.average_speed
+                        )
+                    ),
+                    i,
+                )
+                for i, location in enumerate(self.charging_locations)
+            )
+            self.reachability_index[key] = (
+                [detour for detour, _ in detours],
+                [i for _, i in detours],
+            )
+        return self.reachability_index[key]
+
+    def get_score_bound(
+        self,
+        vehicle_type: "VehicleType",
+        current_location: "Location",
+        next_location: "Location",
+        time_window: int,
+        current_soc: float,
+    ) -> float:
+        """Returns an upper bound of the score of all charging locations for a break, without calling SpiceEV.
+
+        The time score is bounded by the shortest detour, the other components by
+        self.max_component_scores. V2G vehicle types and negative weights have no bound.
+
+        Parameters
+        ----------
+        vehicle_type : VehicleType
+            Vehicle type of the vehicle that wants to charge
+        current_location : Location
+            Location of the vehicle
+        next_location : Location
+            Starting location of the vehicles next task
+        time_window : int
+            Number of time steps of the break
+        current_soc : float
+            SoC of vehicle before charging
+
+        Returns
+        -------
+        float
+            Highest possible score of evaluate_charging_location, math.inf if unknown
+        """
+        detour_times, _ = self._get_detour_times(current_location, next_location)
+        if not detour_times or detour_times[0] >= time_window:
+            return 0
+        if vehicle_type.v2g:
+            return math.inf
+        max_scores = dict(
+            self.max_component_scores,
+            time_score=1 - detour_times[0] / time_window,
+            soc_score=0.1 if current_soc < 0.8 else 0,
+        )
+        bound = 0
+        for component, factor in SCORE_WEIGHTS.items():
+            weight = self.weights[factor]
+            if weight < 0:
+                return math.inf
+            if weight > 0:
+                bound += max_scores[component] * weight
+        # allow for rounding errors of the actual score
+        return bound + 1e-9
+
+    def _get_max_component_scores(self) -> Dict[str, float]:
+        """Returns upper bounds of the score components that depend on SpiceEV, for vehicles without V2G.
+
+        The charge score can't exceed 1 as long as driving doesn't charge the vehicle. The cost per charged
+        energy can't be lower than the lowest price or the feed-in cost, as long as both aren't negative.
+
+        Returns
+        -------
+        dict
+            Bound of the charge, cost and local feed-in score, math.inf if unknown
+        """
+        consumption = self.driving_sim.consumption_table["consumption"]
+        lowest_cost = min(self.min_cost, self.feed_in_cost)
+        max_cost_score = self.max_cost - self.min_cost
+        return {
+            "charge_score": 1 if consumption.min() >= 0 else math.inf,
+            "cost_score": (
+                (self.max_cost - lowest_cost) / max_cost_score
+                if lowest_cost >= 0 and max_cost_score > 0
+                else math.inf
+            ),
+            "local_feed_in_score": 1,
+        }
+
     @block_printing
     def evaluate_charging_location(
         self,
@@ -387,9 +778,14 @@ class Simulation:
         start_time: int,
         end_time: int,
         current_soc: float,
+        cached_only: bool = False,
     ):
         """Gives a grade to a charging location.
 
+        The score is the weighted sum of the score components in SCORE_WEIGHTS. The unweighted
+        components are stored in self.evaluation_components, so repeated evaluations, also with
+        other weights, don't calculate the trips and call SpiceEV again.
+
         Parameters
         ----------
         vehicle_type : VehicleType
@@ -406,14 +802,84 @@ class Simulation:
             Ending time step of the time window
         current_soc : float
             SoC of vehicle before charging
+        cached_only : bool
+            Only rescore a stored evaluation, don't calculate a new one
 
         Returns
         -------
-        dict[int, float, float, float, float, Task, Optional[Task], Optional[Task]]
+        Optional[dict[int, float, float, float, float, Task, Optional[Task], Optional[Task]]]
             Keys: "timestep", "score", "consumption" (soc delta), "charge" (soc delta), "delta_soc" (total soc delta),
-            "charge_event", Optional: "task_to", "task_from"
+            "charge_event", "components", Optional: "task_to", "task_from".
+            None if cached_only is set and there is no stored evaluation.
 
         """
+        key = (
+            vehicle_type.name,
+            charging_location.name,
+            current_location.name,
+            next_location.name,
+            start_time,
+            end_time,
+            current_soc,
+        )
+        if key not in self.evaluation_components:
+            if cached_only:
+                return None
+            self.evaluation_components[key] = self._evaluate_charging_components(
+                vehicle_type,
+                charging_location,
+                current_location,
+                next_location,
+                start_time,
+                end_time,
+                current_soc,
+            )
+        return self.score_evaluation(self.evaluation_components[key], start_time)
+
+    def get_score(self, components: dict, weights: Optional[dict] = None) -> float:
+        """Returns the weighted sum of the score components of an evaluation.
+
+        Parameters
+        ----------
+        components : dict
+            Unweighted score for each key of SCORE_WEIGHTS
+        weights : dict, optional
+            Weight factors as in self.weights, default is self.weights
+
+        Returns
+        -------
+        float
+            Score of the evaluation
+        """
+        if weights is None:
+            weights = self.weights
+        return sum(
+            components[component] * weights[factor]
+            for component, factor in SCORE_WEIGHTS.items()
+        )
+
+    def score_evaluation(
+        self,
+        evaluation: Optional[dict],
+        start_time: int,
+        weights: Optional[dict] = None,
+    ) -> dict:
+        """Rates a stored evaluation from its score components.
+
+        Parameters
+        ----------
+        evaluation : dict, optional
+            Entry of self.evaluation_components
+        start_time : int
+            Starting time step of the time window
+        weights : dict, optional
+            Weight factors as in self.weights, default is self.weights
+
+        Returns
+        -------
+        dict
+            Result as returned by evaluate_charging_location, with its own copies of the tasks
+        """
         # return value in case of failure
         empty_dict = {
             "timestep": start_time,
@@ -422,6 +888,39 @@ class Simulation:
             "charge": 0,
             "delta_soc": 0,
         }
+        if evaluation is None:
+            return empty_dict
+        score = self.get_score(evaluation["components"], weights)
+        if score <= 0:
+            return empty_dict
+        result_dict = dict(evaluation, score=score)
+        for task_key in ["charge_event", "task_to", "task_from"]:
+            if task_key in result_dict:
+                result_dict[task_key] = dataclasses.replace(result_dict[task_key])
+        return result_dict
+
+    def _evaluate_charging_components(
+        self,
+        vehicle_type: "VehicleType",
+        charging_location: "Location",
+        current_location: "Location",
+        next_location: "Location",
+        start_time: int,
+        end_time: int,
+        current_soc: float,
+    ):
+        """Calculates the unweighted score components of a charging location.
+
+        Parameters are the same as in evaluate_charging_location.
+
+        Returns
+        -------
+        Optional[dict]
+            Keys: "timestep", "consumption" (soc delta), "charge" (soc delta), "delta_soc" (total soc delta),
+            "charge_event", "components", Optional: "task_to", "task_from".
+            None if the location can't be used for charging in the time window.
+
+        """
         # run pre calculations
         time_window = end_time - start_time
         # TODO add load level on location eval?
@@ -436,7 +935,7 @@ class Simulation:
         # score the time spent charging and driving
         time_score = 1 - (driving_time / time_window)
         if time_score <= 0:
-            return empty_dict
+            return None
         # call spiceev to calculate charging
         charging_start = int(start_time + round(trip_to["trip_time"], 0))
         charging_time = time_window - driving_time
@@ -450,17 +949,17 @@ class Simulation:
             mock_vehicle,
         )
         if spiceev_scenario is None:
-            return empty_dict
+            return None
 
         charged_soc = (
             spiceev_scenario.strat.world_state.vehicles[mock_vehicle.id].battery.soc
             - charge_start_soc
         )
         if (charged_soc <= 0 and not vehicle_type.v2g) or math.isnan(charged_soc):
-            return empty_dict
+            return None
         charge_score = max(1 - ((-drive_soc) / charged_soc), 0)
         if charge_score == 0 and not vehicle_type.v2g:
-            return empty_dict
+            return None
 
         charging_result = get_charging_characteristic(
             spiceev_scenario,
@@ -489,15 +988,6 @@ class Simulation:
         local_feed_in_score = charging_result["feed_in"]
         soc_score = 0.1 if current_soc < 0.8 else 0  # TODO improve this formula
         # TODO maybe add specific v2g score
-        score = (
-            time_score * self.weights["time_factor"]
-            + charge_score * self.weights["energy_factor"]
-            + cost_score * self.weights["cost_factor"]
-            + local_feed_in_score * self.weights["local_renewables_factor"]
-            + soc_score * self.weights["soc_factor"]
-        )
-        if score <= 0:
-            return empty_dict
 
         charge_event = Task(
             charging_start,
@@ -509,11 +999,17 @@ class Simulation:
         )
         result_dict = {
             "timestep": start_time,
-            "score": score,
             "consumption": drive_soc,
             "charge": charged_soc,
             "delta_soc": charged_soc + drive_soc,
             "charge_event": charge_event,
+            "components": {
+                "time_score": time_score,
+                "charge_score": charge_score,
+                "cost_score": cost_score,
+                "local_feed_in_score": local_feed_in_score,
+                "soc_score": soc_score,
+            },
         }
         # create drive to and drive from charging point
         if current_location is not charging_location:
@@ -649,6 +1145,7 @@ class Simulation:
 
         if no_outputs_mode:
             outputs = {key: False for key in outputs}
+        output_flush_interval = cfg.getint("outputs", "flush_interval", fallback=0)
 
         # parse weights
         weights_dict = {
@@ -683,10 +1180,46 @@ class Simulation:
             "start_date": start_date,
             "end_date": end_date,
             "num_threads": cfg.getint("sim_params", "num_threads", fallback=1),
+            "parallel_planning": cfg.getboolean(
+                "sim_params", "parallel_planning", fallback=False
+            ),
+            "collect_break_evaluations": cfg.getboolean(
+                "sim_params", "collect_break_evaluations", fallback=False
+            ),
+            "planning_mode": cfg.get("sim_params", "planning_mode", fallback="greedy"),
+            "global_solver": cfg.get(
+                "sim_params", "global_solver", fallback="heuristic"
+            ),
+            "planning_horizon": cfg.getint(
+                "sim_params", "planning_horizon", fallback=0
+            ),
+            "checkpoint_interval": cfg.getint(
+                "sim_params", "checkpoint_interval", fallback=0
+            ),
+            "plan_only": cfg.getboolean("sim_params", "plan_only", fallback=False),
+            "break_soc_resolution": cfg.getfloat(
+                "sim_params", "break_soc_resolution", fallback=0
+            ),
+            "reuse_day_plans": cfg.getboolean(
+                "sim_params", "reuse_day_plans", fallback=False
+            ),
+            "reuse_soc_step": cfg.getfloat(
+                "sim_params", "reuse_soc_step", fallback=0.05
+            ),
+            "reuse_price_classes": cfg.getint(
+                "sim_params", "reuse_price_classes", fallback=10
+            ),
+            "planning_time_budget": cfg.getfloat(
+                "sim_params", "planning_time_budget", fallback=0
+            ),
+            "keep_evaluations": cfg.getboolean(
+                "sim_params", "keep_evaluations", fallback=False
+            ),
             "step_size": cfg.getint("basic", "step_size", fallback=1),
             "simulation_type": cfg.get("basic", "simulation_type", fallback="schedule"),
             "weights": weights_dict,
             "outputs": outputs,
+            "output_flush_interval": output_flush_interval,
             "scenario_data_path": scenario_data_path,
             "scenario_name": config_path.stem,
             "cost_options": cost_options,
@@ -723,6 +1256,15 @@ class Simulation:
             "spiceev_horizon": cfg.getint("charging", "spiceev_horizon", fallback=1),
         }
 
+        if cfg_dict["planning_mode"] not in ("greedy", "global"):
+            raise ValueError(
+                f"Planning mode {cfg_dict['planning_mode']} is not supported, use greedy or global"
+            )
+        if cfg_dict["global_solver"] not in ("heuristic", "milp"):
+            raise ValueError(
+                f"Global solver {cfg_dict['global_solver']} is not supported, use heuristic or milp"
+            )
+
         data_dict = read_input_data(scenario_data_path, cfg)
 
         return Simulation(
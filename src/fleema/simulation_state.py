@@ -1,6 +1,7 @@
+from typing import Optional
+
 from fleema.vehicle import Vehicle
 from fleema.event import Status
-from fleema.util.helpers import deep_update
 
 import json
 
@@ -36,13 +37,21 @@ class SimulationState:
             while vehicle in current_list:
                 current_list.remove(vehicle)
 
-    def add_all_vehicle_events(self, vehicle: "Vehicle"):
-        """Adds all events of a given vehicle to self.events and all charging events to their respective Location."""
-        deep_update(self.events, vehicle.tasks)
-
-        for task in vehicle.tasks.values():
+    def add_all_vehicle_events(
+        self, vehicle: "Vehicle", start: int = 0, end: Optional[int] = None
+    ):
+        """Adds the events of a given vehicle to self.events and its charging events to their respective Location.
+
+        Only events starting in the time frame from start to end are added, so that already planned time
+        frames aren't visited again and don't get occupied twice. Each charging event is assigned to a
+        charging point of its location.
+        """
+        for task in vehicle.get_tasks(start, end):
+            self.events[task.start_time] = task
             if task.task == Status.CHARGING:
-                task.start_point.add_occupation_from_event(task)
+                task.start_point.add_occupation_from_event(
+                    task, vehicle.vehicle_type.plugs
+                )
 
     def update_vehicle(self, vehicle: "Vehicle"):
         """Adds given vehicle to the right list according to its status."""
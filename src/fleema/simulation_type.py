@@ -1,10 +1,13 @@
 from importlib import import_module
 from typing import TYPE_CHECKING
-import pandas as pd
 
 from fleema.util.conversions import step_to_timestamp
 from fleema.event import Status
-from fleema.spiceev_interface import get_charging_characteristic
+from fleema.soc_trajectory import SocTrajectory
+from fleema.spiceev_interface import (
+    get_charging_characteristic,
+    get_charging_profile,
+)
 
 if TYPE_CHECKING:
     from fleema.simulation import Simulation
@@ -69,6 +72,8 @@ class SimulationType:
                 task.consumption = trip["consumption"]
                 task.delta_soc = trip["soc_delta"]
                 task.float_time = trip["trip_time"]
+                if vehicle.get_task(task.start_time) is task:
+                    vehicle.update_task_soc(task)
             distance, _ = self.simulation.driving_sim.get_location_values(
                 task.start_point, task.end_point
             )
@@ -90,6 +95,7 @@ class SimulationType:
                 task.start_time,
                 task.end_time,
                 vehicle,
+                task.charging_point,
             )
             # charged_soc = spiceev_scenario.socs[-1][0] - vehicle.soc
             # print(task.delta_soc, charged_soc, vehicle.soc)
@@ -107,13 +113,8 @@ class SimulationType:
             # report = aggregate_local_results(spiceev_scenario, "GC1")
 
             # calculate average charging power
-            charging_power_list = [
-                list(d.values())[0]
-                for d in spiceev_scenario.connChargeByTS["GC1"]
-                for _ in range(int(spiceev_scenario.interval.total_seconds() / 60))
-            ]
-
-            average_charging_power = sum(charging_power_list) / len(charging_power_list)
+            charging_profile = get_charging_profile(spiceev_scenario)
+            average_charging_power = charging_profile.average_power
             # execute charging event
             vehicle.charge(
                 step_to_timestamp(self.simulation.time_series, task.start_time),
@@ -132,11 +133,15 @@ class SimulationType:
                     task.end_time,
                     self.simulation.step_size,
                     self.simulation.time_steps,
-                    charging_power_list,
+                    charging_profile,
+                    task.charging_point,
                 )
 
     def get_predicted_soc(self, vehicle: "Vehicle", start: int, end: int):
-        """Calculates predicted SoC of given vehicle after the given timespan by running all tasks.
+        """Calculates predicted SoC of given vehicle after each of its drives in the given timespan.
+
+        The SoC after a drive is read from the SoC profile of the vehicle, so it includes the delta_soc
+        of all tasks before it without summing them up again.
 
         Parameters
         ----------
@@ -145,25 +150,20 @@ class SimulationType:
         start : int
             Starting time step of the relevant time window
         end : int
-            Ending time step of the relevant time window
+            Ending time step of the relevant time window, tasks are part of it if they start in it
 
         Returns
         -------
-        pandas.DataFrame
-            DataFrame with columns "timestep" and "soc", containing predicted soc at specified times
+        SocTrajectory
+            Trajectory containing predicted soc at the end of every driving task,
+            including the delta_soc of planned charging tasks before it
         """
-        consumption = 0.0
-        consumption_list = [(start, start, vehicle.soc)]
-        for _, task in sorted(vehicle.tasks.items()):
-            if start < task.end_time < end:
-                if task.task == Status.DRIVING:
-                    consumption += task.delta_soc
-                    consumption_list.append(
-                        (task.start_time, task.end_time, vehicle.soc + consumption)
-                    )
-                if task.task == Status.CHARGING:
-                    # TODO check how much this would charge, relevant for ondemand
-                    pass
-        return pd.DataFrame(
-            consumption_list, columns=["drive_start", "timestep", "soc"]
-        )
+        drive_starts = [start]
+        timesteps = [start]
+        socs = [vehicle.soc]
+        for task in vehicle.get_tasks(start, end):
+            if task.task == Status.DRIVING:
+                drive_starts.append(task.start_time)
+                timesteps.append(task.end_time)
+                socs.append(vehicle.predict_soc(start, task.start_time + 1))
+        return SocTrajectory(drive_starts, timesteps, socs)
@@ -1,34 +1,255 @@
+import heapq
+import math
+import time
+from collections import deque
+import dataclasses
+import numpy as np
 import pandas as pd
 import pathlib
 
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from itertools import repeat
 from fleema.simulation_type import SimulationType
+from fleema.simulation_state import SimulationState
+from fleema.charging_assignment import (
+    ChargingCandidate,
+    assign_charging_heuristic,
+    assign_charging_milp,
+)
+from fleema.result_writer import ResultWriter
+from fleema.task_table import TaskTable
+from fleema.checkpoint import save_checkpoint, load_checkpoint, find_latest_checkpoint
 from fleema.plot import plot
-from typing import TYPE_CHECKING
+from fleema.event import Status
+from fleema.vehicle import Vehicle
+from typing import TYPE_CHECKING, Optional, List, Tuple, Union, Dict, Deque
 from operator import itemgetter
 
 if TYPE_CHECKING:
+    from fleema.location import Location
     from fleema.simulation import Simulation
-    from fleema.vehicle import Vehicle
+    from fleema.soc_trajectory import SocTrajectory
+
+
+# Schedule instance of a planning worker process, set by _init_planning_worker
+_worker_schedule: Optional["Schedule"] = None
+# planning window the charger occupation of the worker has been set up for
+_worker_window: Optional[Tuple[int, int]] = None
+
+
+def _init_planning_worker(simulation: "Simulation"):
+    """Initializes a planning worker process with its own copy of the simulation.
+
+    The worker is started once for all planning windows of a run. The state that changes between
+    windows is sent with every vehicle, see Schedule._get_window_state and Schedule._get_vehicle_state.
+    """
+    global _worker_schedule, _worker_window
+    _worker_schedule = Schedule(simulation)
+    _worker_window = None
+
+
+def _start_worker_window(schedule: "Schedule", window_state: dict):
+    """Sets up the charger occupation and the planning time budget of a window in a worker process."""
+    global _worker_window
+    schedule._deadline = window_state["deadline"]
+    window = (window_state["start"], window_state["end"])
+    if _worker_window == window:
+        return
+    _worker_window = window
+    simulation = schedule.simulation
+    for location in simulation.charging_locations:
+        location.init_occupation(simulation.time_steps)
+    for location_name, start_time, end_time, point_id in window_state["bookings"]:
+        location = simulation.locations[location_name]
+        location.add_occupation(start_time, end_time, "total")
+        if point_id is not None:
+            location.add_occupation(start_time, end_time, point_id)
+    if not simulation.keep_evaluations:
+        simulation.evaluation_components = {}
+    schedule._unexplored_vehicles = []
+
+
+def _plan_vehicle_speculatively(vehicle_state: dict, window_state: dict):
+    """Plans the charging slots of a vehicle in a worker process.
+
+    Charger occupation of other vehicles planned in the same pass is unknown to the worker,
+    so the plan has to be validated with Schedule._reconcile_speculative_plan.
+
+    Parameters
+    ----------
+    vehicle_state : dict
+        Result of Schedule._get_vehicle_state
+    window_state : dict
+        Result of Schedule._get_window_state
+
+    Returns
+    -------
+    tuple[list, list, list, dict, bool]
+        Chosen charging options with location names instead of Location objects,
+        (location name, start, end) of every charging event applied during planning,
+        starting time steps of all deleted rides, the evaluations requested and evaluated
+        for the vehicle and whether the vehicle missed the minimum SoC because of the deadline
+    """
+    schedule = _worker_schedule
+    if schedule is None:
+        raise RuntimeError("Planning worker has not been initialized.")
+    _start_worker_window(schedule, window_state)
+    simulation = schedule.simulation
+    locations = simulation.locations
+    vehicle = Vehicle(
+        vehicle_state["id"],
+        simulation.vehicle_types[vehicle_state["vehicle_type"]],
+        soc=vehicle_state["soc"],
+    )
+    for task in vehicle_state["tasks"]:
+        vehicle.add_task(_link_task_locations(task, locations))
+    simulation.vehicles[vehicle.id] = vehicle
+    schedule._fleet_evaluations = {
+        key: _link_locations(option, locations)
+        for key, option in vehicle_state["fleet_evaluations"].items()
+    }
+    applied_events: List[dict] = []
+    deleted_rides_before = len(schedule.deleted_rides)
+    # the counts of a worker include all vehicles it planned before
+    counts_before = dict(schedule._evaluation_counts)
+    unexplored_before = len(schedule._unexplored_vehicles)
+    chosen_events = schedule._plan_vehicle(
+        vehicle,
+        window_state["start"],
+        window_state["end"],
+        window_state["end_soc"],
+        applied_events,
+    )
+    applied_windows = [
+        (
+            option["charge_event"].start_point.name,
+            option["charge_event"].start_time,
+            option["charge_event"].end_time,
+        )
+        for option in applied_events
+    ]
+    deleted_rides = [
+        ride_start for _, ride_start in schedule.deleted_rides[deleted_rides_before:]
+    ]
+    evaluation_counts = {
+        key: count - counts_before[key]
+        for key, count in schedule._evaluation_counts.items()
+    }
+    return (
+        [_strip_locations(option) for option in chosen_events],
+        applied_windows,
+        deleted_rides,
+        evaluation_counts,
+        len(schedule._unexplored_vehicles) > unexplored_before,
+    )
+
+
+def _strip_task_locations(task):
+    """Returns a copy of a task with the names of its locations instead of the Location objects."""
+    return dataclasses.replace(
+        task, start_point=task.start_point.name, end_point=task.end_point.name
+    )
+
+
+def _link_task_locations(task, locations: Dict[str, "Location"]):
+    """Returns a copy of a task from _strip_task_locations with the Location objects of the given locations."""
+    return dataclasses.replace(
+        task,
+        start_point=locations[task.start_point],
+        end_point=locations[task.end_point],
+    )
+
+
+def _strip_locations(charge_option: dict):
+    """Replaces the Location objects in the tasks of a charging option with their names."""
+    option = dict(charge_option)
+    for key in ["charge_event", "task_to", "task_from"]:
+        if key in option:
+            option[key] = _strip_task_locations(option[key])
+    return option
+
+
+def _link_locations(charge_option: dict, locations: Dict[str, "Location"]):
+    """Replaces the location names in the tasks of a charging option from _strip_locations with Location objects."""
+    option = dict(charge_option)
+    for key in ["charge_event", "task_to", "task_from"]:
+        if key in option:
+            option[key] = _link_task_locations(option[key], locations)
+    return option
+
+
+def _empty_option(timestep: int):
+    """Returns a charging option without score, like Simulation.evaluate_charging_location in case of failure."""
+    return {
+        "timestep": timestep,
+        "score": 0,
+        "consumption": 0,
+        "charge": 0,
+        "delta_soc": 0,
+    }
+
+
+def _copy_option(charge_option: dict, shift: int = 0):
+    """Copies a charging option including its tasks, so it can be added to another vehicle.
+
+    Parameters
+    ----------
+    charge_option : dict
+        Result of Simulation.evaluate_charging_location
+    shift : int
+        Number of time steps all tasks of the copy are moved by
+    """
+    option = dict(charge_option)
+    option["timestep"] = charge_option["timestep"] + shift
+    for key in ["charge_event", "task_to", "task_from"]:
+        if key in option:
+            option[key] = dataclasses.replace(
+                option[key],
+                start_time=option[key].start_time + shift,
+                end_time=option[key].end_time + shift,
+            )
+    return option
 
 
 class Schedule(SimulationType):
     def __init__(self, simulation: "Simulation"):
         super().__init__(simulation)
+        # vehicle id and starting time step of every ride deleted during planning
+        self.deleted_rides: List[Tuple[Union[str, int], int]] = []
+        # best charging option per break of the vehicle that is currently planned
+        self._break_evaluations: Dict[tuple, dict] = {}
+        # best charging option per distinct break of the fleet in the current planning window
+        self._fleet_evaluations: Dict[tuple, dict] = {}
+        # keys of the collected break evaluations of each vehicle in the current planning window
+        self._vehicle_break_keys: Dict[Union[str, int], List[tuple]] = {}
+        # worker processes of parallel planning, running for all planning windows of a run
+        self._executor: Optional[ProcessPoolExecutor] = None
+        # starting time step and chosen charging options of planned windows by their fingerprint
+        self._day_plans: Dict[tuple, Tuple[int, List[dict]]] = {}
+        # end of the planning time budget of the current window, see Simulation.planning_time_budget
+        self._deadline: Optional[float] = None
+        # charging location evaluations requested and evaluated in the current window
+        self._evaluation_counts = {"requested": 0, "evaluated": 0}
+        # vehicles that couldn't reach the minimum SoC before the deadline in the current window
+        self._unexplored_vehicles: List[Union[str, int]] = []
+        # planning time and explored evaluations of each planning window
+        self.planning_report: List[dict] = []
 
     def _create_initial_schedule(self):
         """Creates vehicles and tasks from the scenario schedule."""
         self.simulation.vehicles_from_schedule()
-        # get tasks for every row of the schedule
-        self.simulation.schedule.apply(self.simulation.task_from_schedule, axis=1)  # type: ignore
+        # get tasks for all rows of the schedule
+        self.simulation.tasks_from_schedule()
 
-    def get_charging_slots(self, break_list, soc_df, vehicle):
+    def get_charging_slots(self, break_list, soc_trajectory, vehicle):
         """Calculate charging slots for a vehicle.
 
         Parameters
         ----------
         break_list : List[Task]
             Result from vehicle.get_breaks()
-        soc_df : DataFrame
+        soc_trajectory : SocTrajectory
             Result from self.get_predicted_soc()
         vehicle : Vehicle
 
@@ -39,40 +260,394 @@ class Schedule(SimulationType):
             Better results are at the top
         """
         # initialize variables
-        charging_list = [{}] * len(break_list)
-        lowest_current_soc = vehicle.soc_start
-        for counter, task in enumerate(break_list):
-            # for all locations with chargers, evaluate the best option. save task, best location, evaluation
-            charging_list_temp = []
-            for loc in self.simulation.charging_locations:
-                soc_df_slice = soc_df.loc[soc_df["timestep"] >= task.start_time]
-                if len(soc_df_slice.index):
-                    # get lowest possible soc at this point in time (if no charging has happened)
-                    lowest_current_soc = max(
-                        soc_df_slice.iat[0, -1], self.simulation.soc_min
-                    )
-                charging_list_temp.append(
-                    self.simulation.evaluate_charging_location(
-                        vehicle.vehicle_type,
-                        loc,
-                        task.start_point,
-                        task.end_point,
-                        task.start_time,
-                        task.end_time,
-                        lowest_current_soc,
-                    )
-                )
-            # compare locations and choose the best one
-            # TODO change sorting depending on config? score is always most important,
-            # after could come cost, charge, consumption...
-            charging_list_temp.sort(key=itemgetter("consumption"))
-            charging_list_temp.sort(
-                key=itemgetter("score", "delta_soc", "charge"), reverse=True
-            )
-            charging_list[counter] = charging_list_temp[0]
+        break_socs = self._get_break_socs(break_list, soc_trajectory, vehicle)
+        charging_list = [
+            self._get_break_option(task, vehicle, lowest_current_soc)
+            for task, lowest_current_soc in zip(break_list, break_socs)
+        ]
         charging_list.sort(key=itemgetter("score", "delta_soc", "charge"), reverse=True)
         return charging_list
 
+    def iterate_charging_slots(self, break_list, soc_trajectory, vehicle):
+        """Yields charging slots for a vehicle lazily, in the same order as get_charging_slots.
+
+        Breaks are evaluated in order of the upper bound of their score (Simulation.get_score_bound),
+        only once their option could be the next best one. After all options with a score above 0,
+        a single option with a score of 0 follows if any break has no option worth charging.
+
+        Parameters
+        ----------
+        break_list : List[Task]
+            Result from vehicle.get_breaks()
+        soc_trajectory : SocTrajectory
+            Result from self.get_predicted_soc()
+        vehicle : Vehicle
+
+        Yields
+        ------
+        dict
+            Results from the evaluate charging station function, better results first
+        """
+        break_socs = self._get_break_socs(break_list, soc_trajectory, vehicle)
+        # unevaluated breaks are sorted by their bound, ahead of evaluated options with the same score
+        queue: List[tuple] = []
+        for index, (task, lowest_current_soc) in enumerate(zip(break_list, break_socs)):
+            bound = self.simulation.get_score_bound(
+                vehicle.vehicle_type,
+                task.start_point,
+                task.end_point,
+                task.end_time - task.start_time,
+                lowest_current_soc,
+            )
+            queue.append((-bound, 0, index))
+        heapq.heapify(queue)
+        options = {}
+        while queue:
+            entry = heapq.heappop(queue)
+            index = entry[-1]
+            if entry[0] >= 0:
+                # no remaining break has a score above 0
+                break
+            if index in options:
+                yield options[index]
+                continue
+            option = self._get_break_option(
+                break_list[index], vehicle, break_socs[index]
+            )
+            options[index] = option
+            heapq.heappush(
+                queue,
+                (
+                    -option["score"],
+                    1,
+                    -option["delta_soc"],
+                    -option["charge"],
+                    index,
+                ),
+            )
+        else:
+            return
+        yield options.get(index, _empty_option(break_list[index].start_time))
+
+    def _get_break_option(self, task, vehicle, current_soc):
+        """Returns the best charging option of a break, evaluating it only if necessary.
+
+        Parameters
+        ----------
+        task : Task
+            Break from vehicle.get_breaks()
+        vehicle : Vehicle
+        current_soc : float
+            Lowest possible SoC at the start of the break
+
+        Returns
+        -------
+        dict
+            Result of the evaluate charging station function for the best location
+        """
+        # breaks are only evaluated again if their time window or soc changed since the last iteration
+        cache_key = self._get_break_key(task, vehicle, current_soc)
+        if cache_key not in self._break_evaluations:
+            if cache_key not in self._fleet_evaluations:
+                option = self._evaluate_break(task, vehicle, current_soc)
+                # breaks with skipped evaluations are evaluated again if the vehicle needs them
+                if "skipped" in option:
+                    return option
+                self._fleet_evaluations[cache_key] = option
+            # other vehicles with the same break get their own tasks
+            self._break_evaluations[cache_key] = _copy_option(
+                self._fleet_evaluations[cache_key]
+            )
+        return self._break_evaluations[cache_key]
+
+    def _get_break_socs(self, break_list, soc_trajectory, vehicle):
+        """Returns the lowest possible SoC at the start of each break, if no charging has happened.
+
+        Parameters
+        ----------
+        break_list : List[Task]
+            Result from vehicle.get_breaks()
+        soc_trajectory : SocTrajectory
+            Result from self.get_predicted_soc()
+        vehicle : Vehicle
+
+        Returns
+        -------
+        list[float]
+            SoC for each break, at least the minimum SoC
+        """
+        resolution = self.simulation.break_soc_resolution
+        break_socs = []
+        lowest_current_soc = vehicle.soc
+        for task in break_list:
+            predicted_soc = soc_trajectory.get_soc(task.start_time)
+            if predicted_soc is not None:
+                lowest_current_soc = max(predicted_soc, self.simulation.soc_min)
+            if resolution > 0:
+                # round down, so that breaks of vehicles with similar SoC can share their evaluation
+                break_socs.append(
+                    math.floor(lowest_current_soc / resolution + 1e-9) * resolution
+                )
+            else:
+                break_socs.append(lowest_current_soc)
+        return break_socs
+
+    def _get_break_key(self, task, vehicle, current_soc):
+        """Returns everything the evaluation of a break depends on.
+
+        Parameters
+        ----------
+        task : Task
+            Break from vehicle.get_breaks()
+        vehicle : Vehicle
+        current_soc : float
+            Lowest possible SoC at the start of the break
+
+        Returns
+        -------
+        tuple
+            Vehicle type, start and end location, start and end time step and SoC
+        """
+        return (
+            vehicle.vehicle_type.name,
+            task.start_point.name,
+            task.end_point.name,
+            task.start_time,
+            task.end_time,
+            current_soc,
+        )
+
+    def _get_day_fingerprint(self, vehicle, start: int, end: int, price_profile: tuple):
+        """Returns everything the charging plan of a vehicle in a planning window depends on.
+
+        Windows with the same fingerprint only differ by a time shift and by small differences of prices
+        and start SoC.
+
+        Parameters
+        ----------
+        vehicle : Vehicle
+        start : int
+            Starting timestep of the window
+        end : int
+            Ending timestep of the window
+        price_profile : tuple
+            Result of simulation.get_price_profile() for the window
+
+        Returns
+        -------
+        tuple
+            Vehicle type, window length, end of the previous task and tasks relative to the window start,
+            price profile and start SoC bucket
+        """
+        # a task of the previous window that is still running delays the first break
+        previous_task = vehicle.get_previous_task(start)
+        carry_over = 0
+        if previous_task is not None:
+            carry_over = max(previous_task.end_time - start, 0)
+        tasks = tuple(
+            (
+                task.start_time - start,
+                task.end_time - start,
+                task.start_point.name,
+                task.end_point.name,
+                task.task,
+                round(task.delta_soc, 6),
+            )
+            for task in vehicle.get_tasks(start, end)
+        )
+        soc_bucket = math.floor(vehicle.soc / self.simulation.reuse_soc_step + 1e-9)
+        return (
+            vehicle.vehicle_type.name,
+            end - start,
+            carry_over,
+            tasks,
+            price_profile,
+            soc_bucket,
+        )
+
+    def _reuse_day_plan(
+        self, vehicle, start: int, end: int, end_soc: float, fingerprint
+    ):
+        """Returns the shifted charging plan of an earlier window with the same fingerprint.
+
+        The plan is only reused if its charging events are still available and it satisfies
+        the minimum SoC and the desired end SoC of the vehicle in this window.
+
+        Parameters
+        ----------
+        vehicle : Vehicle
+        start : int
+            Starting timestep of the window
+        end : int
+            Ending timestep of the window
+        end_soc : float
+            desired end SoC
+        fingerprint : tuple
+            Result of self._get_day_fingerprint()
+
+        Returns
+        -------
+        Optional[list]
+            Chosen charging options, None if there is no plan to reuse
+        """
+        if fingerprint not in self._day_plans:
+            return None
+        planned_start, planned_events = self._day_plans[fingerprint]
+        chosen_events = [
+            _copy_option(option, start - planned_start) for option in planned_events
+        ]
+        for option in chosen_events:
+            charge_event = option["charge_event"]
+            if not charge_event.start_point.is_available(
+                charge_event.start_time,
+                charge_event.end_time,
+                plug_types=vehicle.vehicle_type.plugs,
+            ):
+                return None
+        soc_trajectory = self.get_predicted_soc(vehicle, start, end)
+        critical_socs = soc_trajectory.get_critical_points(self.simulation.soc_min)
+        for option in chosen_events:
+            critical_socs.apply_delta(option["timestep"], option["delta_soc"])
+        if not critical_socs.min_soc_satisfied or not critical_socs.end_soc_satisfied(
+            self.simulation.soc_min, end_soc
+        ):
+            return None
+        return chosen_events
+
+    def _collect_break_evaluations(
+        self, start: int, end: int, end_soc: float, vehicles: Optional[list] = None
+    ):
+        """Evaluates every distinct break of all vehicles that need charging once.
+
+        Vehicles on the same lines often have breaks with the same vehicle type, locations, time window
+        and SoC. The results are shared through self._fleet_evaluations when planning the single vehicles.
+
+        Parameters
+        ----------
+        start : int
+            Starting timestep
+        end : int
+            Ending timestep
+        end_soc : float
+            desired end SoC
+        vehicles : list, optional
+            Vehicles to collect the breaks of, default is all vehicles
+        """
+        if vehicles is None:
+            vehicles = list(self.simulation.vehicles.values())
+        requests = {}
+        self._vehicle_break_keys = {}
+        for veh in vehicles:
+            last_soc = veh.predict_soc(start, end)
+            if last_soc >= self.simulation.soc_min and last_soc >= end_soc:
+                continue
+            soc_trajectory = self.get_predicted_soc(veh, start, end)
+            break_list = veh.get_breaks(start, end)
+            break_socs = self._get_break_socs(break_list, soc_trajectory, veh)
+            keys = self._vehicle_break_keys[veh.id] = []
+            for task, current_soc in zip(break_list, break_socs):
+                key = self._get_break_key(task, veh, current_soc)
+                keys.append(key)
+                if key not in self._fleet_evaluations and key not in requests:
+                    requests[key] = (task, veh, current_soc)
+        print(f"==== Evaluating {len(requests)} distinct breaks of the fleet ====")
+        for key, (task, veh, current_soc) in requests.items():
+            option = self._evaluate_break(task, veh, current_soc)
+            if "skipped" not in option:
+                self._fleet_evaluations[key] = option
+
+    def _evaluate_break(self, task, vehicle, current_soc):
+        """Evaluates all charging locations for a break and returns the best option.
+
+        Parameters
+        ----------
+        task : Task
+            Break from vehicle.get_breaks()
+        vehicle : Vehicle
+        current_soc : float
+            Lowest possible SoC at the start of the break
+
+        Returns
+        -------
+        dict
+            Result of the evaluate charging station function for the best location, with the key
+            "skipped" if an evaluation was skipped because of the planning time budget
+        """
+        # for all reachable locations with chargers, evaluate the best option. save task, best location, evaluation
+        # locations with short detours are the most promising and get evaluated first
+        reachable_locations = self.simulation.get_reachable_locations(
+            task.start_point,
+            task.end_point,
+            task.end_time - task.start_time,
+            by_detour=True,
+        )
+        if not reachable_locations:
+            return _empty_option(task.start_time)
+        evaluations = {
+            loc.name: self._evaluate_location(
+                vehicle.vehicle_type, loc, task, current_soc
+            )
+            for loc in reachable_locations
+        }
+        charging_list_temp = [
+            evaluations[loc.name]
+            for loc in self.simulation.charging_locations
+            if loc.name in evaluations
+        ]
+        # compare locations and choose the best one
+        # TODO change sorting depending on config? score is always most important,
+        # after could come cost, charge, consumption...
+        charging_list_temp.sort(key=itemgetter("consumption"))
+        charging_list_temp.sort(
+            key=itemgetter("score", "delta_soc", "charge"), reverse=True
+        )
+        if any("skipped" in option for option in charging_list_temp):
+            return dict(charging_list_temp[0], skipped=True)
+        return charging_list_temp[0]
+
+    def _evaluate_location(self, vehicle_type, location, task, current_soc):
+        """Evaluates a charging location for a break, unless the planning time budget is used up.
+
+        After the deadline, only evaluations stored in Simulation.evaluation_components are used.
+
+        Parameters
+        ----------
+        vehicle_type : VehicleType
+        location : Location
+            Charging location to evaluate
+        task : Task
+            Break from vehicle.get_breaks()
+        current_soc : float
+            Lowest possible SoC at the start of the break
+
+        Returns
+        -------
+        dict
+            Result of the evaluate charging station function, without score and with the key
+            "skipped" if it was skipped
+        """
+        self._evaluation_counts["requested"] += 1
+        option = self.simulation.evaluate_charging_location(
+            vehicle_type,
+            location,
+            task.start_point,
+            task.end_point,
+            task.start_time,
+            task.end_time,
+            current_soc,
+            cached_only=self._deadline is not None and time.time() > self._deadline,
+        )
+        if option is None:
+            return dict(_empty_option(task.start_time), skipped=True)
+        self._evaluation_counts["evaluated"] += 1
+        return option
+
+    def _get_skipped_evaluations(self) -> int:
+        """Returns the number of evaluations skipped because of the planning time budget in the current window."""
+        return (
+            self._evaluation_counts["requested"] - self._evaluation_counts["evaluated"]
+        )
+
     def _distribute_charging_slots(self, start: int, end: int, end_soc: float):
         """Choose charging slots in the specified timeframe and add them to the vehicle.
 
@@ -89,23 +664,468 @@ class Schedule(SimulationType):
         # evaluate charging slots
         # distribute slots by highest total score (?)
         # for conflicts, check amount of charging spots at location and total possible power
-        for veh in self.simulation.vehicles.values():
-            # rerun the loop until valid schedule has been created
-            # TODO check if this could ever be an infinite loop, in theory it should delete tasks until possible
-            chosen_events = None
-            counter = 1
-            while chosen_events is None:
+        if not self.simulation.keep_evaluations:
+            # evaluations start at the breaks of a window, so they aren't needed by the next one
+            self.simulation.evaluation_components = {}
+        planning_start = self._start_time_budget()
+        if self.simulation.planning_mode == "global":
+            self._distribute_charging_slots_global(start, end, end_soc)
+        elif self._plans_in_parallel():
+            # workers can't share evaluations, so all breaks are evaluated in advance
+            self._collect_break_evaluations(start, end, end_soc)
+            with self._planning_workers():
+                self._distribute_charging_slots_parallel(start, end, end_soc)
+        elif self.simulation.reuse_day_plans:
+            self._distribute_charging_slots_reusing(start, end, end_soc)
+        else:
+            if self.simulation.collect_break_evaluations:
+                self._collect_break_evaluations(start, end, end_soc)
+            # other breaks are evaluated lazily, evaluations are shared between vehicles
+            for veh in self.simulation.vehicles.values():
+                chosen_events = self._plan_vehicle(veh, start, end, end_soc)
+                print(f"==== Simulating vehicle {veh.id} ====")
+                self._add_chosen_events(veh, chosen_events)
+                self.simulation.observer.add_all_vehicle_events(veh, start, end)
+        self._fleet_evaluations = {}
+        self._vehicle_break_keys = {}
+        self._report_planning(start, end, planning_start)
+
+    def _start_time_budget(self):
+        """Starts the planning time budget of a window and resets its evaluation counts and unexplored vehicles.
+
+        Returns
+        -------
+        float
+            Time the planning started at
+        """
+        planning_start = time.time()
+        if self.simulation.planning_time_budget > 0:
+            self._deadline = planning_start + self.simulation.planning_time_budget
+        else:
+            self._deadline = None
+        self._evaluation_counts = {"requested": 0, "evaluated": 0}
+        self._unexplored_vehicles = []
+        return planning_start
+
+    def _report_planning(self, start: int, end: int, planning_start: float):
+        """Adds planning time, explored share of evaluations and unexplored vehicles of a window to the report.
+
+        Parameters
+        ----------
+        start : int
+            Starting timestep
+        end : int
+            Ending timestep
+        planning_start : float
+            Result of self._start_time_budget
+        """
+        requested = self._evaluation_counts["requested"]
+        evaluated = self._evaluation_counts["evaluated"]
+        report = {
+            "start_time": start,
+            "end_time": end,
+            "planning_time": time.time() - planning_start,
+            "requested_evaluations": requested,
+            "evaluations": evaluated,
+            "explored": evaluated / requested if requested else 1.0,
+            "unexplored_vehicles": list(self._unexplored_vehicles),
+        }
+        self.planning_report.append(report)
+        if self._deadline is not None:
+            print(
+                f"==== Planned time steps {start} to {end} in {report['planning_time']:.1f} s, "
+                f"explored {report['explored']:.0%} of the charging evaluations ===="
+            )
+            if self._unexplored_vehicles:
                 print(
-                    f"==== Finding charging slots for vehicle {veh.id}, iteration {counter} ===="
+                    f"==== Minimum SoC not reached before the deadline by vehicles {report['unexplored_vehicles']} ===="
+                )
+        self._deadline = None
+
+    def export_planning_report(self):
+        """Writes the planning report of all windows to the save directory."""
+        report = pd.DataFrame(
+            self.planning_report,
+            columns=[
+                "start_time",
+                "end_time",
+                "planning_time",
+                "requested_evaluations",
+                "evaluations",
+                "explored",
+                "unexplored_vehicles",
+            ],
+        )
+        report["unexplored_vehicles"] = report["unexplored_vehicles"].map(
+            lambda vehicle_ids: " ".join(map(str, vehicle_ids))
+        )
+        report.to_csv(
+            pathlib.Path(self.simulation.save_directory, "planning_report.csv"),
+            index=False,
+        )
+
+    def _distribute_charging_slots_reusing(self, start: int, end: int, end_soc: float):
+        """Choose charging slots for all vehicles, reusing plans of repeated windows.
+
+        Vehicles whose tasks, start SoC and price profile repeat an already planned window get
+        the time shifted plan of that window. All other vehicles are planned as usual and their plans
+        are stored for later windows, unless rides had to be deleted.
+
+        Parameters
+        ----------
+        start : int
+            Starting timestep
+        end : int
+            Ending timestep
+        end_soc : float
+            desired end SoC
+        """
+        price_profile = self.simulation.get_price_profile(
+            start, end, self.simulation.reuse_price_classes
+        )
+        fingerprints = {
+            veh.id: self._get_day_fingerprint(veh, start, end, price_profile)
+            for veh in self.simulation.vehicles.values()
+        }
+        if self.simulation.collect_break_evaluations:
+            # vehicles that can reuse a plan don't need their breaks evaluated
+            self._collect_break_evaluations(
+                start,
+                end,
+                end_soc,
+                [
+                    veh
+                    for veh in self.simulation.vehicles.values()
+                    if fingerprints[veh.id] not in self._day_plans
+                ],
+            )
+        for veh in self.simulation.vehicles.values():
+            fingerprint = fingerprints[veh.id]
+            chosen_events = self._reuse_day_plan(veh, start, end, end_soc, fingerprint)
+            if chosen_events is None:
+                deleted_rides_before = len(self.deleted_rides)
+                chosen_events = self._plan_vehicle(veh, start, end, end_soc)
+                if len(self.deleted_rides) == deleted_rides_before:
+                    self._day_plans[fingerprint] = (start, chosen_events)
+            else:
+                print(f"==== Reusing charging plan for vehicle {veh.id} ====")
+            print(f"==== Simulating vehicle {veh.id} ====")
+            self._add_chosen_events(veh, chosen_events)
+            self.simulation.observer.add_all_vehicle_events(veh, start, end)
+
+    def _distribute_charging_slots_global(self, start: int, end: int, end_soc: float):
+        """Choose charging slots for the whole fleet in a single assignment.
+
+        Every break of every vehicle that needs charging is evaluated at all charging locations once.
+        All scored candidates are then assigned to the chargers together, either with a priority queue
+        heuristic or as a mixed integer linear program (simulation.global_solver = "milp").
+        Vehicles whose minimum SoC isn't reached by the assignment are planned afterwards with
+        self._plan_vehicle, which can delete rides.
+
+        Parameters
+        ----------
+        start : int
+            Starting timestep
+        end : int
+            Ending timestep
+        end_soc : float
+            desired end SoC
+        """
+        soc_min = self.simulation.soc_min
+        requirements: Dict[Union[str, int], "SocTrajectory"] = {}
+        candidates: List[ChargingCandidate] = []
+        for veh in self.simulation.vehicles.values():
+            last_soc = veh.predict_soc(start, end)
+            if last_soc >= soc_min and last_soc >= end_soc:
+                continue
+            soc_trajectory = self.get_predicted_soc(veh, start, end)
+            print(f"==== Evaluating charging slots for vehicle {veh.id} ====")
+            requirements[veh.id] = soc_trajectory.get_critical_points(soc_min)
+            break_list = veh.get_breaks(start, end)
+            break_socs = self._get_break_socs(break_list, soc_trajectory, veh)
+            for break_index, (task, current_soc) in enumerate(
+                zip(break_list, break_socs)
+            ):
+                for loc in self.simulation.get_reachable_locations(
+                    task.start_point, task.end_point, task.end_time - task.start_time
+                ):
+                    option = self._evaluate_location(
+                        veh.vehicle_type, loc, task, current_soc
+                    )
+                    if option["score"] > 0 and loc.is_available(
+                        option["charge_event"].start_time,
+                        option["charge_event"].end_time,
+                        plug_types=veh.vehicle_type.plugs,
+                    ):
+                        candidates.append(
+                            ChargingCandidate(
+                                veh.id, break_index, option, veh.vehicle_type.plugs
+                            )
+                        )
+
+        if self.simulation.global_solver == "milp":
+            assignment = assign_charging_milp(
+                candidates, requirements, soc_min, end_soc
+            )
+        else:
+            assignment = assign_charging_heuristic(
+                candidates, requirements, soc_min, end_soc
+            )
+
+        unresolved_vehicles = []
+        for veh in self.simulation.vehicles.values():
+            chosen_events = assignment.get(veh.id, [])
+            if veh.id in requirements:
+                critical_socs = requirements[veh.id]
+                for charge_option in chosen_events:
+                    critical_socs.apply_delta(
+                        charge_option["timestep"], charge_option["delta_soc"]
+                    )
+                if not critical_socs.min_soc_satisfied:
+                    unresolved_vehicles.append(veh)
+                    continue
+            print(f"==== Simulating vehicle {veh.id} ====")
+            self._add_chosen_events(veh, chosen_events)
+            self.simulation.observer.add_all_vehicle_events(veh, start, end)
+        # vehicles without a sufficient assignment get planned against the committed occupation
+        for veh in unresolved_vehicles:
+            chosen_events = self._plan_vehicle(veh, start, end, end_soc)
+            print(f"==== Simulating vehicle {veh.id} ====")
+            self._add_chosen_events(veh, chosen_events)
+            self.simulation.observer.add_all_vehicle_events(veh, start, end)
+
+    def _plans_in_parallel(self) -> bool:
+        """Checks if the vehicles are planned in worker processes."""
+        return (
+            self.simulation.planning_mode != "global"
+            and self.simulation.parallel_planning
+            and self.simulation.num_threads > 1
+            and len(self.simulation.vehicles) > 1
+        )
+
+    @contextmanager
+    def _planning_workers(self):
+        """Keeps the worker processes of parallel planning running for all planning windows in this context.
+
+        The simulation is sent to the workers once when they are started. Nested contexts use the same workers.
+        """
+        if self._executor is not None or not self._plans_in_parallel():
+            yield
+            return
+        with ProcessPoolExecutor(
+            max_workers=self.simulation.num_threads,
+            initializer=_init_planning_worker,
+            initargs=(self.simulation,),
+        ) as executor:
+            self._executor = executor
+            try:
+                yield
+            finally:
+                self._executor = None
+
+    def _get_window_state(self, start: int, end: int, end_soc: float):
+        """Returns the state of the planning window that the workers of parallel planning need.
+
+        Parameters
+        ----------
+        start : int
+            Starting timestep
+        end : int
+            Ending timestep
+        end_soc : float
+            desired end SoC
+
+        Returns
+        -------
+        dict
+            Window, desired end SoC, deadline and (location name, start, end, charging point) of all
+            charging events of the fleet that overlap the window
+        """
+        bookings: List[Tuple[str, int, int, Optional[str]]] = []
+        for veh in self.simulation.vehicles.values():
+            previous_task = veh.get_previous_task(start)
+            tasks = veh.get_tasks(start, end + 1)
+            if previous_task is not None:
+                tasks.insert(0, previous_task)
+            bookings.extend(
+                (
+                    task.start_point.name,
+                    task.start_time,
+                    task.end_time,
+                    task.charging_point,
                 )
-                chosen_events = self._find_charging_slots(start, end, veh, end_soc)
-                counter += 1
+                for task in tasks
+                if task.task == Status.CHARGING and task.end_time >= start
+            )
+        return {
+            "start": start,
+            "end": end,
+            "end_soc": end_soc,
+            "deadline": self._deadline,
+            "bookings": bookings,
+        }
+
+    def _get_vehicle_state(self, vehicle: "Vehicle", start: int, end: int):
+        """Returns the state of a vehicle that a worker of parallel planning needs to plan a window.
+
+        Parameters
+        ----------
+        vehicle : Vehicle
+            Vehicle to plan
+        start : int
+            Starting timestep
+        end : int
+            Ending timestep
+
+        Returns
+        -------
+        dict
+            Vehicle ID, vehicle type name, SoC, the tasks of the window and the last task before it
+            and the collected evaluations of the breaks of the vehicle, with location names instead
+            of Location objects
+        """
+        tasks = vehicle.get_tasks(start, end)
+        previous_task = vehicle.get_previous_task(start)
+        if previous_task is not None:
+            tasks.insert(0, previous_task)
+        return {
+            "id": vehicle.id,
+            "vehicle_type": vehicle.vehicle_type.name,
+            "soc": vehicle.soc,
+            "tasks": [_strip_task_locations(task) for task in tasks],
+            "fleet_evaluations": {
+                key: _strip_locations(self._fleet_evaluations[key])
+                for key in self._vehicle_break_keys.get(vehicle.id, [])
+                if key in self._fleet_evaluations
+            },
+        }
+
+    def _distribute_charging_slots_parallel(self, start: int, end: int, end_soc: float):
+        """Choose charging slots for all vehicles in the worker processes of self._planning_workers.
+
+        Every vehicle is planned speculatively against the charger occupation at the start of this pass.
+        Afterwards the plans are reconciled in vehicle order: plans whose charging events are still
+        available are adopted, vehicles with conflicts get re-planned against the committed occupation.
+        This results in the same plan as the sequential planning in self._distribute_charging_slots.
+
+        Parameters
+        ----------
+        start : int
+            Starting timestep
+        end : int
+            Ending timestep
+        end_soc : float
+            desired end SoC
+
+        Raises
+        ------
+        RuntimeError
+            If the worker processes haven't been started.
+        """
+        if self._executor is None:
+            raise RuntimeError("Planning workers have not been started.")
+        vehicles = list(self.simulation.vehicles.values())
+        speculative_plans = list(
+            self._executor.map(
+                _plan_vehicle_speculatively,
+                [self._get_vehicle_state(veh, start, end) for veh in vehicles],
+                repeat(self._get_window_state(start, end, end_soc)),
+            )
+        )
+        for veh, plan in zip(vehicles, speculative_plans):
+            # evaluations of the workers count for the planning report
+            for key, count in plan[3].items():
+                self._evaluation_counts[key] += count
+            chosen_events = self._reconcile_speculative_plan(veh, plan)
+            if chosen_events is None:
+                print(f"==== Re-planning vehicle {veh.id} after charger conflict ====")
+                chosen_events = self._plan_vehicle(veh, start, end, end_soc)
+            elif plan[4]:
+                self._unexplored_vehicles.append(veh.id)
             print(f"==== Simulating vehicle {veh.id} ====")
             self._add_chosen_events(veh, chosen_events)
-            self.simulation.observer.add_all_vehicle_events(veh)
+            self.simulation.observer.add_all_vehicle_events(veh, start, end)
+
+    def _reconcile_speculative_plan(self, vehicle: "Vehicle", plan: tuple):
+        """Adopts a plan from _plan_vehicle_speculatively if it doesn't conflict with the committed occupation.
+
+        Parameters
+        ----------
+        vehicle : Vehicle
+            Vehicle the plan was made for
+        plan : tuple
+            Result of _plan_vehicle_speculatively
+
+        Returns
+        -------
+        Optional[list]
+            Chosen charging options with Location objects, None if the plan has a conflict
+        """
+        chosen_events, applied_windows, deleted_rides = plan[:3]
+        for location_name, start_time, end_time in applied_windows:
+            if not self.simulation.locations[location_name].is_available(
+                start_time, end_time, plug_types=vehicle.vehicle_type.plugs
+            ):
+                return None
+        # repeat the ride deletions of the worker
+        for ride_start in deleted_rides:
+            self._remove_ride(vehicle, ride_start)
+        return [
+            _link_locations(option, self.simulation.locations)
+            for option in chosen_events
+        ]
+
+    def _plan_vehicle(
+        self,
+        vehicle: "Vehicle",
+        start: int,
+        end: int,
+        end_soc: float,
+        applied_events: Optional[list] = None,
+    ):
+        """Finds charging slots for a vehicle, deleting rides until a valid schedule has been created.
+
+        Parameters
+        ----------
+        vehicle : Vehicle
+            Vehicle to find charging slots for
+        start : int
+            Starting timestep
+        end : int
+            Ending timestep
+        end_soc : float
+            desired end SoC
+        applied_events : list, optional
+            Collects every charging option applied during planning, including discarded iterations
+
+        Returns
+        -------
+        list
+            contains charging event options, format same as in self.get_charging_slots
+        """
+        # break evaluations are reused between iterations, but not between vehicles
+        self._break_evaluations = {}
+        # rerun the loop until valid schedule has been created
+        # TODO check if this could ever be an infinite loop, in theory it should delete tasks until possible
+        chosen_events = None
+        counter = 1
+        while chosen_events is None:
+            print(
+                f"==== Finding charging slots for vehicle {vehicle.id}, iteration {counter} ===="
+            )
+            chosen_events = self._find_charging_slots(
+                start, end, vehicle, end_soc, applied_events
+            )
+            counter += 1
+        return chosen_events
 
     def _find_charging_slots(
-        self, start: int, end: int, vehicle: "Vehicle", end_soc: float
+        self,
+        start: int,
+        end: int,
+        vehicle: "Vehicle",
+        end_soc: float,
+        applied_events: Optional[list] = None,
     ):
         """Tries to find working charging slots for a vehicle.
 
@@ -117,6 +1137,10 @@ class Schedule(SimulationType):
             Ending timestep
         vehicle : Vehicle
             Vehicle to find charging slots for
+        end_soc : float
+            desired end SoC
+        applied_events : list, optional
+            Collects every charging option that gets applied
 
         Returns
         -------
@@ -124,116 +1148,118 @@ class Schedule(SimulationType):
             contains charging event options, format same as in self.get_charging_slots
         """
         # initialize variables
-        soc_df = self.get_predicted_soc(vehicle, start, end)
-        break_list = vehicle.get_breaks(start, end)
-        charging_list = self.get_charging_slots(break_list, soc_df, vehicle)
-
-        chosen_events = []
+        chosen_events: List[dict] = []
+        skipped_evaluations = self._get_skipped_evaluations()
         total_charge = 0
-        min_soc_satisfied = False
-        end_soc_satisfied = False
 
-        last_soc = soc_df.iat[-1, -1]
+        # the soc profile of the vehicle gives the last soc without building the trajectory
+        last_soc = vehicle.predict_soc(start, end)
         max_charge = 1 - last_soc
         # check if vehicle falls under minimum soc
         min_charge = max(self.simulation.soc_min - last_soc, 0)
         end_of_day_charge = max(end_soc - last_soc, 0)
         if not min_charge and not end_of_day_charge:
             return []
+        soc_trajectory = self.get_predicted_soc(vehicle, start, end)
 
-        soc_df_slice = soc_df.loc[soc_df["soc"] <= self.simulation.soc_min].copy()
-        soc_df_slice["necessary_charging"] = (
-            self.simulation.soc_min - soc_df_slice["soc"]
+        # charging options are only evaluated as far as they are needed
+        break_list = vehicle.get_breaks(start, end)
+        charging_list = self.iterate_charging_slots(break_list, soc_trajectory, vehicle)
+        critical_socs = soc_trajectory.get_critical_points(self.simulation.soc_min)
+        min_soc_satisfied = critical_socs.min_soc_satisfied
+        end_soc_satisfied = critical_socs.end_soc_satisfied(
+            self.simulation.soc_min, end_soc
         )
-        last_index = soc_df.index[-1]
-        if last_index not in soc_df_slice.index:
-            last_row = soc_df.loc[last_index, :].copy()
-            last_row["necessary_charging"] = self.simulation.soc_min - last_row["soc"]
-            soc_df_slice.loc[last_index] = last_row
 
         # iterate through a sorted list of charging options, best options first
         for charge_option in charging_list:
             # only use options with a score higher than 0. TODO set higher minimum score in config?
-            if charge_option["score"] > 0:
-                # if capacity of charger is already blocked, don't add this charging event
-                # currently charging events are calculated separately, so we have to prevent multi charging here
-                if not charge_option["charge_event"].start_point.is_available(
-                    charge_option["charge_event"].start_time,
-                    charge_option["charge_event"].end_time,
-                ):
-                    continue
-                # if not min_soc_satisfied:
-                charge_index = soc_df_slice.loc[
-                    soc_df_slice["timestep"] >= charge_option["timestep"]
-                ].index
-
-                # apply delta soc to timeseries
-                delta_soc = charge_option["delta_soc"]
-                for i in charge_index:
-                    new_soc = min(soc_df_slice.at[i, "soc"] + delta_soc, 1.0)
-                    if new_soc == 1.0:
-                        delta_soc = new_soc - soc_df_slice.at[i, "soc"]
-                    soc_df_slice.at[i, "soc"] = new_soc
-                    soc_df_slice.at[i, "necessary_charging"] -= delta_soc
-
-                min_soc_bool = soc_df_slice["necessary_charging"] <= 0
-                min_soc_satisfied = min_soc_bool.all()
-                total_charge += charge_option["delta_soc"]
-                end_soc_satisfied = (
-                    soc_df_slice.iat[-1, -1] < self.simulation.soc_min - end_soc
-                )
+            if charge_option["score"] <= 0:
+                break
+            # if capacity of charger is already blocked, don't add this charging event
+            # currently charging events are calculated separately, so we have to prevent multi charging here
+            if not charge_option["charge_event"].start_point.is_available(
+                charge_option["charge_event"].start_time,
+                charge_option["charge_event"].end_time,
+                plug_types=vehicle.vehicle_type.plugs,
+            ):
+                continue
+            # apply delta soc to timeseries
+            critical_socs.apply_delta(
+                charge_option["timestep"], charge_option["delta_soc"]
+            )
+
+            min_soc_satisfied = critical_socs.min_soc_satisfied
+            total_charge += charge_option["delta_soc"]
+            end_soc_satisfied = critical_socs.end_soc_satisfied(
+                self.simulation.soc_min, end_soc
+            )
 
-                chosen_events.append(charge_option)
-                # TODO implement not choosing events if max charge is satisfied
-                # and they don't contribute to min_soc or end_soc, or check if already implemented
+            chosen_events.append(charge_option)
+            if applied_events is not None:
+                applied_events.append(charge_option)
+            # TODO implement not choosing events if max charge is satisfied
+            # and they don't contribute to min_soc or end_soc, or check if already implemented
 
-                if (
-                    total_charge > max_charge
-                    and min_soc_satisfied
-                    and end_soc_satisfied
-                ):
-                    return chosen_events
+            if total_charge > max_charge and min_soc_satisfied and end_soc_satisfied:
+                return chosen_events
 
-            else:
-                if min_soc_satisfied:
-                    if not end_soc_satisfied:
-                        print(
-                            f"Desired SoC {end_soc} for the last time step couldn't be met for vehicle {vehicle.id}"
-                        )
-                    return chosen_events
+        # no usable option is left, also if the remaining options are occupied
+        if min_soc_satisfied:
+            if not end_soc_satisfied:
+                print(
+                    f"Desired SoC {end_soc} for the last time step couldn't be met for vehicle {vehicle.id}"
+                )
+            return chosen_events
 
-                if not self.simulation.delete_rides:
-                    raise ValueError(
-                        f"Not enough charging possible for vehicle {vehicle.id}!"
-                    )
-                else:
-                    self.delete_ride(soc_df_slice, vehicle)
-                    return None
-
-    def delete_ride(self, soc_df, vehicle):
-        # get all tasks that still need charging to be possible
-        impossible_tasks = soc_df.loc[soc_df["necessary_charging"] > 0]
-        # get starting time of first impossible task (row 0, column 0: "timestep")
-        first_impossible_task_start = impossible_tasks.iat[0, 0]
+        if self._get_skipped_evaluations() > skipped_evaluations:
+            # rides are only deleted if all options were evaluated, not because time ran out
+            print(
+                f"Planning time budget is used up, vehicle {vehicle.id} keeps the best charging plan found so far"
+            )
+            self._unexplored_vehicles.append(vehicle.id)
+            return chosen_events
+
+        if not self.simulation.delete_rides:
+            raise ValueError(f"Not enough charging possible for vehicle {vehicle.id}!")
+        else:
+            self.delete_ride(critical_socs, vehicle)
+            return None
+
+    def delete_ride(self, soc_trajectory, vehicle):
+        # get starting time of first task that still needs charging to be possible
+        first_impossible_task_start = soc_trajectory.first_unsatisfied_start()
         # cancel the impossible task. not setting the valid_schedule flag results in
         # a recalculation of charging slots without the impossible task
-        first_impossible_task = vehicle.get_task(first_impossible_task_start)
+        self._remove_ride(vehicle, first_impossible_task_start)
+
+    def _remove_ride(self, vehicle: "Vehicle", ride_start: int):
+        """Removes the ride starting at the given time step and connects the next task to its start point.
+
+        Parameters
+        ----------
+        vehicle : Vehicle
+            Vehicle to remove the ride from
+        ride_start : int
+            Starting time step of the ride
+        """
+        first_impossible_task = vehicle.get_task(ride_start)
         if first_impossible_task is None:
             raise ValueError("No task to remove or change to has been found")
         vehicle.remove_task(first_impossible_task)
 
-        next_task = vehicle.get_next_task(int(first_impossible_task_start))
+        next_task = vehicle.get_next_task(ride_start)
         if next_task is not None:
             vehicle.remove_task(next_task)
             next_task.start_point = first_impossible_task.start_point
-            next_task.is_calulated = False
             vehicle.add_task(next_task)
             # TODO change time needed for this task?
 
         print(
             f"Not enough charging possible for vehicle {vehicle.id},",
-            f"ride starting at timestep {first_impossible_task_start} had to be removed!",
+            f"ride starting at timestep {ride_start} had to be removed!",
         )
+        self.deleted_rides.append((vehicle.id, ride_start))
         self.simulation.observer.add_to_accumulated_results(
             f"deleted_rides_vehicle_{vehicle.id}", 1
         )
@@ -246,40 +1272,357 @@ class Schedule(SimulationType):
             if "task_from" in charge_option:
                 vehicle.add_task(charge_option["task_from"])
 
-    def run(self):
-        """Run the scenario with this strategy."""
-        # create tasks for all vehicles from input schedule
-        self._create_initial_schedule()
-        # create charging tasks based on rating
+    def _get_planning_windows(self):
+        """Yields the time windows that are planned and simulated one after another.
+
+        Each window covers simulation.planning_horizon days. If the planning horizon is 0,
+        the whole simulation period is a single window.
+
+        Yields
+        ------
+        tuple[int, int]
+            Starting and excluded ending time step of the window
+        """
+        if self.simulation.planning_horizon <= 0:
+            yield 0, self.simulation.time_steps
+            return
+        start = 0
+        for end in self._get_day_boundaries(self.simulation.planning_horizon):
+            yield start, end
+            start = end
+
+    def _get_day_boundaries(self, days: int):
+        """Yields every end of day time step after the given number of days, up to the end of the simulation.
+
+        Parameters
+        ----------
+        days : int
+            Number of days between two boundaries
+
+        Yields
+        ------
+        int
+            Time step of the boundary
+        """
+        time_steps = self.simulation.time_steps
+        step = 0
+        while step < time_steps:
+            for _ in range(days):
+                step = self.simulation.get_end_of_day_timestep(step)
+                if step >= time_steps:
+                    break
+            yield step
+
+    def _iterate_tasks(self, start: int, end: int):
+        """Yields all tasks of the fleet in execution order.
+
+        Tasks are merged from the sorted task lists of all vehicles with a priority queue, so the cost scales
+        with the number of tasks instead of time steps times vehicles. Tasks starting in the same time step
+        are returned in the order of self.simulation.vehicles.
+
+        Parameters
+        ----------
+        start : int
+            First time step to execute tasks in
+        end : int
+            Excluded last time step to execute tasks in
+
+        Yields
+        ------
+        tuple[int, Vehicle, Task]
+            Starting time step, vehicle and task to be executed
+        """
+        task_queues = []
+        for order, veh in enumerate(self.simulation.vehicles.values()):
+            task_queues.append(
+                [(task.start_time, order, veh) for task in veh.get_tasks(start, end)]
+            )
+        for step, _, veh in heapq.merge(*task_queues, key=itemgetter(0, 1)):
+            yield step, veh, veh.tasks[step]
+
+    def _save_checkpoint(self, step: int, writer: "ResultWriter"):
+        """Saves the simulation state before executing the tasks at the given step.
+
+        Parameters
+        ----------
+        step : int
+            First time step that hasn't been simulated yet
+        writer : ResultWriter
+            Writer of the vehicle events, flushed before saving
+        """
+        writer.flush()
+        state = {
+            "step": step,
+            "vehicle_types": self.simulation.vehicle_types,
+            "vehicles": self.simulation.vehicles,
+            "locations": self.simulation.locations,
+            "charging_locations": self.simulation.charging_locations,
+            "observer": self.simulation.observer,
+            "deleted_rides": self.deleted_rides,
+            "day_plans": self._day_plans,
+            "planning_report": self.planning_report,
+            "writer": writer.get_state(),
+        }
+        save_checkpoint(self.simulation.save_directory, state)
+        print(f"==== Saved checkpoint at time step {step} ====")
+
+    def _save_checkpoint_if_due(
+        self, step: int, writer: "ResultWriter", checkpoint_steps: Deque[int]
+    ):
+        """Saves a checkpoint if the next checkpoint step has been reached.
+
+        Parameters
+        ----------
+        step : int
+            First time step that hasn't been simulated yet
+        writer : ResultWriter
+            Writer of the vehicle events
+        checkpoint_steps : deque[int]
+            Remaining checkpoint steps in ascending order, reached steps are removed
+        """
+        if not checkpoint_steps or step < checkpoint_steps[0]:
+            return
+        self._save_checkpoint(step, writer)
+        while checkpoint_steps and checkpoint_steps[0] <= step:
+            checkpoint_steps.popleft()
+
+    def _load_checkpoint(self):
+        """Restores the simulation state of the latest checkpoint of this scenario.
+
+        Results of the resumed run are written to the directory of the checkpoint.
+
+        Returns
+        -------
+        tuple[int, dict]
+            Time step to continue from and state of the ResultWriter
+
+        Raises
+        ------
+        FileNotFoundError
+            If there is no checkpoint of this scenario.
+        """
+        simulation = self.simulation
+        path = find_latest_checkpoint(
+            simulation.save_directory.parent,
+            f"{simulation.scenario_name}_{simulation.simulation_type}",
+        )
+        if path is None:
+            raise FileNotFoundError(
+                f"No checkpoint found in {simulation.save_directory.parent}."
+            )
+        state = load_checkpoint(path)
+        simulation.save_directory = path.parent
+        simulation.vehicle_types = state["vehicle_types"]
+        simulation.vehicles = state["vehicles"]
+        simulation.locations = state["locations"]
+        simulation.charging_locations = state["charging_locations"]
+        simulation.observer = state["observer"]
+        self.deleted_rides = state["deleted_rides"]
+        self._day_plans = state["day_plans"]
+        self.planning_report = state["planning_report"]
+        print(f"==== Resuming from time step {state['step']} ({path}) ====")
+        return state["step"], state["writer"]
+
+    def _simulate(self, writer: "ResultWriter", resume_step: int = 0):
+        """Plans and simulates all planning windows, saving checkpoints in between.
+
+        Parameters
+        ----------
+        writer : ResultWriter
+            Writer of the vehicle events
+        resume_step : int
+            Time step to continue from, all tasks before it have already been simulated
+        """
+        checkpoint_steps: Deque[int] = deque()
+        if self.simulation.checkpoint_interval > 0:
+            checkpoint_steps.extend(
+                step
+                for step in self._get_day_boundaries(
+                    self.simulation.checkpoint_interval
+                )
+                if step > resume_step
+            )
+
         end_of_day_soc = self.simulation.end_of_day_soc
-        self._distribute_charging_slots(0, self.simulation.time_steps, end_of_day_soc)
-        # create save directory
+        with self._planning_workers():
+            for start, end in self._get_planning_windows():
+                if end <= resume_step:
+                    continue
+                # windows are planned unless a checkpoint was saved after their planning
+                if start >= resume_step:
+                    self._save_checkpoint_if_due(start, writer, checkpoint_steps)
+                    # create charging tasks based on rating, starting from the simulated SoC of the last window
+                    self._distribute_charging_slots(start, end, end_of_day_soc)
+                # simulate fleet task by task
+                for step, veh, task in self._iterate_tasks(
+                    max(start, resume_step), end
+                ):
+                    self._save_checkpoint_if_due(step, writer, checkpoint_steps)
+                    writer.update(step)
+                    self.execute_task(veh, task)
+
+    def _advance_planned_soc(self, start: int, end: int):
+        """Sets the SoC of all vehicles to the value expected after the planned tasks of a window.
+
+        Used instead of the simulation of the tasks in plan only mode.
+
+        Parameters
+        ----------
+        start : int
+            Starting time step of the window
+        end : int
+            Excluded ending time step of the window
+        """
+        for veh in self.simulation.vehicles.values():
+            for task in veh.get_tasks(start, end):
+                veh.soc = min(veh.soc + task.delta_soc, 1)
+
+    def get_planned_tasks(self):
+        """Returns the planned tasks of all vehicles.
+
+        Returns
+        -------
+        pd.DataFrame
+            One row per task, with locations given by name
+        """
+        return TaskTable.from_vehicles(self.simulation.vehicles).to_dataframe()
+
+    def export_plan(self):
+        """Writes the planned tasks and the deleted rides to the save directory."""
+        planned_tasks = self.get_planned_tasks()
+        planned_tasks.insert(
+            2, "timestamp", self._steps_to_timestamps(planned_tasks["start_time"])
+        )
+        planned_tasks.to_csv(
+            pathlib.Path(self.simulation.save_directory, "planned_tasks.csv"),
+            index=False,
+        )
+        deleted_rides = pd.DataFrame(
+            self.deleted_rides, columns=["vehicle_id", "start_time"]
+        )
+        deleted_rides["timestamp"] = self._steps_to_timestamps(
+            deleted_rides["start_time"]
+        )
+        deleted_rides.to_csv(
+            pathlib.Path(self.simulation.save_directory, "deleted_rides.csv"),
+            index=False,
+        )
+
+    def _steps_to_timestamps(self, steps: pd.Series) -> pd.Series:
+        """Converts time steps to timestamps, including steps after the end of the time series."""
+        return self.simulation.start_date + pd.to_timedelta(
+            steps * self.simulation.step_size, unit="min"
+        )
+
+    def plan(self):
+        """Plans the charging events of the scenario without simulating them and exports the plan.
+
+        Windows of the rolling horizon start from the SoC expected after the planned tasks.
+        """
+        self._create_initial_schedule()
+        self._plan_windows()
         if True in self.simulation.outputs.values():
             self.simulation.save_directory.mkdir(parents=True, exist_ok=True)
             self.save_inputs()
+            self.export_plan()
+            if self.simulation.planning_time_budget > 0:
+                self.export_planning_report()
 
-        # simulate fleet step by step
-        for step in range(self.simulation.time_steps):
-            # check all vehicles for tasks
-            for veh in self.simulation.vehicles.values():
-                task = veh.get_task(step)
-                if task is None:
-                    continue
-                else:
-                    self.execute_task(veh, task)
+    def _plan_windows(self):
+        """Plans all planning windows, starting each from the SoC expected after the previous one."""
+        end_of_day_soc = self.simulation.end_of_day_soc
+        with self._planning_workers():
+            for start, end in self._get_planning_windows():
+                self._distribute_charging_slots(start, end, end_of_day_soc)
+                self._advance_planned_soc(start, end)
+
+    def replan(self, weights: dict):
+        """Plans the charging events of the scenario again with other score weights.
+
+        If Simulation.keep_evaluations is set, charging locations evaluated by earlier planning runs are
+        rescored from the score components stored in Simulation.evaluation_components, so only breaks that
+        change with the new weights are calculated with SpiceEV. Like plan, the charging events aren't
+        simulated.
+
+        Parameters
+        ----------
+        weights : dict
+            Weight factors to change, with the keys of the [weights] section of the config
+
+        Returns
+        -------
+        pd.DataFrame
+            Planned tasks of all vehicles, see get_planned_tasks
 
-                veh.export(self.simulation.save_directory)
+        Raises
+        ------
+        ValueError
+            If a weight factor is unknown.
+        """
+        unknown = set(weights) - set(self.simulation.weights)
+        if unknown:
+            raise ValueError(f"Unknown weight factors: {', '.join(sorted(unknown))}")
+        self.simulation.weights = {**self.simulation.weights, **weights}
+        # start from the initial schedule again
+        self.simulation.vehicles = {}
+        for location in self.simulation.charging_locations:
+            location.init_occupation(self.simulation.time_steps)
+        self.simulation.observer = SimulationState()
+        self.deleted_rides = []
+        self._day_plans = {}
+        self.planning_report = []
+        self._create_initial_schedule()
+        self._plan_windows()
+        return self.get_planned_tasks()
+
+    def run(self, resume=False):
+        """Run the scenario with this strategy.
+
+        Parameters
+        ----------
+        resume : bool
+            Continue from the latest checkpoint instead of creating the schedule.
+        """
+        if self.simulation.plan_only:
+            self.plan()
+            return
+        resume_step = 0
+        if resume:
+            resume_step, writer_state = self._load_checkpoint()
+        else:
+            # create tasks for all vehicles from input schedule
+            self._create_initial_schedule()
+        # create save directory
+        if True in self.simulation.outputs.values():
+            self.simulation.save_directory.mkdir(parents=True, exist_ok=True)
+            if not resume:
+                self.save_inputs()
+
+        writer = ResultWriter(
+            self.simulation.save_directory,
+            self.simulation.vehicles,
+            self.simulation.output_flush_interval,
+        )
+        if resume:
+            writer.set_state(writer_state)
+        self._simulate(writer, resume_step)
+        writer.flush()
         if self.simulation.outputs["vehicle_csv"]:
             self.simulation.observer.export_log(self.simulation.save_directory)
+        if (
+            True in self.simulation.outputs.values()
+            and self.simulation.planning_time_budget > 0
+        ):
+            self.export_planning_report()
 
         # generate power grid timeseries for locations
         if self.simulation.outputs["location_csv"]:
             output = {
                 "timestamp": self.simulation.time_series,
-                "total_power": [0 for _ in range(self.simulation.time_steps)],
-                "total_connected_vehicles": [
-                    0 for _ in range(self.simulation.time_steps)
-                ],
+                "total_power": np.zeros(self.simulation.time_steps),
+                "total_connected_vehicles": np.zeros(
+                    self.simulation.time_steps, dtype=int
+                ),
             }
 
             for location in self.simulation.charging_locations:
@@ -287,13 +1630,9 @@ class Schedule(SimulationType):
                     continue
                 for k, v in location.output.items():
                     if "total_power" in k:
-                        output["total_power"] = [
-                            sum(x) for x in zip(v, output["total_power"])
-                        ]
+                        output["total_power"] += v
                     if "total_connected_vehicles" in k:
-                        output["total_connected_vehicles"] = [
-                            sum(x) for x in zip(v, output["total_connected_vehicles"])
-                        ]
+                        output["total_connected_vehicles"] += v
                     output[k] = v
 
             df = pd.DataFrame(output)
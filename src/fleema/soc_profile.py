@@ -0,0 +1,114 @@
+"""This script includes the SocProfile class.
+
+Classes
+-------
+SocProfile
+"""
+
+from typing import Dict
+
+
+class SocProfile:
+    """SoC deltas of the tasks of a vehicle by starting time step, stored in a sparse Fenwick tree.
+
+    Adding, changing or removing a delta and summing the deltas of a time frame take O(log n) for the
+    n time steps covered by the tree. Only the nodes on the update paths of time steps with a delta are
+    stored, so the memory depends on the number of tasks instead of the number of time steps. Time steps
+    are used as indices directly, so tasks added later don't require rebuilding the tree. The covered
+    range doubles whenever a later time step is added.
+
+    Attributes
+    ----------
+    size : int
+        Number of time steps covered by the tree, a power of two.
+
+    """
+
+    def __init__(self, size: int = 1024):
+        """Constructor of the SocProfile class.
+
+        Parameters
+        ----------
+        size : int
+            Number of time steps covered initially, rounded up to a power of two.
+
+        """
+        self.size = 1 << max(size - 1, 0).bit_length()
+        self._deltas: Dict[int, float] = {}
+        # node i holds the sum of the deltas of the time steps i - (i & -i) to i - 1
+        self._tree: Dict[int, float] = {}
+
+    def __len__(self):
+        return len(self._deltas)
+
+    def get_value(self, time_step: int) -> float:
+        """Returns the SoC delta at the given time step, 0 if it has none."""
+        return self._deltas.get(time_step, 0.0)
+
+    def add(self, time_step: int, delta_soc: float):
+        """Adds a SoC delta at the given time step.
+
+        Parameters
+        ----------
+        time_step : int
+            Time step of the delta.
+        delta_soc : float
+            SoC delta, positive for charging.
+
+        """
+        self._deltas[time_step] = self._deltas.get(time_step, 0.0) + delta_soc
+        self._update(time_step, delta_soc)
+
+    def remove(self, time_step: int):
+        """Removes the SoC delta at the given time step, if there is one.
+
+        Parameters
+        ----------
+        time_step : int
+            Time step of the delta.
+
+        """
+        delta_soc = self._deltas.pop(time_step, None)
+        if delta_soc is not None:
+            self._update(time_step, -delta_soc)
+
+    def _update(self, time_step: int, delta_soc: float):
+        while time_step >= self.size:
+            # the root of the doubled tree covers all previous time steps, its other new nodes are empty
+            self._tree[2 * self.size] = self._tree.get(self.size, 0.0)
+            self.size *= 2
+        node = time_step + 1
+        while node <= self.size:
+            self._tree[node] = self._tree.get(node, 0.0) + delta_soc
+            node += node & -node
+
+    def get_cumulative_delta(self, end: int) -> float:
+        """Returns the sum of all deltas before the given time step.
+
+        Parameters
+        ----------
+        end : int
+            Excluded ending time step.
+
+        """
+        node = min(max(end, 0), self.size)
+        total = 0.0
+        while node > 0:
+            total += self._tree.get(node, 0.0)
+            node -= node & -node
+        return total
+
+    def get_delta(self, start: int, end: int) -> float:
+        """Returns the sum of all deltas in the time frame.
+
+        Parameters
+        ----------
+        start : int
+            Starting time step.
+        end : int
+            Excluded ending time step.
+
+        """
+        if end <= start:
+            return 0.0
+        return self.get_cumulative_delta(end) - self.get_cumulative_delta(start)
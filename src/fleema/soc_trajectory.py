@@ -0,0 +1,176 @@
+"""This script includes the SocTrajectory class.
+
+Classes
+-------
+SocTrajectory
+"""
+
+import numpy as np
+import pandas as pd
+from typing import Optional
+
+
+class SocTrajectory:
+    """Predicted SoC of a vehicle after each of its driving tasks, stored in NumPy arrays.
+
+    Attributes
+    ----------
+    drive_start : numpy.ndarray
+        Starting time steps of the tasks.
+    timestep : numpy.ndarray
+        Ending time steps of the tasks, at which the SoC is predicted.
+    soc : numpy.ndarray
+        Predicted SoC at each time step.
+    necessary_charging : numpy.ndarray
+        SoC that still has to be charged before each time step to stay above the minimum SoC.
+
+    """
+
+    def __init__(self, drive_start, timestep, soc, necessary_charging=None):
+        """Constructor of the SocTrajectory class.
+
+        Parameters
+        ----------
+        drive_start : array_like
+            Starting time steps of the tasks.
+        timestep : array_like
+            Ending time steps of the tasks.
+        soc : array_like
+            Predicted SoC at each time step.
+        necessary_charging : array_like, optional
+            SoC that has to be charged before each time step. Default is zero for all points.
+
+        """
+        self.drive_start = np.asarray(drive_start, dtype=np.int64)
+        self.timestep = np.asarray(timestep, dtype=np.int64)
+        self.soc = np.asarray(soc, dtype=np.float64)
+        if necessary_charging is None:
+            self.necessary_charging = np.zeros(len(self.soc))
+        else:
+            self.necessary_charging = np.asarray(necessary_charging, dtype=np.float64)
+
+    def __len__(self):
+        return len(self.soc)
+
+    @property
+    def last_soc(self):
+        """Returns the predicted SoC after the last task."""
+        return float(self.soc[-1])
+
+    @property
+    def min_soc_satisfied(self):
+        """Checks if no more charging is necessary at any point of the trajectory."""
+        return bool((self.necessary_charging <= 0).all())
+
+    @property
+    def dataframe(self):
+        return pd.DataFrame(
+            {
+                "drive_start": self.drive_start,
+                "timestep": self.timestep,
+                "soc": self.soc,
+                "necessary_charging": self.necessary_charging,
+            }
+        )
+
+    def copy(self) -> "SocTrajectory":
+        return SocTrajectory(
+            self.drive_start.copy(),
+            self.timestep.copy(),
+            self.soc.copy(),
+            self.necessary_charging.copy(),
+        )
+
+    def end_soc_satisfied(self, soc_min: float, end_soc: float) -> bool:
+        """Checks if the necessary charging of the last point reaches the desired end SoC.
+
+        Parameters
+        ----------
+        soc_min : float
+            Minimum SoC the necessary charging refers to.
+        end_soc : float
+            Desired SoC at the last point.
+
+        """
+        return bool(self.necessary_charging[-1] < soc_min - end_soc)
+
+    def get_soc(self, time_step: int) -> Optional[float]:
+        """Returns the predicted SoC of the first point at or after the given time step.
+
+        Parameters
+        ----------
+        time_step : int
+            Reference time step.
+
+        Returns
+        -------
+        Optional[float]
+            Predicted SoC, None if there is no point at or after the time step.
+
+        """
+        index = np.flatnonzero(self.timestep >= time_step)
+        if not len(index):
+            return None
+        return float(self.soc[index[0]])
+
+    def get_critical_points(self, soc_min: float) -> "SocTrajectory":
+        """Returns all points with a SoC at or below the minimum, including the last point.
+
+        Parameters
+        ----------
+        soc_min : float
+            Minimum SoC of the vehicle.
+
+        Returns
+        -------
+        SocTrajectory
+            Trajectory of the critical points with the necessary charging set to reach soc_min.
+
+        """
+        mask = self.soc <= soc_min
+        mask[-1] = True
+        return SocTrajectory(
+            self.drive_start[mask],
+            self.timestep[mask],
+            self.soc[mask],
+            soc_min - self.soc[mask],
+        )
+
+    def apply_delta(self, time_step: int, delta_soc: float):
+        """Adds a SoC delta to all points at or after the given time step.
+
+        The SoC is clipped at 1. Once a point would exceed it, the remaining delta for all
+        following points is reduced accordingly.
+
+        Parameters
+        ----------
+        time_step : int
+            First time step the delta applies to.
+        delta_soc : float
+            SoC delta, positive for charging.
+
+        """
+        index = np.flatnonzero(self.timestep >= time_step)
+        if not len(index):
+            return
+        soc = self.soc[index]
+        delta = np.minimum.accumulate(np.minimum(1.0 - soc, delta_soc))
+        previous_delta = np.concatenate(([delta_soc], delta[:-1]))
+        self.soc[index] = np.minimum(soc + previous_delta, 1.0)
+        self.necessary_charging[index] -= delta
+
+    def first_unsatisfied_start(self) -> int:
+        """Returns the starting time step of the first task that still needs charging.
+
+        Raises
+        ------
+        ValueError
+            If no charging is necessary at any point.
+
+        """
+        index = np.flatnonzero(self.necessary_charging > 0)
+        if not len(index):
+            raise ValueError(
+                "Minimum SoC is satisfied at every point of the trajectory"
+            )
+        return int(self.drive_start[index[0]])
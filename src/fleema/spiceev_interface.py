@@ -4,6 +4,7 @@ import math
 from spice_ev.scenario import Scenario
 
 from fleema.util.helpers import deep_update
+from fleema.charging_profile import ChargingProfile
 
 
 def get_spice_ev_scenario_dict(
@@ -178,6 +179,26 @@ def get_charging_characteristic(
     return result_dict
 
 
+def get_charging_profile(scenario) -> "ChargingProfile":
+    """Returns the charging power of the vehicle in a spice_ev scenario as run-length profile.
+
+    Parameters
+    ----------
+    scenario : Scenario
+        SpiceEV Scenario object.
+
+    Returns
+    -------
+    ChargingProfile
+        Charging power in kW, consecutive intervals with the same power are merged.
+
+    """
+    powers = [list(d.values())[0] for d in scenario.connChargeByTS["GC1"]]
+    return ChargingProfile.from_intervals(
+        powers, int(scenario.interval.total_seconds() / 60)
+    )
+
+
 def get_current_time_series_value(
     timestamp: datetime.datetime, dataframe, dataframe_options: dict
 ):
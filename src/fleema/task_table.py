@@ -0,0 +1,141 @@
+"""This script includes the TaskTable class.
+
+Classes
+-------
+TaskTable
+"""
+
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Union, TYPE_CHECKING
+
+from fleema.event import Status
+
+if TYPE_CHECKING:
+    from fleema.vehicle import Vehicle
+
+STATUS_LIST = list(Status)
+
+
+class TaskTable:
+    """Tasks of the whole fleet as NumPy arrays with one entry per task.
+
+    Vehicles, locations and statuses are stored as integer codes, so the table can be
+    filtered and aggregated without touching the Task objects.
+
+    Attributes
+    ----------
+    vehicle_ids : list
+        Vehicle id of each vehicle code.
+    location_names : list
+        Location name of each location code.
+    vehicle : numpy.ndarray
+        Vehicle code of each task.
+    start_time : numpy.ndarray
+        Starting time step of each task.
+    end_time : numpy.ndarray
+        End time step of each task.
+    origin : numpy.ndarray
+        Location code of the start point of each task.
+    destination : numpy.ndarray
+        Location code of the end point of each task.
+    status : numpy.ndarray
+        Index of the task type in Status.
+    delta_soc : numpy.ndarray
+        SoC delta of each task.
+    consumption : numpy.ndarray
+        Consumption of each task.
+    level_of_loading : numpy.ndarray
+        Level of loading of each task.
+
+    """
+
+    def __init__(self, num_tasks: int = 0):
+        """Constructor of the TaskTable class.
+
+        Parameters
+        ----------
+        num_tasks : int
+            Number of tasks the arrays are allocated for.
+
+        """
+        self.vehicle_ids: List[Union[str, int]] = []
+        self.location_names: List[str] = []
+        self.vehicle = np.zeros(num_tasks, dtype=np.int32)
+        self.start_time = np.zeros(num_tasks, dtype=np.int64)
+        self.end_time = np.zeros(num_tasks, dtype=np.int64)
+        self.origin = np.zeros(num_tasks, dtype=np.int32)
+        self.destination = np.zeros(num_tasks, dtype=np.int32)
+        self.status = np.zeros(num_tasks, dtype=np.int8)
+        self.delta_soc = np.zeros(num_tasks)
+        self.consumption = np.zeros(num_tasks)
+        self.level_of_loading = np.zeros(num_tasks)
+
+    def __len__(self):
+        return len(self.start_time)
+
+    @classmethod
+    def from_vehicles(cls, vehicles: Dict[Union[str, int], "Vehicle"]) -> "TaskTable":
+        """Creates the table of the tasks of all vehicles, ordered by vehicle and starting time.
+
+        Parameters
+        ----------
+        vehicles : dict
+            Dictionary with vehicle ids as keys and Vehicle objects as values.
+
+        Returns
+        -------
+        TaskTable
+
+        """
+        table = cls(sum(len(veh.task_steps) for veh in vehicles.values()))
+        location_codes: Dict[str, int] = {}
+
+        def get_location_code(location):
+            if location.name not in location_codes:
+                location_codes[location.name] = len(table.location_names)
+                table.location_names.append(location.name)
+            return location_codes[location.name]
+
+        row = 0
+        for code, veh in enumerate(vehicles.values()):
+            table.vehicle_ids.append(veh.id)
+            for step in veh.task_steps:
+                task = veh.tasks[step]
+                table.vehicle[row] = code
+                table.start_time[row] = task.start_time
+                table.end_time[row] = task.end_time
+                table.origin[row] = get_location_code(task.start_point)
+                table.destination[row] = get_location_code(task.end_point)
+                table.status[row] = STATUS_LIST.index(task.task)
+                table.delta_soc[row] = task.delta_soc
+                table.consumption[row] = task.consumption
+                table.level_of_loading[row] = task.level_of_loading
+                row += 1
+        return table
+
+    def to_dataframe(self) -> pd.DataFrame:
+        """Returns the table with vehicle ids, location names and task type values instead of codes.
+
+        Returns
+        -------
+        pd.DataFrame
+            One row per task.
+
+        """
+        vehicle_ids = np.array(self.vehicle_ids, dtype=object)
+        location_names = np.array(self.location_names, dtype=object)
+        statuses = np.array([status.value for status in STATUS_LIST], dtype=object)
+        return pd.DataFrame(
+            {
+                "vehicle_id": vehicle_ids[self.vehicle],
+                "task": statuses[self.status],
+                "start_time": self.start_time,
+                "end_time": self.end_time,
+                "start_point": location_names[self.origin],
+                "end_point": location_names[self.destination],
+                "delta_soc": self.delta_soc,
+                "consumption": self.consumption,
+                "level_of_loading": self.level_of_loading,
+            }
+        )
@@ -2,10 +2,13 @@
 
 Functions
 -------
-Iblock_printing, read_input_data, deep_update
+Iblock_printing, read_input_data, deep_update, lazy_import, add_slots
 
 """
+
 import collections.abc
+import dataclasses
+import importlib
 import os
 import sys
 import pandas as pd
@@ -138,3 +141,35 @@ def deep_update(source, overrides):
         else:
             source[key] = overrides[key]
     return source
+
+
+def lazy_import(module_name):
+    """Imports an optional dependency, returns None if it isn't installed."""
+    try:
+        return importlib.import_module(module_name)
+    except ImportError:
+        return None
+
+
+def add_slots(cls):
+    """Class decorator which recreates a dataclass with __slots__ for all of its fields.
+
+    Equivalent to dataclass(slots=True) of Python 3.10, for older Python versions.
+    Fields of slotted base classes are left out. Apply it on top of the dataclass decorator.
+    """
+    inherited = {
+        name for base in cls.__mro__[1:] for name in getattr(base, "__slots__", ())
+    }
+    field_names = tuple(
+        f.name for f in dataclasses.fields(cls) if f.name not in inherited
+    )
+    cls_dict = dict(cls.__dict__)
+    cls_dict["__slots__"] = field_names
+    for name in field_names:
+        # default values are stored in the dataclass fields and would collide with the slots
+        cls_dict.pop(name, None)
+    cls_dict.pop("__dict__", None)
+    cls_dict.pop("__weakref__", None)
+    slotted_cls = type(cls)(cls.__name__, cls.__bases__, cls_dict)
+    slotted_cls.__qualname__ = cls.__qualname__
+    return slotted_cls
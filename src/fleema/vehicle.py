@@ -1,9 +1,11 @@
+import bisect
 from dataclasses import dataclass, field
-from typing import Optional, List, Dict
-import pandas as pd
+from typing import Optional, List, Dict, Set, Tuple
 import pathlib
 from fleema.location import Location
 from fleema.event import Status, Task
+from fleema.soc_profile import SocProfile
+from fleema.output_buffer import OutputBuffer
 
 
 @dataclass
@@ -70,10 +72,15 @@ class Vehicle:
     rotation : str, optional
     current_location : Location, optional
         Has current location if Vehicle was already to one assigned.
-    task : None
-    output: dict
+    tasks : dict
+        Tasks of the vehicle by their starting time step. Only change them with add_task and remove_task.
+    task_steps : list
+        Starting time steps of all tasks in ascending order.
+    soc_profile : SocProfile
+        SoC delta of each task at its starting time step, including charging tasks.
+    output: OutputBuffer
         Comprises all relevant information of the Vehicle object like locations, statuses, etc.
-        It gets updated by the private method _update_activity.
+        It gets updated by the private method _update_activity. Columns are read like a dict.
 
     """
 
@@ -114,31 +121,19 @@ class Vehicle:
         self.rotation = rotation
         self.current_location = current_location
         self.tasks: Dict[int, "Task"] = {}
+        self.task_steps: List[int] = []
+        # starting time steps of tasks that don't connect to their previous task
+        self._invalid_steps: Set[int] = set()
+        # version of the task list and the breaks of the latest time frame, with the time frame
+        # and the version they were calculated for
+        self._tasks_version = 0
+        self._breaks: Tuple[Optional[Tuple[int, int, int]], List["Task"]] = (None, [])
+        self.soc_profile = SocProfile()
         self.schedule = (
             None  # TODO add dataframe which has information for all timesteps
         )
 
-        self.output: dict = {
-            "timestamp": [],
-            "event_start": [],
-            "event_time": [],
-            "end_location": [],
-            "status": [],
-            "soc_start": [],
-            "soc_end": [],
-            "energy": [],
-            "actual_energy_from_grid": [],
-            "station_charging_capacity": [],
-            "average_charging_power": [],
-            "distance": [],
-            "energy_from_feed_in": [],
-            "energy_from_grid": [],
-            "energy_cost": [],
-            "emission": [],
-            "consumption": [],
-            "level_of_loading": [],
-            "v2g_energy": [],
-        }
+        self.output = OutputBuffer()
 
     def _update_activity(
         self,
@@ -182,54 +177,51 @@ class Vehicle:
 
         """
         if self.vehicle_type.event_csv:
-            self.soc = self.soc
-            self.output["timestamp"].append(timestamp)
-            self.output["event_start"].append(event_start)
-            self.output["event_time"].append(event_time)
-            self.output["status"].append(self.status)
-            self.output["soc_start"].append(
-                self.output["soc_end"][-1]
-                if len(self.output["soc_end"]) > 0
-                else self.soc_start
+            soc_start = (
+                self.output["soc_end"][-1] if self.output.size else self.soc_start
             )
-            self.output["soc_end"].append(self.soc)
-            charging_demand = self._get_last_charging_demand()
-            consumption = self._get_last_consumption()
-            self.output["energy"].append(charging_demand + consumption)
-            self.output["station_charging_capacity"].append(nominal_charging_capacity)
-            self.output["average_charging_power"].append(charging_power)
-            self.output["distance"].append(distance)
-            self.output["level_of_loading"].append(level_of_loading)
+            charging_demand = self._get_charging_demand(soc_start)
+            consumption = self._get_consumption(soc_start)
+            row = {
+                "timestamp": timestamp,
+                "event_start": event_start,
+                "event_time": event_time,
+                "end_location": (
+                    self.current_location.name
+                    if self.current_location is not None
+                    else ""
+                ),
+                "status": self.status,
+                "soc_start": soc_start,
+                "soc_end": self.soc,
+                "energy": charging_demand + consumption,
+                "station_charging_capacity": nominal_charging_capacity,
+                "average_charging_power": charging_power,
+                "distance": distance,
+                "level_of_loading": level_of_loading,
+                "consumption": interp_consumption,
+            }
             if charging_result is not None:
-                self.output["actual_energy_from_grid"].append(
-                    charging_result["grid_energy"]
-                )
                 energy_from_feed_in = charging_demand * charging_result["feed_in"]
-                self.output["energy_from_feed_in"].append(energy_from_feed_in)
-                self.output["energy_from_grid"].append(
-                    charging_demand - energy_from_feed_in
-                )
-                self.output["energy_cost"].append(charging_result["cost"])
-                self.output["emission"].append(charging_result["emission"])
-                self.output["v2g_energy"].append(charging_result["v2g_energy"])
-            else:
-                self.output["actual_energy_from_grid"].append(0)
-                self.output["energy_from_feed_in"].append(0)
-                self.output["energy_from_grid"].append(0)
-                self.output["energy_cost"].append(0)
-                self.output["emission"].append(0)
-                self.output["v2g_energy"].append(0)
-
-            if self.current_location is not None:
-                self.output["end_location"].append(self.current_location.name)
+                row["actual_energy_from_grid"] = charging_result["grid_energy"]
+                row["energy_from_feed_in"] = energy_from_feed_in
+                row["energy_from_grid"] = charging_demand - energy_from_feed_in
+                row["energy_cost"] = charging_result["cost"]
+                row["emission"] = charging_result["emission"]
+                row["v2g_energy"] = charging_result["v2g_energy"]
             else:
-                self.output["end_location"].append("")
+                row["actual_energy_from_grid"] = 0
+                row["energy_from_feed_in"] = 0
+                row["energy_from_grid"] = 0
+                row["energy_cost"] = 0
+                row["emission"] = 0
+                row["v2g_energy"] = 0
+            self.output.append(row)
             if simulation_state is not None:
                 simulation_state.update_vehicle(self)
                 simulation_state.log_data(
                     charging_demand, charging_result, distance, consumption
                 )
-            self.output["consumption"].append(interp_consumption)
 
     def add_task(self, task: "Task"):
         """Add a task to the self.tasks using the start_time as key."""
@@ -238,19 +230,84 @@ class Vehicle:
                 f"Key {task.start_time} already exists in tasks of vehicle {self.id}"
             )
         # otherwise, add new task to list, ordered by starting time
+        index = bisect.bisect_left(self.task_steps, task.start_time)
         self.tasks[task.start_time] = task
+        self.task_steps.insert(index, task.start_time)
+        self.soc_profile.add(task.start_time, task.delta_soc)
+        self._update_validity(index)
+        if index + 1 < len(self.task_steps):
+            self._update_validity(index + 1)
+        self._tasks_version += 1
 
     def remove_task(self, task: Optional["Task"]):
         """Remove a task from self.tasks."""
         if task is None:
             return
         if self.tasks[task.start_time] == task:
+            index = bisect.bisect_left(self.task_steps, task.start_time)
             del self.tasks[task.start_time]
+            del self.task_steps[index]
+            self.soc_profile.remove(task.start_time)
+            self._invalid_steps.discard(task.start_time)
+            if index < len(self.task_steps):
+                self._update_validity(index)
+            self._tasks_version += 1
         else:
             raise ValueError(
                 f"Task {task.__str__} is not in task list of vehicle {self.id} or has the wrong index"
             )
 
+    def update_task_soc(self, task: "Task"):
+        """Updates the SoC profile after the delta_soc of a task in the task list has changed."""
+        if self.tasks.get(task.start_time) is not task:
+            raise ValueError(
+                f"Task {task.__str__} is not in task list of vehicle {self.id} or has the wrong index"
+            )
+        self.soc_profile.add(
+            task.start_time,
+            task.delta_soc - self.soc_profile.get_value(task.start_time),
+        )
+
+    def get_soc_delta(self, start: int, end: int) -> float:
+        """Returns the summed SoC delta of all tasks starting in the time frame.
+
+        Parameters
+        ----------
+        start : int
+            Starting timestep
+        end : int
+            Excluded ending timestep
+        """
+        return self.soc_profile.get_delta(start, end)
+
+    def predict_soc(self, start: int, end: int) -> float:
+        """Returns the SoC expected after all tasks starting in the time frame, starting at the current SoC.
+
+        Charging tasks are included with their planned delta_soc. The result isn't limited to 1.
+
+        Parameters
+        ----------
+        start : int
+            Starting timestep
+        end : int
+            Excluded ending timestep
+        """
+        return self.soc + self.get_soc_delta(start, end)
+
+    def _update_validity(self, index: int):
+        """Checks if the task at the given index of self.task_steps connects to its previous task."""
+        step = self.task_steps[index]
+        if index > 0:
+            previous_task = self.tasks[self.task_steps[index - 1]]
+            task = self.tasks[step]
+            if not (
+                previous_task.end_point == task.start_point
+                and previous_task.end_time <= task.start_time
+            ):
+                self._invalid_steps.add(step)
+                return
+        self._invalid_steps.discard(step)
+
     def get_task(self, time_step: int):
         try:
             return self.tasks[time_step]
@@ -259,35 +316,52 @@ class Vehicle:
 
     def get_next_task(self, time_step: int):
         "Returns next task, not including the given timestep."
-        # get the biggest tasks key (last time step where a task starts)
-        last_task_start = max(self.tasks)
-        # only runs, if a task comes after specified time step
-        if time_step <= last_task_start:
-            # check every timestep for a new task, until one is found
-            for i in range(time_step + 1, last_task_start + 1):
-                task = self.get_task(i)
-                if task is not None:
-                    return task
-        else:
-            return None
+        index = bisect.bisect_right(self.task_steps, time_step)
+        if index < len(self.task_steps):
+            return self.tasks[self.task_steps[index]]
+        return None
+
+    def get_previous_task(self, time_step: int):
+        "Returns the last task starting before the given timestep."
+        index = bisect.bisect_left(self.task_steps, time_step)
+        if index > 0:
+            return self.tasks[self.task_steps[index - 1]]
+        return None
+
+    def get_tasks(self, start: int, end: Optional[int] = None) -> List["Task"]:
+        """Returns all tasks starting in the time frame, ordered by their starting time.
+
+        Parameters
+        ----------
+        start : int
+            Starting timestep
+        end : int, optional
+            Excluded ending timestep, default includes all later tasks
+        """
+        first = bisect.bisect_left(self.task_steps, start)
+        last = (
+            len(self.task_steps)
+            if end is None
+            else bisect.bisect_left(self.task_steps, end)
+        )
+        return [self.tasks[step] for step in self.task_steps[first:last]]
 
     @property
     def has_valid_task_list(self):
-        previous_task = None
-        for timestep, task in sorted(self.tasks.items()):
-            if previous_task is not None:
-                if not (
-                    previous_task.end_point == task.start_point
-                    and previous_task.end_time <= task.start_time
-                ):
-                    print(f"Warning: Error found in task list at timestep {timestep}.")
-                    return False
-            previous_task = task
+        if self._invalid_steps:
+            print(
+                f"Warning: Error found in task list at timestep {min(self._invalid_steps)}."
+            )
+            return False
         return True
 
     def get_breaks(self, start: int, end: int) -> List["Task"]:
         """Get break times according to self.tasks
 
+        Only tasks starting in the time frame are considered. The first break starts when the last task
+        of the previous time frame is finished. The breaks of the latest time frame are only calculated
+        again once tasks have been added or removed.
+
         Parameters
         ----------
         start : int
@@ -299,12 +373,27 @@ class Vehicle:
             print(f"Task list of vehicle {self.id} is not valid.")
             # Error disabled for testing purposes until schedule is fixed
             # raise AttributeError(f"Task list of vehicle {self.id} is not valid.")
-        breaks = []
-        _, first_task = sorted(self.tasks.items())[0]
-        if first_task.start_time > start:
+        key = (start, end, self._tasks_version)
+        if self._breaks[0] != key:
+            self._breaks = (key, self._calculate_breaks(start, end))
+        return list(self._breaks[1])
+
+    def _calculate_breaks(self, start: int, end: int) -> List["Task"]:
+        """Calculates the breaks of get_breaks."""
+        breaks: List["Task"] = []
+        window_tasks = self.get_tasks(start, end)
+        if not window_tasks:
+            return breaks
+        first_task = window_tasks[0]
+        # the first break starts after the last task of the previous time frame is finished
+        break_start = start
+        previous_window_task = self.get_previous_task(start)
+        if previous_window_task is not None:
+            break_start = max(start, previous_window_task.end_time)
+        if first_task.start_time > break_start:
             breaks.append(
                 Task(
-                    start,
+                    break_start,
                     first_task.start_time,
                     first_task.start_point,
                     first_task.start_point,
@@ -312,8 +401,8 @@ class Vehicle:
                 )
             )
         previous_task = first_task
-        for _, task in sorted(self.tasks.items()):
-            if task.end_time < end and task.task == Status.DRIVING:
+        for task in window_tasks:
+            if task.task == Status.DRIVING:
                 # TODO are other task types relevant?
                 if task.start_time > previous_task.end_time:
                     breaks.append(
@@ -480,9 +569,7 @@ class Vehicle:
 
         """
         if self.vehicle_type.event_csv:
-            activity = pd.DataFrame(self.output)
-
-            activity = activity.reset_index(drop=True)
+            activity = self.output.to_dataframe()
             activity = activity.round(4)
             activity.to_csv(pathlib.Path(directory, f"{self.id}_events.csv"))
 
@@ -533,20 +620,12 @@ class Vehicle:
         }
         return scenario_dict
 
-    def _get_last_charging_demand(self):
-        """Returns the charging demand of the previous event."""
-        if len(self.output["soc_start"]):
-            charging_demand = self.output["soc_end"][-1] - self.output["soc_start"][-1]
-            charging_demand *= self.vehicle_type.battery_capacity
-            return max(charging_demand, 0)
-        else:
-            return 0
-
-    def _get_last_consumption(self):
-        """Returns the consumption of the last event."""
-        if len(self.output["soc_start"]):
-            last_consumption = self.output["soc_end"][-1] - self.output["soc_start"][-1]
-            last_consumption *= self.vehicle_type.battery_capacity
-            return min(last_consumption, 0)
-        else:
-            return 0
+    def _get_charging_demand(self, soc_start: float):
+        """Returns the charging demand of an event starting at the given SoC and ending at the current SoC."""
+        charging_demand = (self.soc - soc_start) * self.vehicle_type.battery_capacity
+        return max(charging_demand, 0)
+
+    def _get_consumption(self, soc_start: float):
+        """Returns the consumption of an event starting at the given SoC and ending at the current SoC."""
+        consumption = (self.soc - soc_start) * self.vehicle_type.battery_capacity
+        return min(consumption, 0)
@@ -43,3 +43,19 @@ def test_scenario_info_no_charging_points():
         match="Scenario dictionary requested of charger charger with no charging points",
     ):
         ch.get_scenario_info("0", ["Schuko"])
+
+
+def test_get_best_point():
+    slow = charger.PlugType("Type2_22", 22, "Type2")
+    fast = charger.PlugType("CCS_50", 50, "CCS")
+    station = charger.Charger(
+        "station",
+        [
+            charger.ChargingPoint("station_0", [slow]),
+            charger.ChargingPoint("station_1", [slow, fast]),
+        ],
+    )
+    assert station.get_best_point(["Type2", "CCS"]) == ("station_1", 50)
+    assert station.get_best_point(["CCS", "Type2"]) == ("station_1", 50)
+    assert station.get_best_point(["Type2"]) == ("station_0", 22)
+    assert station.get_best_point(["inductive"]) == (None, 0)
@@ -0,0 +1,129 @@
+from fleema.charging_assignment import (
+    ChargingCandidate,
+    assign_charging_heuristic,
+    assign_charging_milp,
+)
+from fleema.charger import Charger, ChargingPoint, PlugType
+from fleema.event import Task, Status
+from fleema.location import Location
+from fleema.soc_trajectory import SocTrajectory
+
+import pytest
+
+
+@pytest.fixture()
+def depot():
+    location = Location("depot", chargers=[Charger("charger", [])])
+    location.init_occupation(100)
+    return location
+
+
+@pytest.fixture()
+def mixed_depot():
+    type2 = PlugType("type2", 22, "Type2")
+    ccs = PlugType("ccs", 50, "CCS")
+    location = Location(
+        "mixed_depot",
+        chargers=[
+            Charger("ac", [ChargingPoint("ac_0", [type2])]),
+            Charger("dc", [ChargingPoint("dc_0", [ccs])]),
+        ],
+    )
+    location.init_occupation(100)
+    return location
+
+
+def candidate(
+    vehicle_id, break_index, location, start, end, score, delta_soc=0.2, plugs=()
+):
+    charge_event = Task(start, end, location, location, Status.CHARGING)
+    option = {
+        "timestep": start,
+        "score": score,
+        "consumption": 0,
+        "charge": delta_soc,
+        "delta_soc": delta_soc,
+        "charge_event": charge_event,
+    }
+    return ChargingCandidate(vehicle_id, break_index, option, plugs)
+
+
+def requirement(soc=0.1, soc_min=0.2):
+    return SocTrajectory([60], [70], [soc]).get_critical_points(soc_min)
+
+
+def test_heuristic_respects_charger_capacity(depot):
+    candidates = [
+        candidate("a", 0, depot, 10, 20, 5),
+        candidate("b", 0, depot, 15, 25, 4),
+    ]
+    requirements = {"a": requirement(), "b": requirement()}
+    assignment = assign_charging_heuristic(candidates, requirements, 0.2, 0.2)
+    assert list(assignment) == ["a"]
+
+
+def test_heuristic_stops_for_satisfied_vehicle(depot):
+    candidates = [
+        candidate("a", 0, depot, 10, 20, 5),
+        candidate("a", 1, depot, 30, 40, 4),
+    ]
+    requirements = {"a": requirement()}
+    assignment = assign_charging_heuristic(candidates, requirements, 0.2, 0.2)
+    assert len(assignment["a"]) == 1
+    assert assignment["a"][0]["timestep"] == 10
+
+
+def test_heuristic_existing_occupation(depot):
+    depot.add_occupation(18, 30)
+    candidates = [candidate("a", 0, depot, 10, 20, 5)]
+    assignment = assign_charging_heuristic(candidates, {"a": requirement()}, 0.2, 0.2)
+    assert assignment == {}
+
+
+def test_heuristic_respects_plug_types(mixed_depot):
+    candidates = [
+        candidate("a", 0, mixed_depot, 10, 20, 5, plugs=["CCS"]),
+        candidate("b", 0, mixed_depot, 15, 25, 4, plugs=["CCS"]),
+        candidate("c", 0, mixed_depot, 15, 25, 3, plugs=["Type2"]),
+    ]
+    requirements = {vehicle_id: requirement() for vehicle_id in "abc"}
+    assignment = assign_charging_heuristic(candidates, requirements, 0.2, 0.2)
+    assert list(assignment) == ["a", "c"]
+    assert assignment["a"][0]["charge_event"].charging_point == "dc_0"
+    assert assignment["c"][0]["charge_event"].charging_point == "ac_0"
+
+
+def test_heuristic_occupied_charging_point(mixed_depot):
+    mixed_depot.add_occupation(18, 30, "dc_0")
+    mixed_depot.add_occupation(18, 30)
+    candidates = [candidate("a", 0, mixed_depot, 10, 20, 5, plugs=["CCS"])]
+    assignment = assign_charging_heuristic(candidates, {"a": requirement()}, 0.2, 0.2)
+    assert assignment == {}
+
+
+def test_milp_respects_plug_types(mixed_depot):
+    pytest.importorskip("scipy.optimize")
+    candidates = [
+        candidate("a", 0, mixed_depot, 10, 20, 5, plugs=["CCS"]),
+        candidate("b", 0, mixed_depot, 15, 25, 4, plugs=["CCS"]),
+    ]
+    requirements = {"a": requirement(), "b": requirement()}
+    assignment = assign_charging_milp(candidates, requirements, 0.2, 0.2)
+    assert list(assignment) == ["a"]
+    assert assignment["a"][0]["charge_event"].charging_point == "dc_0"
+
+
+def test_milp_satisfies_whole_fleet(depot):
+    pytest.importorskip("scipy.optimize")
+    candidates = [
+        candidate("a", 0, depot, 10, 20, 5),
+        candidate("a", 1, depot, 30, 40, 1),
+        candidate("b", 0, depot, 10, 20, 4),
+    ]
+    requirements = {"a": requirement(), "b": requirement()}
+    # the heuristic gives the shared slot to the best candidate and leaves b without charging
+    heuristic = assign_charging_heuristic(candidates, requirements, 0.2, 0.2)
+    assert "b" not in heuristic
+    assignment = assign_charging_milp(candidates, requirements, 0.2, 0.2)
+    assert [o["timestep"] for o in assignment["a"]] == [30]
+    assert [o["timestep"] for o in assignment["b"]] == [10]
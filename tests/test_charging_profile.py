@@ -0,0 +1,27 @@
+from fleema.charging_profile import ChargingProfile
+
+import pytest
+
+
+def test_from_intervals():
+    profile = ChargingProfile.from_intervals([11, 11, 11, 5, 0, 0], 15)
+    assert len(profile) == 3
+    assert list(profile.start) == [0, 45, 60]
+    assert list(profile.duration) == [45, 15, 30]
+    assert profile.total_duration == 90
+    assert profile.average_power == pytest.approx((11 * 45 + 5 * 15) / 90)
+
+
+def test_to_array():
+    profile = ChargingProfile.from_intervals([2, 3], 2)
+    assert list(profile.to_array(6)) == [2, 2, 3, 3, 0, 0]
+    assert list(profile.to_array(3)) == [2, 2, 3]
+    # runs with a gap in between
+    profile = ChargingProfile([1, 4], [2, 1], [7, 8])
+    assert list(profile.to_array(6)) == [0, 7, 7, 0, 8, 0]
+
+
+def test_empty_profile():
+    profile = ChargingProfile.from_intervals([], 15)
+    assert profile.average_power == 0
+    assert list(profile.to_array(2)) == [0, 0]
@@ -0,0 +1,23 @@
+from fleema.checkpoint import save_checkpoint, load_checkpoint, find_latest_checkpoint
+from fleema.location import Location
+
+
+def test_save_and_load(tmp_path):
+    location = Location("depot")
+    location.init_occupation(10)
+    location.add_occupation(2, 4)
+    state = {"step": 5, "locations": {"depot": location}, "same": location}
+    path = save_checkpoint(tmp_path / "run", state)
+
+    loaded = load_checkpoint(path)
+    assert loaded["step"] == 5
+    assert loaded["locations"]["depot"] is loaded["same"]
+    assert loaded["same"].occupation.equals(location.occupation)
+
+
+def test_find_latest_checkpoint(tmp_path):
+    assert find_latest_checkpoint(tmp_path, "scenario_schedule") is None
+    save_checkpoint(tmp_path / "scenario_schedule_2022-01-01_120000", {})
+    latest = save_checkpoint(tmp_path / "scenario_schedule_2022-01-02_080000", {})
+    save_checkpoint(tmp_path / "other_schedule_2022-01-03_080000", {})
+    assert find_latest_checkpoint(tmp_path, "scenario_schedule") == latest
@@ -1,5 +1,6 @@
 import fleema.location as location
 import fleema.charger as charger
+from fleema.charging_profile import ChargingProfile
 from fleema.event import Task, Status
 import pytest
 
@@ -56,3 +57,136 @@ def test_add_occupation_from_event(parking_spot, charging_task):
 def test_occupation(parking_spot):
     parking_spot.init_occupation(2)
     assert parking_spot.is_available(0, 0)
+
+
+def test_occupation_ranges(parking_spot):
+    parking_spot.init_occupation(100)
+    parking_spot.add_occupation(10, 20)
+    parking_spot.add_occupation(15, 30)
+    assert parking_spot.get_max_occupation(0, 9) == 0
+    assert parking_spot.get_max_occupation(0, 15) == 2
+    assert parking_spot.get_max_occupation(21, 200) == 1
+    assert parking_spot.is_available(31, 40)
+    assert not parking_spot.is_available(25, 40)
+    # ranges outside of the time steps are ignored
+    parking_spot.add_occupation(95, 120)
+    assert parking_spot.get_max_occupation(120, 130) == 0
+    assert list(parking_spot.occupation["total"][[9, 10, 15, 21, 31, 99]]) == [
+        0,
+        1,
+        2,
+        1,
+        0,
+        1,
+    ]
+
+
+@pytest.fixture()
+def depot():
+    slow = charger.PlugType("slow", 11, "Type2")
+    fast = charger.PlugType("fast", 150, "CCS")
+    depot = location.Location(
+        "depot",
+        chargers=[
+            charger.Charger("slow", [charger.ChargingPoint("slow_0", [slow])]),
+            charger.Charger(
+                "fast",
+                [
+                    charger.ChargingPoint("fast_0", [fast]),
+                    charger.ChargingPoint("fast_1", [slow, fast]),
+                ],
+            ),
+        ],
+    )
+    depot.init_occupation(100)
+    return depot
+
+
+def test_charging_point_assignment(depot):
+    assert depot.num_charging_points == 3
+    events = [Task(10, 20, depot, depot, Status.CHARGING) for _ in range(3)]
+    for event in events:
+        depot.add_occupation_from_event(event, ["CCS", "Type2"])
+    assert [event.charging_point for event in events] == ["fast_0", "fast_1", "slow_0"]
+    assert not depot.is_available(15, 15)
+    assert depot.get_max_occupation(10, 20, "fast_1") == 1
+
+    other = Task(30, 40, depot, depot, Status.CHARGING)
+    depot.add_occupation_from_event(other, ["CCS"])
+    assert other.charging_point == "fast_0"
+    assert depot.is_available(35, 35)
+    assert not depot.is_available(35, 35, plug_types=["inductive"])
+
+
+def test_preferred_charging_point(depot):
+    event = Task(10, 20, depot, depot, Status.CHARGING, charging_point="fast_1")
+    depot.add_occupation_from_event(event, ["CCS"])
+    assert event.charging_point == "fast_1"
+    # an occupied preferred point is replaced by the best free one
+    other = Task(15, 25, depot, depot, Status.CHARGING, charging_point="fast_1")
+    depot.add_occupation_from_event(other, ["CCS"])
+    assert other.charging_point == "fast_0"
+    # a preferred point without the plug types of the vehicle isn't used
+    incompatible = Task(40, 50, depot, depot, Status.CHARGING, charging_point="slow_0")
+    depot.add_occupation_from_event(incompatible, ["CCS"])
+    assert incompatible.charging_point == "fast_0"
+    with pytest.raises(ValueError):
+        depot.add_occupation_from_event(
+            Task(18, 22, depot, depot, Status.CHARGING), ["CCS"]
+        )
+
+
+def test_scenario_info_of_point(depot):
+    info = depot.get_scenario_info(["Type2"], "fast_1")
+    assert list(info["components"]["charging_stations"]) == ["fast_1"]
+    info = depot.get_scenario_info(["CCS"])
+    assert list(info["components"]["charging_stations"]) == ["fast_0"]
+
+
+def test_output_of_point(depot):
+    depot.update_output(0, 3, 1, 10, ChargingProfile([0], [3], [5]), "fast_1")
+    assert list(depot.output["fast_1_power"][:4]) == [5, 5, 5, 0]
+    assert list(depot.output["fast_0_power"][:4]) == [0, 0, 0, 0]
+    assert list(depot.output["depot_total_connected_vehicles"][:4]) == [1, 1, 1, 0]
+    # events without a charging point only count in the totals
+    depot.update_output(0, 1, 1, 10, ChargingProfile([0], [1], [2]))
+    assert depot.output["depot_total_power"][0] == 7
+    assert depot.output["fast_0_power"][0] == 0
+    assert depot.output["slow_0_power"][0] == 0
+    with pytest.raises(ValueError):
+        depot.update_output(0, 1, 1, 10, ChargingProfile([0], [1], [2]), "unknown")
+
+
+def test_output_steps(parking_spot):
+    profile = ChargingProfile.from_intervals([1, 2, 3], 1)
+    parking_spot.update_output(2, 8, 2, 7, profile)
+    # steps 2, 4 and 6 get the first powers of the profile
+    assert list(parking_spot.output["_total_power"]) == [0, 0, 1, 0, 2, 0, 3]
+    parking_spot.update_output(5, 10, 1, 7, ChargingProfile([0], [1], [4]))
+    assert list(parking_spot.output["_total_power"][5:]) == [4, 3]
+    assert list(parking_spot.output["_total_connected_vehicles"]) == [
+        0,
+        0,
+        1,
+        0,
+        1,
+        1,
+        2,
+    ]
+
+
+def test_best_point(depot):
+    assert depot.get_best_point(["Type2"]) == ("slow_0", 11)
+    assert depot.get_best_point(["CCS", "Type2"]) == ("fast_0", 150)
+    assert [cp.id for cp in depot.get_ranked_points(["Type2"])] == ["slow_0", "fast_1"]
+    depot.init_plug_sets([["CCS"], ["inductive"]])
+    assert depot.get_ranked_points(["inductive"]) == []
+    assert depot.get_best_point(["inductive"]) == (None, 0.0)
+    assert frozenset(["CCS"]) in depot._best_points
+
+    plug = charger.PlugType("high", 300, "CCS")
+    depot.add_charger(
+        charger.Charger("high", [charger.ChargingPoint("high_0", [plug])])
+    )
+    assert depot.get_best_point(["CCS"]) == ("high_0", 300)
+    assert depot.get_ranked_points(["CCS"])[0].id == "high_0"
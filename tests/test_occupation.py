@@ -0,0 +1,29 @@
+from fleema.occupation import Occupation
+
+import numpy as np
+import random
+
+
+def test_matches_array():
+    random.seed(3)
+    occupation = Occupation(257)
+    values = np.zeros(257, dtype=int)
+    for _ in range(300):
+        start = random.randrange(-5, 260)
+        end = random.randrange(start, 270)
+        value = random.choice([1, 1, -1])
+        occupation.add(start, end, value)
+        values[max(start, 0) : end + 1] += value
+        query_start = random.randrange(0, 257)
+        query_end = random.randrange(query_start, 257)
+        assert occupation.get_max(query_start, query_end) == max(
+            values[query_start : query_end + 1]
+        )
+    assert (occupation.to_array() == values).all()
+
+
+def test_empty_range():
+    occupation = Occupation(10)
+    occupation.add(5, 3)
+    assert occupation.get_max(5, 3) == 0
+    assert occupation.get_max(20, 30) == 0
@@ -0,0 +1,60 @@
+from fleema.output_buffer import OutputBuffer
+from fleema.event import Status
+
+import numpy as np
+import pandas as pd
+import pytest
+
+
+@pytest.fixture()
+def buffer():
+    return OutputBuffer(
+        {
+            "timestamp": "datetime64[ns]",
+            "event_start": np.int32,
+            "end_location": "category",
+            "status": "status",
+            "soc_end": np.float64,
+        },
+        capacity=1,
+    )
+
+
+def add_events(buffer, num_events):
+    for i in range(num_events):
+        buffer.append(
+            {
+                "timestamp": pd.Timestamp(2022, 1, 1, 0, i),
+                "event_start": i,
+                "end_location": "home" if i % 2 else "work",
+                "status": Status.DRIVING if i % 2 else Status.PARKING,
+                "soc_end": 1 - i / 10,
+            }
+        )
+
+
+def test_append_grows(buffer):
+    add_events(buffer, 5)
+    assert buffer.size == 5
+    assert list(buffer["event_start"]) == [0, 1, 2, 3, 4]
+    assert buffer["event_start"].dtype == np.int32
+    assert buffer["soc_end"][-1] == pytest.approx(0.6)
+    assert list(buffer["end_location"]) == ["work", "home", "work", "home", "work"]
+    assert buffer["status"][1] == Status.DRIVING
+    assert buffer["timestamp"][2] == pd.Timestamp(2022, 1, 1, 0, 2)
+
+
+def test_to_dataframe(buffer):
+    add_events(buffer, 4)
+    df = buffer.to_dataframe(1, 3)
+    assert list(df.index) == [1, 2]
+    assert list(df.columns) == list(buffer)
+    assert list(df["end_location"]) == ["home", "work"]
+    assert np.shares_memory(df["soc_end"].to_numpy(), buffer["soc_end"])
+
+
+def test_timezone():
+    buffer = OutputBuffer({"timestamp": "datetime64[ns]"})
+    timestamp = pd.Timestamp(2022, 1, 1, 12, tz="Europe/Berlin")
+    buffer.append({"timestamp": timestamp})
+    assert buffer["timestamp"][0] == timestamp
@@ -0,0 +1,75 @@
+from fleema.result_writer import ResultWriter
+from fleema.vehicle import Vehicle, VehicleType
+from fleema.location import Location
+from fleema.util.conversions import step_to_timestamp
+
+import pytest
+import datetime
+import pandas as pd
+
+
+@pytest.fixture()
+def car() -> Vehicle:
+    car_type = VehicleType(battery_capacity=30, base_consumption=0.2)
+    return Vehicle("car", vehicle_type=car_type, soc=0.5)
+
+
+@pytest.fixture()
+def time_series():
+    time_series = pd.date_range(
+        datetime.datetime(2022, 1, 1),
+        datetime.datetime(2022, 1, 3),
+        freq="min",
+        inclusive="left",
+    )
+    return time_series
+
+
+def drive(car, time_series, start_step, new_soc):
+    time_stamp = step_to_timestamp(time_series, start_step)
+    car.drive(time_stamp, start_step, 10, Location("school"), new_soc, 1)
+
+
+def test_flush_appends_events(car, time_series, tmp_path):
+    writer = ResultWriter(tmp_path, {car.id: car})
+    drive(car, time_series, 5, 0.45)
+    writer.flush()
+    drive(car, time_series, 20, 0.4)
+    drive(car, time_series, 40, 0.35)
+    writer.flush()
+
+    chunked = pd.read_csv(tmp_path / "car_events.csv", index_col=0)
+    car.export(tmp_path)
+    complete = pd.read_csv(tmp_path / "car_events.csv", index_col=0)
+    pd.testing.assert_frame_equal(chunked, complete, check_dtype=False)
+
+
+def test_flush_interval(car, time_series, tmp_path):
+    writer = ResultWriter(tmp_path, {car.id: car}, flush_interval=10)
+    drive(car, time_series, 5, 0.45)
+    writer.update(5)
+    assert not (tmp_path / "car_events.csv").exists()
+    writer.update(10)
+    assert len(pd.read_csv(tmp_path / "car_events.csv", index_col=0)) == 1
+
+
+def test_no_events_no_file(car, tmp_path):
+    writer = ResultWriter(tmp_path, {car.id: car})
+    writer.flush()
+    assert not (tmp_path / "car_events.csv").exists()
+
+
+def test_set_state_truncates_files(car, time_series, tmp_path):
+    writer = ResultWriter(tmp_path, {car.id: car})
+    drive(car, time_series, 5, 0.45)
+    writer.flush()
+    state = writer.get_state()
+    expected = (tmp_path / "car_events.csv").read_text()
+    drive(car, time_series, 20, 0.4)
+    writer.flush()
+
+    writer = ResultWriter(tmp_path, {car.id: car})
+    writer.set_state(state)
+    assert (tmp_path / "car_events.csv").read_text() == expected
+    writer.flush()
+    assert len(pd.read_csv(tmp_path / "car_events.csv", index_col=0)) == 2
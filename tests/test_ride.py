@@ -289,3 +289,13 @@ def test_ride_calc_speed_negative():
     }
     with pytest.raises(ValueError):
         RideCalc(cons, dist, incl, temp, "median", defaults)
+
+
+def test_get_trip_time(driving_sim, location_a, location_b):
+    assert driving_sim.get_trip_time(location_a, location_a, 20) == 0
+    trip_time = driving_sim.get_trip_time(location_a, location_b, 20)
+    assert trip_time >= 1
+    # speeds that aren't above zero are replaced by the default speed
+    assert driving_sim.get_trip_time(
+        location_a, location_b, 0
+    ) == driving_sim.get_trip_time(location_a, location_b, 8.65)
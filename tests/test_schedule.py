@@ -0,0 +1,645 @@
+from fleema.simulation import Simulation
+from fleema.simulation_types import schedule as schedule_module
+from fleema.simulation_types.schedule import Schedule
+from fleema.vehicle import Vehicle
+from fleema.event import Task, Status
+
+import types
+from concurrent.futures import ProcessPoolExecutor
+import pandas as pd
+import pytest
+
+
+@pytest.fixture()
+def simulation() -> Simulation:
+    simulation = Simulation.from_config(
+        "scenario_data/bad_birnbach/configs/base_scenario.cfg", no_outputs_mode=True
+    )
+    return simulation
+
+
+@pytest.fixture()
+def schedule(simulation) -> Schedule:
+    return Schedule(simulation)
+
+
+class FakeEvaluation:
+    """Replaces Simulation.evaluate_charging_location, charging during the whole break without SpiceEV.
+
+    Defined on module level, so simulations using it can be sent to planning worker processes.
+    Nothing is cached, so calls with cached_only return None.
+
+    Parameters
+    ----------
+    score : float or callable
+        Score of every option, or a function of location, start and end returning it.
+    delta_soc : float
+        SoC delta of every option.
+    scores : dict, optional
+        Score by location name, overriding score.
+    charging_location : Location, optional
+        Location of the charging events. Default is the evaluated location.
+    end_offset : int
+        Added to the end of the break to get the end of the charging event.
+    components : callable, optional
+        Function of the location returning the score components. If given, options have
+        components instead of a score, to replace Simulation._evaluate_charging_components.
+    """
+
+    def __init__(
+        self,
+        score=1,
+        delta_soc=0.5,
+        scores=None,
+        charging_location=None,
+        end_offset=0,
+        components=None,
+    ):
+        self.score = score
+        self.delta_soc = delta_soc
+        self.scores = scores or {}
+        self.charging_location = charging_location
+        self.end_offset = end_offset
+        self.components = components
+        self.calls = []
+
+    def __call__(
+        self,
+        vehicle_type,
+        location,
+        current,
+        next_location,
+        start,
+        end,
+        soc,
+        cached_only=False,
+        **kwargs,
+    ):
+        if cached_only:
+            return None
+        self.calls.append((location.name, start, end))
+        charging_location = self.charging_location or location
+        option = {
+            "timestep": start,
+            "consumption": 0,
+            "charge": self.delta_soc,
+            "delta_soc": self.delta_soc,
+            "charge_event": Task(
+                start,
+                end + self.end_offset,
+                charging_location,
+                charging_location,
+                Status.CHARGING,
+                delta_soc=self.delta_soc,
+            ),
+        }
+        if self.components is not None:
+            option["components"] = self.components(location)
+        elif location.name in self.scores:
+            option["score"] = self.scores[location.name]
+        elif callable(self.score):
+            option["score"] = self.score(location, start, end)
+        else:
+            option["score"] = self.score
+        return option
+
+
+def num_reachable_locations(simulation, break_list):
+    return sum(
+        len(
+            simulation.get_reachable_locations(
+                task.start_point, task.end_point, task.end_time - task.start_time
+            )
+        )
+        for task in break_list
+    )
+
+
+def test_iterate_tasks_order(simulation, schedule):
+    location_1 = simulation.locations["Marktplatz"]
+    location_2 = simulation.locations["Bahnhof"]
+    vehicle_1 = Vehicle("vehicle_1")
+    vehicle_2 = Vehicle("vehicle_2")
+    vehicle_1.add_task(Task(5, 10, location_1, location_2, Status.DRIVING))
+    vehicle_1.add_task(Task(20, 30, location_2, location_1, Status.DRIVING))
+    vehicle_2.add_task(Task(5, 8, location_2, location_1, Status.DRIVING))
+    vehicle_2.add_task(Task(12, 18, location_1, location_2, Status.DRIVING))
+    simulation.vehicles = {"vehicle_1": vehicle_1, "vehicle_2": vehicle_2}
+
+    executed = [(step, veh.id) for step, veh, _ in schedule._iterate_tasks(0, 25)]
+    assert executed == [
+        (5, "vehicle_1"),
+        (5, "vehicle_2"),
+        (12, "vehicle_2"),
+        (20, "vehicle_1"),
+    ]
+
+
+def test_reconcile_speculative_plan_conflict(simulation, schedule):
+    vehicle = Vehicle("vehicle_1")
+    location = simulation.locations["Bahnhof"]
+    location.add_occupation(10, 20)
+    plan = ([], [("Bahnhof", 15, 25)], [], {}, False)
+    assert schedule._reconcile_speculative_plan(vehicle, plan) is None
+
+
+def test_reconcile_speculative_plan_relinks_locations(simulation, schedule):
+    vehicle = Vehicle("vehicle_1")
+    charge_event = Task(30, 40, "Bahnhof", "Bahnhof", Status.CHARGING)
+    plan = (
+        [{"score": 1, "charge_event": charge_event}],
+        [("Bahnhof", 30, 40)],
+        [],
+        {},
+        False,
+    )
+    chosen_events = schedule._reconcile_speculative_plan(vehicle, plan)
+    assert (
+        chosen_events[0]["charge_event"].start_point is simulation.locations["Bahnhof"]
+    )
+
+
+def plan_conflicting_fleet(parallel):
+    simulation = Simulation.from_config(
+        "scenario_data/bad_birnbach/configs/base_scenario.cfg", no_outputs_mode=True
+    )
+    simulation.parallel_planning = parallel
+    simulation.num_threads = 2
+    location = simulation.locations["Bahnhof"]
+    simulation.vehicles = {}
+    for vehicle_id in ["vehicle_1", "vehicle_2", "vehicle_3"]:
+        vehicle = Vehicle(vehicle_id, simulation.vehicle_types["EZ10"], soc=0.3)
+        vehicle.add_task(
+            Task(100, 200, location, location, Status.DRIVING, delta_soc=-0.2)
+        )
+        simulation.vehicles[vehicle_id] = vehicle
+    # Bahnhof has a single charging point, so the vehicles compete for it
+    simulation.evaluate_charging_location = FakeEvaluation(scores={"Bahnhof": 2})
+    schedule = Schedule(simulation)
+    schedule._distribute_charging_slots(0, 1000, 0.8)
+    return schedule
+
+
+def test_parallel_planning_matches_sequential():
+    sequential = plan_conflicting_fleet(parallel=False)
+    parallel = plan_conflicting_fleet(parallel=True)
+    # only the first vehicle gets the charger, the others lose their ride
+    assert sequential.deleted_rides == [("vehicle_2", 100), ("vehicle_3", 100)]
+    assert parallel.deleted_rides == sequential.deleted_rides
+    pd.testing.assert_frame_equal(
+        parallel.get_planned_tasks(), sequential.get_planned_tasks()
+    )
+    assert parallel.planning_report[-1]["evaluations"] > 0
+
+
+def test_worker_evaluation_counts(simulation, schedule, monkeypatch):
+    location = simulation.locations["Bahnhof"]
+    vehicle = Vehicle("vehicle_1", simulation.vehicle_types["EZ10"], soc=0.3)
+    vehicle.add_task(Task(100, 200, location, location, Status.DRIVING, delta_soc=-0.2))
+    simulation.vehicles = {"vehicle_1": vehicle}
+    simulation.evaluate_charging_location = FakeEvaluation()
+    monkeypatch.setattr(schedule_module, "_worker_schedule", None)
+    monkeypatch.setattr(schedule_module, "_worker_window", None)
+    schedule_module._init_planning_worker(simulation)
+    worker = schedule_module._worker_schedule
+    worker._evaluation_counts = {"requested": 3, "evaluated": 2}
+    plan = schedule_module._plan_vehicle_speculatively(
+        schedule._get_vehicle_state(vehicle, 0, 1000),
+        schedule._get_window_state(0, 1000, 0.8),
+    )
+    # only the evaluations of this vehicle are returned
+    assert plan[3]["requested"] == len(simulation.evaluate_charging_location.calls)
+    assert plan[3]["evaluated"] == plan[3]["requested"] > 0
+
+
+def test_parallel_planning_reuses_workers(monkeypatch):
+    started_pools = []
+
+    class RecordingExecutor(ProcessPoolExecutor):
+        def __init__(self, *args, **kwargs):
+            started_pools.append(kwargs["initargs"])
+            super().__init__(*args, **kwargs)
+
+    monkeypatch.setattr(schedule_module, "ProcessPoolExecutor", RecordingExecutor)
+    planned = {}
+    for parallel in [False, True]:
+        simulation = Simulation.from_config(
+            "scenario_data/bad_birnbach/configs/base_scenario.cfg",
+            no_outputs_mode=True,
+        )
+        simulation.parallel_planning = parallel
+        simulation.num_threads = 2
+        location = simulation.locations["Bahnhof"]
+        simulation.vehicles = {}
+        for vehicle_id in ["vehicle_1", "vehicle_2"]:
+            vehicle = Vehicle(vehicle_id, simulation.vehicle_types["EZ10"], soc=0.3)
+            for ride_start in [100, 600]:
+                vehicle.add_task(
+                    Task(
+                        ride_start,
+                        ride_start + 100,
+                        location,
+                        location,
+                        Status.DRIVING,
+                        delta_soc=-0.1,
+                    )
+                )
+            simulation.vehicles[vehicle_id] = vehicle
+        simulation.evaluate_charging_location = FakeEvaluation(scores={"Bahnhof": 2})
+        schedule = Schedule(simulation)
+        # charging events of the first window occupy the first time step of the second one
+        monkeypatch.setattr(
+            schedule, "_get_planning_windows", lambda: iter([(0, 500), (500, 1000)])
+        )
+        schedule._plan_windows()
+        planned[parallel] = (schedule.get_planned_tasks(), schedule.deleted_rides)
+    # the workers are started once for both windows and only get the simulation at their start
+    assert len(started_pools) == 1
+    assert len(started_pools[0]) == 1
+    pd.testing.assert_frame_equal(planned[True][0], planned[False][0])
+    assert planned[True][1] == planned[False][1]
+
+
+def test_break_evaluations_are_reused(simulation, schedule, monkeypatch):
+    location = simulation.locations["Marktplatz"]
+    vehicle = Vehicle("vehicle_1", simulation.vehicle_types["EZ10"], soc=0.5)
+    vehicle.add_task(Task(10, 20, location, location, Status.DRIVING, delta_soc=-0.1))
+    evaluate = FakeEvaluation(score=0, delta_soc=0)
+    monkeypatch.setattr(simulation, "evaluate_charging_location", evaluate)
+    for _ in range(2):
+        soc_df = schedule.get_predicted_soc(vehicle, 0, 100)
+        break_list = vehicle.get_breaks(0, 100)
+        schedule.get_charging_slots(break_list, soc_df, vehicle)
+    assert len(evaluate.calls) == num_reachable_locations(simulation, break_list)
+
+
+def test_predicted_soc(simulation, schedule):
+    location = simulation.locations["Marktplatz"]
+    vehicle = Vehicle("vehicle", simulation.vehicle_types["EZ10"], soc=0.8)
+    vehicle.add_task(Task(10, 20, location, location, Status.DRIVING, delta_soc=-0.2))
+    vehicle.add_task(Task(20, 30, location, location, Status.CHARGING, delta_soc=0.1))
+    drive = Task(40, 50, location, location, Status.DRIVING, delta_soc=-0.3)
+    vehicle.add_task(drive)
+    soc_trajectory = schedule.get_predicted_soc(vehicle, 0, 100)
+    assert list(soc_trajectory.drive_start) == [0, 10, 40]
+    assert list(soc_trajectory.timestep) == [0, 20, 50]
+    assert list(soc_trajectory.soc) == pytest.approx([0.8, 0.6, 0.4])
+
+    # the trajectory follows changes of the soc profile
+    drive.delta_soc = -0.1
+    vehicle.update_task_soc(drive)
+    soc_trajectory = schedule.get_predicted_soc(vehicle, 15, 100)
+    assert list(soc_trajectory.soc) == pytest.approx([0.8, 0.8])
+
+
+def test_planning_windows(simulation, schedule):
+    simulation.time_steps = 3000
+    simulation.end_of_day_steps = None
+    simulation.planning_horizon = 0
+    assert list(schedule._get_planning_windows()) == [(0, 3000)]
+    simulation.planning_horizon = 1
+    assert list(schedule._get_planning_windows()) == [
+        (0, 1440),
+        (1440, 2880),
+        (2880, 3000),
+    ]
+    simulation.planning_horizon = 2
+    assert list(schedule._get_planning_windows()) == [(0, 2880), (2880, 3000)]
+
+
+def test_planned_tasks(simulation, schedule):
+    location_1 = simulation.locations["Marktplatz"]
+    location_2 = simulation.locations["Bahnhof"]
+    vehicle = Vehicle("vehicle", soc=0.8)
+    vehicle.add_task(Task(5, 10, location_1, location_2, Status.DRIVING, 5, -0.1))
+    vehicle.add_task(
+        Task(10, 30, location_2, location_2, Status.CHARGING, delta_soc=0.3)
+    )
+    vehicle.add_task(Task(40, 50, location_2, location_1, Status.DRIVING, 10, -0.2))
+    simulation.vehicles = {"vehicle": vehicle}
+
+    planned_tasks = schedule.get_planned_tasks()
+    assert list(planned_tasks["task"]) == ["driving", "charging", "driving"]
+    assert list(planned_tasks["start_point"]) == ["Marktplatz", "Bahnhof", "Bahnhof"]
+
+    # the charging event is capped at a full battery
+    schedule._advance_planned_soc(0, 35)
+    assert vehicle.soc == pytest.approx(1)
+    schedule._advance_planned_soc(35, 100)
+    assert vehicle.soc == pytest.approx(0.8)
+
+
+def test_fleet_break_evaluations(simulation, schedule, monkeypatch):
+    location = simulation.locations["Marktplatz"]
+    vehicles = {}
+    for vehicle_id in ["vehicle_1", "vehicle_2"]:
+        vehicle = Vehicle(vehicle_id, simulation.vehicle_types["EZ10"], soc=0.25)
+        vehicle.add_task(
+            Task(10, 20, location, location, Status.DRIVING, delta_soc=-0.1)
+        )
+        vehicles[vehicle_id] = vehicle
+    simulation.vehicles = vehicles
+    evaluate = FakeEvaluation(delta_soc=0.3, charging_location=location)
+    monkeypatch.setattr(simulation, "evaluate_charging_location", evaluate)
+    schedule._collect_break_evaluations(0, 100, 0.8)
+    # both vehicles share the break before and after their ride
+    num_evaluations = num_reachable_locations(simulation, vehicle.get_breaks(0, 100))
+    assert len(evaluate.calls) == num_evaluations
+
+    options = []
+    for vehicle in vehicles.values():
+        # reset for every vehicle like in _plan_vehicle
+        schedule._break_evaluations = {}
+        soc_df = schedule.get_predicted_soc(vehicle, 0, 100)
+        break_list = vehicle.get_breaks(0, 100)
+        options.append(schedule.get_charging_slots(break_list, soc_df, vehicle)[0])
+    assert len(evaluate.calls) == num_evaluations
+    assert options[0]["charge_event"] == options[1]["charge_event"]
+    assert options[0]["charge_event"] is not options[1]["charge_event"]
+
+
+@pytest.mark.parametrize("collect", [True, False])
+def test_collect_break_evaluations_sequential(
+    simulation, schedule, monkeypatch, collect
+):
+    simulation.collect_break_evaluations = collect
+    location = simulation.locations["Marktplatz"]
+    vehicles = {}
+    for vehicle_id in ["vehicle_1", "vehicle_2"]:
+        vehicle = Vehicle(vehicle_id, simulation.vehicle_types["EZ10"], soc=0.5)
+        vehicle.add_task(
+            Task(10, 20, location, location, Status.DRIVING, delta_soc=-0.1)
+        )
+        vehicles[vehicle_id] = vehicle
+    simulation.vehicles = vehicles
+    breaks = vehicle.get_breaks(0, 100)
+    evaluate = FakeEvaluation(delta_soc=0.1)
+    monkeypatch.setattr(simulation, "evaluate_charging_location", evaluate)
+    plan_vehicle = schedule._plan_vehicle
+    evaluations_before_planning = []
+
+    def record_evaluations(*args, **kwargs):
+        evaluations_before_planning.append(len(evaluate.calls))
+        return plan_vehicle(*args, **kwargs)
+
+    monkeypatch.setattr(schedule, "_plan_vehicle", record_evaluations)
+    schedule._distribute_charging_slots(0, 100, 0.8)
+    num_evaluations = num_reachable_locations(simulation, breaks)
+    # every distinct break of the fleet is evaluated exactly once
+    assert len(evaluate.calls) == len(set(evaluate.calls)) == num_evaluations
+    if collect:
+        assert evaluations_before_planning == [num_evaluations, num_evaluations]
+    else:
+        assert evaluations_before_planning[0] == 0
+
+
+def test_reuse_day_plans(simulation, schedule, monkeypatch):
+    simulation.reuse_day_plans = True
+    # vehicles that reuse a plan don't get their breaks collected
+    simulation.collect_break_evaluations = True
+    simulation.time_steps = 2880
+    for location in simulation.locations.values():
+        location.init_occupation(2880)
+    location = simulation.locations["Marktplatz"]
+    vehicle = Vehicle("vehicle", simulation.vehicle_types["EZ10"], soc=0.3)
+    for day_start in [0, 1440]:
+        vehicle.add_task(
+            Task(
+                day_start + 100,
+                day_start + 200,
+                location,
+                location,
+                Status.DRIVING,
+                delta_soc=-0.2,
+            )
+        )
+    simulation.vehicles = {"vehicle": vehicle}
+    # charging events end before the window does, so the next day doesn't overlap
+    evaluate = FakeEvaluation(end_offset=-1)
+    monkeypatch.setattr(simulation, "evaluate_charging_location", evaluate)
+    monkeypatch.setattr(simulation, "get_price_profile", lambda *args: ())
+    schedule._distribute_charging_slots(0, 1440, 0.8)
+    first_day = [
+        (task.start_time, task.end_time)
+        for task in vehicle.tasks.values()
+        if task.task == Status.CHARGING
+    ]
+    evaluations = len(evaluate.calls)
+    assert first_day
+
+    schedule._distribute_charging_slots(1440, 2880, 0.8)
+    assert len(evaluate.calls) == evaluations
+    second_day = [
+        (task.start_time - 1440, task.end_time - 1440)
+        for task in vehicle.tasks.values()
+        if task.task == Status.CHARGING and task.start_time >= 1440
+    ]
+    assert second_day == first_day
+
+
+def test_day_fingerprint(simulation, schedule):
+    location = simulation.locations["Marktplatz"]
+    vehicle = Vehicle("vehicle", simulation.vehicle_types["EZ10"], soc=0.5)
+    for day_start in [0, 1440]:
+        vehicle.add_task(
+            Task(
+                day_start + 100,
+                day_start + 200,
+                location,
+                location,
+                Status.DRIVING,
+                delta_soc=-0.2,
+            )
+        )
+    first_day = schedule._get_day_fingerprint(vehicle, 0, 1440, ())
+    assert schedule._get_day_fingerprint(vehicle, 1440, 2880, ()) == first_day
+    # a task of the previous window that is still running moves the first break
+    vehicle.add_task(
+        Task(1400, 1460, location, location, Status.DRIVING, delta_soc=-0.1)
+    )
+    assert schedule._get_day_fingerprint(vehicle, 1440, 2880, ()) != first_day
+
+
+def test_reuse_day_plan_end_soc(simulation, schedule):
+    location = simulation.locations["Marktplatz"]
+    vehicle = Vehicle("vehicle", simulation.vehicle_types["EZ10"], soc=0.5)
+    vehicle.add_task(Task(100, 200, location, location, Status.DRIVING, delta_soc=-0.2))
+    option = FakeEvaluation(delta_soc=0.1)(
+        vehicle.vehicle_type, location, location, location, 10, 50, 0.5
+    )
+    schedule._day_plans["fingerprint"] = (0, [option])
+    assert schedule._reuse_day_plan(vehicle, 0, 1440, 0.3, "fingerprint")
+    # the plan satisfies the minimum SoC, but not the desired end SoC
+    assert schedule._reuse_day_plan(vehicle, 0, 1440, 0.8, "fingerprint") is None
+
+
+def test_replan(simulation, schedule, monkeypatch):
+    location = simulation.locations["Marktplatz"]
+    simulation.keep_evaluations = True
+
+    def create_initial_schedule():
+        vehicle = Vehicle("vehicle", simulation.vehicle_types["EZ10"], soc=0.3)
+        vehicle.add_task(
+            Task(1000, 1100, location, location, Status.DRIVING, delta_soc=-0.2)
+        )
+        simulation.vehicles = {"vehicle": vehicle}
+
+    def get_components(charging_location):
+        # Marktplatz is the fastest, Bahnhof the cheapest charging location
+        fast = charging_location is location
+        return {
+            "time_score": 1 if fast else 0,
+            "charge_score": 0,
+            "cost_score": 0 if fast else 1,
+            "local_feed_in_score": 0,
+            "soc_score": 0,
+        }
+
+    evaluate_components = FakeEvaluation(components=get_components)
+
+    monkeypatch.setattr(schedule, "_create_initial_schedule", create_initial_schedule)
+    monkeypatch.setattr(
+        simulation, "_evaluate_charging_components", evaluate_components
+    )
+    planned_tasks = schedule.replan({"time_factor": 1, "cost_factor": 0})
+    charging = planned_tasks[planned_tasks["task"] == "charging"]
+    assert set(charging["start_point"]) == {"Marktplatz"}
+    num_calls = len(evaluate_components.calls)
+
+    # the same breaks are rescored from the stored components
+    planned_tasks = schedule.replan({"time_factor": 0, "cost_factor": 1})
+    charging = planned_tasks[planned_tasks["task"] == "charging"]
+    assert set(charging["start_point"]) == {"Bahnhof"}
+    assert len(evaluate_components.calls) == num_calls
+    assert simulation.weights["energy_factor"] == 1
+
+    with pytest.raises(ValueError):
+        schedule.replan({"unknown_factor": 1})
+
+    # without keep_evaluations, the evaluations of earlier windows are dropped
+    simulation.keep_evaluations = False
+    schedule.replan({"time_factor": 1, "cost_factor": 0})
+    assert len(evaluate_components.calls) > num_calls
+
+
+def test_iterate_charging_slots(simulation, schedule, monkeypatch):
+    location = simulation.locations["Marktplatz"]
+    vehicle = Vehicle("vehicle", simulation.vehicle_types["EZ10"], soc=0.5)
+    for start, end in [(300, 400), (500, 550), (700, 800)]:
+        vehicle.add_task(
+            Task(start, end, location, location, Status.DRIVING, delta_soc=-0.1)
+        )
+
+    def get_score(charging_location, start, end):
+        return (end - start) / 200 if charging_location is location else 0
+
+    evaluate = FakeEvaluation(
+        score=get_score, delta_soc=0.1, charging_location=location
+    )
+
+    def get_score_bound(vehicle_type, current, next_location, time_window, soc):
+        return time_window / 100
+
+    monkeypatch.setattr(simulation, "evaluate_charging_location", evaluate)
+    monkeypatch.setattr(simulation, "get_score_bound", get_score_bound)
+    soc_trajectory = schedule.get_predicted_soc(vehicle, 0, 1000)
+    break_list = vehicle.get_breaks(0, 1000)
+    options = schedule.iterate_charging_slots(break_list, soc_trajectory, vehicle)
+    best_option = next(options)
+    # breaks with a bound below the best score aren't evaluated
+    assert len({start for _, start, _ in evaluate.calls}) < len(break_list)
+
+    expected = schedule.get_charging_slots(break_list, soc_trajectory, vehicle)
+    assert best_option is expected[0]
+    assert [best_option] + list(options) == expected
+
+
+def test_planning_time_budget(simulation, schedule, monkeypatch):
+    location = simulation.locations["Marktplatz"]
+
+    def plan(budget):
+        vehicle = Vehicle("vehicle", simulation.vehicle_types["EZ10"], soc=0.3)
+        vehicle.add_task(
+            Task(100, 200, location, location, Status.DRIVING, delta_soc=-0.05)
+        )
+        vehicle.add_task(
+            Task(300, 400, location, location, Status.DRIVING, delta_soc=-0.2)
+        )
+        simulation.vehicles = {"vehicle": vehicle}
+        simulation.planning_time_budget = budget
+        schedule._distribute_charging_slots(0, 1000, 0.2)
+        return schedule.planning_report[-1]
+
+    # the clock advances by one second for every evaluation that is made
+    clock = [0]
+    fake_evaluation = FakeEvaluation(delta_soc=0.1)
+
+    def evaluate(*args, **kwargs):
+        option = fake_evaluation(*args, **kwargs)
+        if option is not None:
+            clock[0] += 1
+        return option
+
+    monkeypatch.setattr(
+        schedule_module, "time", types.SimpleNamespace(time=lambda: clock[0])
+    )
+    monkeypatch.setattr(simulation, "evaluate_charging_location", evaluate)
+    report = plan(0)
+    assert report["explored"] == 1
+    assert report["evaluations"] > 2
+    assert not report["unexplored_vehicles"]
+    assert not schedule.deleted_rides
+
+    # after the deadline, the vehicle keeps the plan of the evaluations made so far
+    report = plan(1.5)
+    assert report["planning_time"] <= 2
+    assert report["requested_evaluations"] > report["evaluations"] == 2
+    assert report["unexplored_vehicles"] == ["vehicle"]
+    assert not schedule.deleted_rides
+    vehicle = simulation.vehicles["vehicle"]
+    charging = [t for t in vehicle.tasks.values() if t.task == Status.CHARGING]
+    assert len(charging) == 1
+
+    simulation.delete_rides = False
+    report = plan(1.5)
+    assert report["unexplored_vehicles"] == ["vehicle"]
+
+
+def run_with_checkpoint(results_directory, monkeypatch, resume=False):
+    simulation = Simulation.from_config(
+        "scenario_data/bad_birnbach/configs/base_scenario.cfg"
+    )
+    simulation.save_directory = results_directory / simulation.save_directory.name
+    simulation.checkpoint_interval = 1
+    simulation.output_flush_interval = 60
+    # no charging is planned, so the run doesn't need SpiceEV
+    simulation.evaluate_charging_location = FakeEvaluation(score=0)
+    schedule = Schedule(simulation)
+    # checkpoint in the middle of the day instead of at its end
+    monkeypatch.setattr(
+        schedule,
+        "_get_day_boundaries",
+        lambda days: iter([simulation.time_steps // 2]),
+    )
+    schedule.run(resume=resume)
+    return simulation
+
+
+def test_resume_from_checkpoint(tmp_path, monkeypatch):
+    simulation = run_with_checkpoint(tmp_path, monkeypatch)
+    checkpoint_step = simulation.time_steps // 2
+    event_files = sorted(simulation.save_directory.glob("*_events.csv"))
+    assert event_files
+    expected = {path.name: path.read_text() for path in event_files}
+    # some events were written after the checkpoint and are cut off on resume
+    assert any(
+        (pd.read_csv(path)["event_start"] >= checkpoint_step).any()
+        for path in event_files
+    )
+
+    resumed = run_with_checkpoint(tmp_path, monkeypatch, resume=True)
+    assert resumed.save_directory == simulation.save_directory
+    assert {
+        path.name: path.read_text()
+        for path in resumed.save_directory.glob("*_events.csv")
+    } == expected
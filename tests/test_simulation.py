@@ -1,7 +1,9 @@
 from fleema.simulation import Simulation
 from fleema.event import Task, Status
 
+import numpy as np
 import pytest
+import shutil
 
 
 @pytest.fixture()
@@ -24,6 +26,20 @@ def test_bad_config_name():
         Simulation.from_config(scenario_path)
 
 
+@pytest.mark.parametrize(
+    "option, value", [("planning_mode", "gready"), ("global_solver", "milp_exact")]
+)
+def test_bad_planning_options(tmp_path, option, value):
+    scenario_path = tmp_path / "bad_birnbach"
+    shutil.copytree("scenario_data/bad_birnbach", scenario_path)
+    config_path = scenario_path / "configs" / "base_scenario.cfg"
+    config = config_path.read_text()
+    config = config.replace(f"\n{option} = ", f"\n{option} = {value}\n# ")
+    config_path.write_text(config)
+    with pytest.raises(ValueError, match=value):
+        Simulation.from_config(config_path, no_outputs_mode=True)
+
+
 # def test_run(simulation):
 #     simulation.run()
 #     assert len(simulation.vehicles)
@@ -69,3 +85,107 @@ def test_evaluate_charging_location(simulation):
     # assert result == expected_result
     assert result["consumption"] == expected_result["consumption"]
     # TODO more asserts
+
+
+def test_tasks_from_schedule(simulation):
+    simulation.vehicles_from_schedule()
+    simulation.tasks_from_schedule()
+    tasks = {vehicle_id: veh.tasks for vehicle_id, veh in simulation.vehicles.items()}
+
+    simulation.vehicles = {}
+    simulation.vehicles_from_schedule()
+    simulation.schedule.apply(simulation.task_from_schedule, axis=1)
+    assert tasks == {
+        vehicle_id: veh.tasks for vehicle_id, veh in simulation.vehicles.items()
+    }
+
+
+def test_vehicles_with_multiple_types(simulation):
+    simulation.schedule.loc[0, "vehicle_type"] = "other_type"
+    with pytest.raises(ValueError):
+        simulation.vehicles_from_schedule()
+
+
+def test_price_profile(simulation):
+    steps_per_hour = int(60 / simulation.step_size)
+    profile = simulation.get_price_profile(0, 24 * steps_per_hour)
+    # one hourly price and the feed-in of every generator
+    assert len(profile[0]) == 24
+    assert profile == simulation.get_price_profile(0, 24 * steps_per_hour)
+    assert set(profile[0]) <= set(range(10))
+    # prices that only differ slightly fall into the same classes
+    column = simulation.cost_options["column"]
+    cost = simulation.cost_time_series[column]
+    simulation.cost_time_series[column] = cost + np.resize([1e-7, -1e-7], len(cost))
+    assert simulation.get_price_profile(0, 24 * steps_per_hour) == profile
+    assert len(set(simulation.get_price_profile(0, 24 * steps_per_hour, 2)[0])) <= 2
+
+
+def test_get_reachable_locations(simulation):
+    current_location = simulation.locations["Marktplatz"]
+    next_location = simulation.locations["Artrium"]
+    reachable = simulation.get_reachable_locations(
+        current_location, next_location, 10**6
+    )
+    assert reachable == simulation.charging_locations
+    assert simulation.get_reachable_locations(current_location, next_location, 0) == []
+    # pruned locations would only be rated with a score of 0
+    time_window = 10
+    reachable = simulation.get_reachable_locations(
+        current_location, next_location, time_window
+    )
+    vehicle_type = simulation.vehicle_types["EZ10"]
+    for location in simulation.charging_locations:
+        if location not in reachable:
+            result = simulation.evaluate_charging_location(
+                vehicle_type,
+                location,
+                current_location,
+                next_location,
+                0,
+                time_window,
+                0.5,
+            )
+            assert result["score"] == 0
+
+
+def test_score_evaluation(simulation):
+    location = simulation.locations["Marktplatz"]
+    evaluation = {
+        "timestep": 0,
+        "consumption": 0,
+        "charge": 0.2,
+        "delta_soc": 0.2,
+        "charge_event": Task(0, 10, location, location, Status.CHARGING),
+        "components": {
+            "time_score": 0.5,
+            "charge_score": 1,
+            "cost_score": 0.25,
+            "local_feed_in_score": 0,
+            "soc_score": 0.1,
+        },
+    }
+    weights = dict(simulation.weights, soc_factor=0)
+    result = simulation.score_evaluation(evaluation, 0, weights)
+    assert result["score"] == pytest.approx(1.75)
+    assert result["charge_event"] == evaluation["charge_event"]
+    assert result["charge_event"] is not evaluation["charge_event"]
+
+    weights = dict.fromkeys(simulation.weights, 0)
+    assert simulation.score_evaluation(evaluation, 0, weights)["score"] == 0
+    assert simulation.score_evaluation(None, 5)["timestep"] == 5
+
+
+def test_get_score_bound(simulation):
+    vehicle_type = simulation.vehicle_types["EZ10"]
+    location = simulation.locations["Marktplatz"]
+    simulation.weights = dict.fromkeys(simulation.weights, 0)
+    simulation.weights["time_factor"] = 1
+    # charging at the current location doesn't need a detour
+    bound = simulation.get_score_bound(vehicle_type, location, location, 100, 0.5)
+    assert bound == pytest.approx(1)
+    assert simulation.get_score_bound(vehicle_type, location, location, 0, 0.5) == 0
+    simulation.weights["cost_factor"] = -1
+    assert simulation.get_score_bound(vehicle_type, location, location, 100, 0.5) == (
+        float("inf")
+    )
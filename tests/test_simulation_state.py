@@ -2,7 +2,7 @@ import fleema.vehicle as vehicle
 from fleema.util.conversions import step_to_timestamp
 from fleema.simulation_state import SimulationState
 from fleema.location import Location
-from fleema.event import Status
+from fleema.event import Status, Task
 
 import pytest
 import datetime
@@ -92,6 +92,23 @@ def test_update_vehicle_park(car, sim_state):
     assert car in sim_state.parking_vehicles
 
 
+def test_add_all_vehicle_events(car, sim_state):
+    depot = Location("depot")
+    depot.init_occupation(100)
+    for start, status in [
+        (0, Status.DRIVING),
+        (20, Status.CHARGING),
+        (60, Status.CHARGING),
+    ]:
+        car.add_task(Task(start, start + 10, depot, depot, status))
+    sim_state.add_all_vehicle_events(car, 0, 50)
+    assert list(sim_state.events) == [0, 20]
+    assert depot.get_max_occupation(0, 100) == 1
+    sim_state.add_all_vehicle_events(car, 50)
+    assert list(sim_state.events) == [0, 20, 60]
+    assert depot.get_max_occupation(60, 70) == 1
+
+
 def test_add_to_accumulated_results(sim_state):
     # test adding a new key-value pair to the accumulated results
     sim_state.add_to_accumulated_results("key1", 10.5)
@@ -0,0 +1,50 @@
+from fleema.soc_profile import SocProfile
+
+import random
+import pytest
+
+
+def test_get_delta():
+    profile = SocProfile()
+    profile.add(3, -0.2)
+    profile.add(10, 0.5)
+    profile.add(3, -0.1)
+    assert len(profile) == 2
+    assert profile.get_value(3) == pytest.approx(-0.3)
+    assert profile.get_value(4) == 0
+    assert profile.get_delta(0, 3) == 0
+    assert profile.get_delta(0, 4) == pytest.approx(-0.3)
+    assert profile.get_delta(4, 100) == pytest.approx(0.5)
+    assert profile.get_delta(10, 3) == 0
+
+
+def test_remove():
+    profile = SocProfile()
+    profile.add(3, -0.2)
+    profile.add(10, 0.5)
+    profile.remove(3)
+    profile.remove(4)
+    assert len(profile) == 1
+    assert profile.get_value(3) == 0
+    assert profile.get_delta(0, 100) == pytest.approx(0.5)
+
+
+def test_matches_direct_sum():
+    random.seed(1)
+    profile = SocProfile(2)
+    deltas = [0.0] * 100000
+    for _ in range(300):
+        step = random.randrange(len(deltas))
+        if random.random() < 0.2:
+            profile.remove(step)
+            deltas[step] = 0.0
+        else:
+            delta = random.uniform(-0.5, 0.5)
+            profile.add(step, delta)
+            deltas[step] += delta
+        start = random.randrange(len(deltas))
+        end = random.randrange(start, len(deltas) + 1)
+        assert profile.get_delta(start, end) == pytest.approx(sum(deltas[start:end]))
+    # the tree grew to cover all time steps, but only stores the nodes that were updated
+    assert profile.size >= len(deltas)
+    assert len(profile._tree) <= 300 * profile.size.bit_length()
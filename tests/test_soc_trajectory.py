@@ -0,0 +1,51 @@
+from fleema.soc_trajectory import SocTrajectory
+
+import pytest
+
+
+@pytest.fixture()
+def trajectory():
+    return SocTrajectory(
+        [0, 10, 30, 50, 70],
+        [0, 20, 40, 60, 80],
+        [0.5, 0.3, 0.15, 0.1, 0.05],
+    )
+
+
+def test_get_soc(trajectory):
+    assert trajectory.get_soc(25) == 0.15
+    assert trajectory.get_soc(90) is None
+
+
+def test_critical_points(trajectory):
+    critical = trajectory.get_critical_points(0.2)
+    assert list(critical.timestep) == [40, 60, 80]
+    assert critical.necessary_charging[0] == pytest.approx(0.05)
+    assert not critical.min_soc_satisfied
+
+
+def test_critical_points_include_last(trajectory):
+    critical = trajectory.get_critical_points(0.01)
+    assert list(critical.timestep) == [80]
+
+
+def test_apply_delta(trajectory):
+    critical = trajectory.get_critical_points(0.2)
+    critical.apply_delta(50, 0.2)
+    assert list(critical.soc) == pytest.approx([0.15, 0.3, 0.25])
+    assert critical.first_unsatisfied_start() == 30
+    critical.apply_delta(0, 0.1)
+    assert critical.min_soc_satisfied
+
+
+def test_apply_delta_clipped():
+    trajectory = SocTrajectory([0, 10, 20], [5, 15, 25], [0.8, 0.6, 0.9])
+    trajectory.apply_delta(0, 0.3)
+    # first point is clipped at 1, reducing the delta to 0.2 for all following points
+    assert list(trajectory.soc) == pytest.approx([1.0, 0.8, 1.0])
+    assert list(trajectory.necessary_charging) == pytest.approx([-0.2, -0.2, -0.1])
+
+
+def test_first_unsatisfied_start_satisfied(trajectory):
+    with pytest.raises(ValueError):
+        trajectory.first_unsatisfied_start()
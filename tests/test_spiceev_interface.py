@@ -4,11 +4,13 @@ import fleema.charger as charger
 from fleema.util.conversions import step_to_timestamp
 from fleema.spiceev_interface import (
     get_spice_ev_scenario_dict,
+    get_charging_profile,
     run_spice_ev,
 )
 
 import pytest
 import datetime
+import types
 import pandas as pd
 
 
@@ -87,3 +89,14 @@ def test_run_spice_ev(car, time_series, spot, cost_options):
 
 def test_get_charging_characteristic_emission():
     pass
+
+
+def test_get_charging_profile():
+    scenario = types.SimpleNamespace(
+        connChargeByTS={"GC1": [{"car": 11}, {"car": 11}, {"car": 4}]},
+        interval=datetime.timedelta(minutes=15),
+    )
+    profile = get_charging_profile(scenario)
+    assert list(profile.start) == [0, 30]
+    assert list(profile.duration) == [30, 15]
+    assert profile.average_power == pytest.approx((11 * 30 + 4 * 15) / 45)
@@ -0,0 +1,44 @@
+from fleema.task_table import TaskTable
+from fleema.vehicle import Vehicle
+from fleema.event import Task, Status
+from fleema.location import Location
+
+import pickle
+import pytest
+
+
+@pytest.fixture()
+def vehicles():
+    home = Location("home")
+    work = Location("work")
+    car_1 = Vehicle("car_1")
+    car_1.add_task(Task(30, 40, work, home, Status.DRIVING, delta_soc=-0.1))
+    car_1.add_task(Task(10, 20, home, work, Status.DRIVING, delta_soc=-0.2))
+    car_2 = Vehicle("car_2")
+    car_2.add_task(Task(5, 25, work, work, Status.CHARGING, delta_soc=0.3))
+    return {car_1.id: car_1, car_2.id: car_2}
+
+
+def test_from_vehicles(vehicles):
+    table = TaskTable.from_vehicles(vehicles)
+    assert len(table) == 3
+    assert list(table.start_time) == [10, 30, 5]
+    assert table.location_names == ["home", "work"]
+    assert list(table.origin) == [0, 1, 1]
+    assert table.delta_soc[table.vehicle == 0].sum() == pytest.approx(-0.3)
+
+
+def test_to_dataframe(vehicles):
+    df = TaskTable.from_vehicles(vehicles).to_dataframe()
+    assert list(df["vehicle_id"]) == ["car_1", "car_1", "car_2"]
+    assert list(df["task"]) == ["driving", "driving", "charging"]
+    assert list(df["end_point"]) == ["work", "home", "work"]
+    assert TaskTable.from_vehicles({}).to_dataframe().empty
+
+
+def test_task_is_slotted():
+    task = Task(0, 1, None, None, Status.DRIVING)
+    assert not hasattr(task, "__dict__")
+    with pytest.raises(AttributeError):
+        task.is_calulated = False
+    assert pickle.loads(pickle.dumps(task)) == task
@@ -163,3 +163,100 @@ def test_incorrect_task_list(car):
         car.add_task(task)
 
     assert not car.has_valid_task_list
+
+
+def test_get_breaks_time_window(car):
+    location_1 = Location("location_1")
+    location_2 = Location("location_2")
+    car.add_task(Task(10, 30, location_1, location_2, Status.DRIVING))
+    car.add_task(Task(40, 110, location_2, location_1, Status.DRIVING))
+    car.add_task(Task(130, 150, location_1, location_2, Status.DRIVING))
+
+    first_window = car.get_breaks(0, 100)
+    assert [(b.start_time, b.end_time) for b in first_window] == [(0, 10), (30, 40)]
+    # the break of the second window starts after the last ride of the first window
+    second_window = car.get_breaks(100, 200)
+    assert [(b.start_time, b.end_time) for b in second_window] == [
+        (110, 130),
+        (150, 200),
+    ]
+
+
+def test_task_queries(car):
+    location_1 = Location("location_1")
+    location_2 = Location("location_2")
+    task_1 = Task(30, 40, location_2, location_1, Status.DRIVING)
+    task_2 = Task(10, 20, location_1, location_2, Status.DRIVING)
+    car.add_task(task_1)
+    car.add_task(task_2)
+
+    assert car.task_steps == [10, 30]
+    assert car.get_next_task(10) is task_1
+    assert car.get_next_task(30) is None
+    assert car.get_previous_task(30) is task_2
+    assert car.get_previous_task(10) is None
+    assert car.get_tasks(0, 30) == [task_2]
+    car.remove_task(task_2)
+    assert car.get_tasks(0, 100) == [task_1]
+
+
+def test_task_list_validity_is_updated(car):
+    location_1 = Location("location_1")
+    location_2 = Location("location_2")
+    task_1 = Task(0, 1, location_1, location_2, Status.DRIVING)
+    task_2 = Task(5, 6, location_1, location_2, Status.DRIVING)
+    car.add_task(task_1)
+    car.add_task(task_2)
+    assert not car.has_valid_task_list
+
+    # removing the ride in between makes the task list valid again
+    car.remove_task(task_1)
+    assert car.has_valid_task_list
+    car.add_task(Task(2, 4, location_2, location_1, Status.DRIVING))
+    car.add_task(task_1)
+    assert car.has_valid_task_list
+
+
+def test_get_breaks_after_changes(car):
+    location = Location("location")
+    car.add_task(Task(10, 20, location, location, Status.DRIVING))
+    breaks = car.get_breaks(0, 100)
+    assert [(b.start_time, b.end_time) for b in breaks] == [(0, 10), (20, 100)]
+
+    charging = Task(20, 40, location, location, Status.CHARGING)
+    car.add_task(charging)
+    car.add_task(Task(50, 60, location, location, Status.DRIVING))
+    breaks = car.get_breaks(0, 100)
+    assert [(b.start_time, b.end_time) for b in breaks] == [
+        (0, 10),
+        (20, 50),
+        (60, 100),
+    ]
+    car.remove_task(charging)
+    assert len(car.get_breaks(0, 100)) == 3
+    # only the breaks of the latest time frame are kept
+    assert [(b.start_time, b.end_time) for b in car.get_breaks(0, 30)] == [
+        (0, 10),
+        (20, 30),
+    ]
+    assert car._breaks[0][:2] == (0, 30)
+
+
+def test_soc_profile(car):
+    location_1 = Location("location_1")
+    location_2 = Location("location_2")
+    drive = Task(10, 20, location_1, location_2, Status.DRIVING, delta_soc=-0.3)
+    charge = Task(25, 40, location_2, location_2, Status.CHARGING, delta_soc=0.2)
+    car.add_task(drive)
+    car.add_task(charge)
+    car.add_task(Task(50, 60, location_2, location_1, Status.DRIVING, delta_soc=-0.1))
+
+    assert car.get_soc_delta(0, 50) == pytest.approx(-0.1)
+    assert car.predict_soc(0, 100) == pytest.approx(car.soc - 0.2)
+    assert car.predict_soc(25, 100) == pytest.approx(car.soc + 0.1)
+
+    car.remove_task(charge)
+    assert car.predict_soc(0, 100) == pytest.approx(car.soc - 0.4)
+    drive.delta_soc = -0.2
+    car.update_task_soc(drive)
+    assert car.predict_soc(0, 100) == pytest.approx(car.soc - 0.3)